@@ -0,0 +1,22 @@
+#include "celestrak/mathtimelib/MathTimeLib.h"
+#include "celestrak/astrolib/AstroLib.h"
+#include "celestrak/sgp4/SGP4.h"
+
+/*
+ * The geodetic latitude and longitude, in degrees, and the altitude, in km, of an ECEF
+ * position, and the speed, in km/s, of an ECEF velocity.
+ */
+void calc_geodetic(
+    double recef[3],
+    double vecef[3],
+    double *latitude, double *longitude, double *altitude, double *speed
+)
+{
+    double latgc, latgd, lon, hellp;
+    ecef2ll(recef, &latgc, &latgd, &lon, &hellp);
+
+    *latitude = latgd * 180.0/pi;
+    *longitude = lon * 180.0/pi;
+    *altitude = hellp;
+    *speed = sqrt(vecef[0] * vecef[0] + vecef[1] * vecef[1] + vecef[2] * vecef[2]);
+}
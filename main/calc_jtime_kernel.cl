@@ -6,6 +6,8 @@
 #include "celestrak/sgp4/SGP4.cl"
 #include "celestrak/mathtimelib/MathTimeLib.h"
 #include "celestrak/mathtimelib/MathTimeLib.cl"
+#include "celestrak/astrolib/AstroLib.h"
+#include "celestrak/astrolib/AstroLib.cl"
 
 __kernel void calc_jtime(
     int p_year, int p_month, int p_day,
@@ -21,3 +21,25 @@ __kernel void calc_satrecs(
 
     satrec_array[offset] = satrec;
 }
+
+/*
+ * The size of the satrec struct is only known here, so the host asks for it to size the
+ * satrec buffers.
+ */
+__kernel void satrec_size(__global uint *size)
+{
+    size[0] = sizeof(elsetrec);
+}
+
+/*
+ * Copies new satrecs into their slots, to patch the satrecs of a reloaded catalogue into the
+ * satrec array without initialising them all again.
+ */
+__kernel void scatter_satrecs(
+    __global const int *slots,
+    __global const elsetrec *satrecs,
+    __global elsetrec *satrec_array)
+{
+    const size_t i = get_global_id(0);
+    satrec_array[slots[i]] = satrecs[i];
+}
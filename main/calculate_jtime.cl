@@ -1,6 +1,9 @@
 #include "jtime.h"
 #include "celestrak/sgp4/SGP4.h"
 #include "celestrak/mathtimelib/MathTimeLib.h"
+#include "celestrak/astrolib/AstroLib.h"
+
+void calc_teme_ecef_rotation(jtime *jt);
 
 jtime calculate_jtime(
     int p_year, int p_month, int p_day,
@@ -32,6 +35,41 @@ jtime calculate_jtime(
     out.jdut1Frac = jdut1Frac;
     out.ttt = ttt;
 
+    calc_teme_ecef_rotation(&out);
+
     // printf("offset=%03d, jd=%lf, jd_frac=%lf, jdut1=%lf, jdut1Frac=%lf, ttt=%lf\n", offset, out.jd, out.jd_frac, out.jdut1, out.jdut1Frac, out.ttt);
     return out;
 }
+
+/*
+ * The TEME to ECEF rotation depends only on the time, so it is worked out once here
+ * rather than for every satellite.  Rotating each unit vector with teme_ecef gives the
+ * columns of the rotation, and with a zero velocity, the columns of the rate term.
+ */
+void calc_teme_ecef_rotation(jtime *jt)
+{
+    double conv = pi / (180.0*3600.0);
+    int eqeterms = 2;  // terms for equation of the equinoxes
+    double lod = 0.0015563; // sec
+    // Can we get these from https://eop2-external.jpl.nasa.gov/ ?
+    // Tool to do it? https://docs.astropy.org/en/stable/utils/iers.html
+    // double xp   = -0.140682 * conv;  // polar motion values in rad from arcsec
+    // double yp   =  0.333309 * conv;
+    double xp   = 0.0782 * conv;  // polar motion values in rad from arcsec
+    double yp   = 0.3566 * conv;  // 2026-02-05 https://www.iers.org/IERS/EN/DataProducts/tools/eop_of_today/eop_of_today_tool.html
+
+    for (int col = 0; col < 3; col++) {
+        double rteme[3] = {0.0, 0.0, 0.0};
+        double vteme[3] = {0.0, 0.0, 0.0};
+        double ateme[3] = {0.0, 0.0, 0.0};
+        double recef[3], vecef[3], aecef[3];
+        rteme[col] = 1.0;
+
+        teme_ecef(rteme, vteme, ateme, eTo, recef, vecef, aecef, jt->ttt, jt->jdut1 + jt->jdut1Frac, lod, xp, yp, eqeterms);
+
+        for (int row = 0; row < 3; row++) {
+            jt->teme_ecef[row*3 + col] = recef[row];
+            jt->teme_ecef_rate[row*3 + col] = vecef[row];
+        }
+    }
+}
@@ -0,0 +1,289 @@
+""" Satellite catalogue
+
+The TLE records fetched by tle_fetch.py are compiled by tle_ingest.py into a single binary
+file, so they can be loaded without opening a pair of files and parsing a record for each
+satellite.
+
+The file is a header, a table of named sections, then the sections themselves, each
+starting on a 64 byte boundary:
+
+ * layout: the layout of the tle records, which must match the tle struct on the device.
+ * tle: the tle records, laid out as the aligned tle struct, ready to copy to the device.
+ * norad_ids: the NORAD id of each satellite, NORAD_ID_WIDTH bytes each.
+ * name_offsets and names: where the name of each satellite starts in the UTF-8 names,
+   followed by the end of the last.
+ * tag_offsets and tag_names: the same, for each different tag.  The tags of a satellite are
+   the lines at the end of its description, after the last blank line.
+ * tag_bits: a bitset of the tags of each satellite, TAG_WORD_BITS tags to a word.
+ * desc_offsets and descriptions: the same, for the description of each satellite.
+ * tle_lines: the two element lines of each satellite, tle.LINE_LENGTH characters each, for
+   parsing on the device.
+"""
+import os
+import numpy as np
+import tle
+
+CATALOGUE_PATH = './caches/catalogue.bin'
+
+MAGIC = b'SKYSCAPE-CAT'
+VERSION = 3
+SECTION_ALIGNMENT = 64
+
+LAYOUT_SECTION = 'layout'
+TLE_SECTION = 'tle'
+NORAD_IDS_SECTION = 'norad_ids'
+NAME_OFFSETS_SECTION = 'name_offsets'
+NAMES_SECTION = 'names'
+TAG_OFFSETS_SECTION = 'tag_offsets'
+TAG_NAMES_SECTION = 'tag_names'
+TAG_BITS_SECTION = 'tag_bits'
+DESC_OFFSETS_SECTION = 'desc_offsets'
+DESCRIPTIONS_SECTION = 'descriptions'
+TLE_LINES_SECTION = 'tle_lines'
+
+# The details of each satellite, as given to write_catalogue and got from SatInfo.  The tags
+# are the text of its description.
+NORAD_ID = 'norad_id'
+NAME = 'name'
+TAGS = 'tags'
+
+# As in columns 3 to 7 of the element lines.
+NORAD_ID_WIDTH = 5
+TAG_WORD_BITS = 64
+
+_HEADER_DTYPE = np.dtype([
+    ('magic', 'S16'),
+    ('version', '<u4'),
+    ('n_records', '<u4'),
+    ('n_sections', '<u4'),
+    ('reserved', '<u4'),
+])
+
+_SECTION_DTYPE = np.dtype([
+    ('name', 'S16'),
+    ('offset', '<u8'),
+    ('nbytes', '<u8'),
+])
+
+def build_catalogue_tle_dtype():
+    """ The tle records as stored in the catalogue, aligned as they are in the C struct. """
+    return np.dtype(tle.build_tle_dtype().descr, align=True)
+
+def layout_of(dtype):
+    """ Text describing the size and field offsets of a record, to check the catalogue's
+        records are laid out as the device expects.
+    """
+    fields = ','.join('{}:{}:{}'.format(name, dtype.fields[name][1], dtype.fields[name][0].str)
+                      for name in dtype.names)
+    return '{};{}'.format(dtype.itemsize, fields)
+
+class StringTable:
+    """ Strings decoded from UTF-8 text only when asked for, using the offset of each in the
+        text, followed by the end of the last.
+    """
+    def __init__(self, offsets, text):
+        self._offsets = offsets
+        self._text = text
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        return bytes(self._text[self._offsets[index]:self._offsets[index + 1]]).decode()
+
+class SatInfo:
+    """ The details of the satellites, kept in columns mapped from the catalogue.  The NORAD
+        ids are a fixed width array and the tags a bitset for each satellite, so satellites
+        can be picked out by either without decoding strings.  A name or description is only
+        decoded when asked for.
+    """
+    def __init__(self, norad_ids, names, tag_names, tag_bits, descriptions):
+        self._norad_ids = norad_ids
+        self._names = names
+        self._descriptions = descriptions
+        self.tag_names = [tag_names[i] for i in range(len(tag_names))]
+        self._tag_bits = tag_bits
+
+    def __len__(self):
+        return len(self._norad_ids)
+
+    def __getitem__(self, satrec_index):
+        return {NORAD_ID: self._norad_ids[satrec_index].decode(),
+                NAME: self._names[satrec_index],
+                TAGS: self._descriptions[satrec_index]}
+
+    def norad_ids(self):
+        """ The NORAD id of every satellite. """
+        return self._norad_ids.astype(str).tolist()
+
+    def tag_mask(self, tag):
+        """ Whether each satellite has the tag. """
+        if tag not in self.tag_names:
+            return np.zeros(len(self), bool)
+        tag_id = self.tag_names.index(tag)
+        word = self._tag_bits[:, tag_id // TAG_WORD_BITS]
+        return (word >> np.uint64(tag_id % TAG_WORD_BITS)) & np.uint64(1) != 0
+
+    def tags_of(self, satrec_index):
+        """ The tags of a satellite. """
+        return [tag for tag_id, tag in enumerate(self.tag_names)
+                if (int(self._tag_bits[satrec_index, tag_id // TAG_WORD_BITS]) >> (tag_id % TAG_WORD_BITS)) & 1]
+
+def description_tags(description):
+    """ The tags at the end of a description, one to a line after the last blank line. """
+    lines = description.splitlines()
+    blank_lines = [i for i, line in enumerate(lines) if line.strip() == '']
+    tag_lines = lines[blank_lines[-1] + 1:] if blank_lines else lines
+    return [line.strip() for line in tag_lines if line.strip() != '']
+
+def write_catalogue(path, tle_array, sat_info, tle_lines=None):
+    """ Writes the records and their strings, and the lines they were parsed from if given, as
+        a catalogue.  It is written aside and then moved into place, so a reader never sees half
+        a catalogue.
+    """
+    tle_dtype = build_catalogue_tle_dtype()
+    records = np.zeros(len(tle_array), tle_dtype)
+    for name in tle_dtype.names:
+        records[name] = tle_array[name]
+
+    norad_ids = [info[NORAD_ID].encode() for info in sat_info]
+    for norad_id in norad_ids:
+        if len(norad_id) > NORAD_ID_WIDTH:
+            raise Exception("NORAD id {} is longer than {} characters".format(norad_id.decode(), NORAD_ID_WIDTH))
+
+    # Each different tag is given an id, a bit in the bitsets.
+    tag_ids = {}
+    tags = [description_tags(info[TAGS]) for info in sat_info]
+    for satellite_tags in tags:
+        for tag in satellite_tags:
+            tag_ids.setdefault(tag, len(tag_ids))
+    tag_bits = np.zeros((len(sat_info), max(1, -(-len(tag_ids) // TAG_WORD_BITS))), '<u8')
+    for satrec_index, satellite_tags in enumerate(tags):
+        for tag in satellite_tags:
+            tag_id = tag_ids[tag]
+            tag_bits[satrec_index, tag_id // TAG_WORD_BITS] |= np.uint64(1 << (tag_id % TAG_WORD_BITS))
+
+    name_offsets, names = _string_table([info[NAME] for info in sat_info])
+    tag_offsets, tag_names = _string_table(list(tag_ids))
+    desc_offsets, descriptions = _string_table([info[TAGS] for info in sat_info])
+
+    sections = [
+        (LAYOUT_SECTION, layout_of(tle_dtype).encode()),
+        (TLE_SECTION, records.tobytes()),
+        (NORAD_IDS_SECTION, np.array(norad_ids, 'S{}'.format(NORAD_ID_WIDTH)).tobytes()),
+        (NAME_OFFSETS_SECTION, name_offsets),
+        (NAMES_SECTION, names),
+        (TAG_OFFSETS_SECTION, tag_offsets),
+        (TAG_NAMES_SECTION, tag_names),
+        (TAG_BITS_SECTION, tag_bits.tobytes()),
+        (DESC_OFFSETS_SECTION, desc_offsets),
+        (DESCRIPTIONS_SECTION, descriptions),
+    ]
+    if tle_lines is not None:
+        sections.append((TLE_LINES_SECTION, np.ascontiguousarray(tle_lines, np.uint8).tobytes()))
+
+    header = np.zeros(1, _HEADER_DTYPE)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['n_records'] = len(records)
+    header['n_sections'] = len(sections)
+
+    table = np.zeros(len(sections), _SECTION_DTYPE)
+    offset = _align(header.nbytes + table.nbytes)
+    for i, (name, data) in enumerate(sections):
+        table[i] = (name.encode(), offset, len(data))
+        offset = _align(offset + len(data))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(header.tobytes())
+        file.write(table.tobytes())
+        for (_, data), section in zip(sections, table):
+            file.seek(int(section['offset']))
+            file.write(data)
+    os.replace(tmp_path, path)
+
+def read_catalogue(path, tle_dtype):
+    """ Maps the catalogue's tle records as an array of tle_dtype, the device's tle struct,
+        and returns them with the satellites' SatInfo.
+    """
+    return _catalogue_of(path, read_sections(path), tle_dtype)
+
+def read_tle_lines(path):
+    """ Maps the element lines of each satellite, as an array of characters indexed by
+        (satellite, line, column).
+    """
+    return _tle_lines_of(path, read_sections(path))
+
+def read_catalogue_and_tle_lines(path, tle_dtype):
+    """ The tle records and SatInfo of read_catalogue, and the element lines of read_tle_lines,
+        all from the one catalogue, even if it is replaced while they are read.
+    """
+    sections = read_sections(path)
+    tle_array, sat_info = _catalogue_of(path, sections, tle_dtype)
+    return (tle_array, sat_info, _tle_lines_of(path, sections),)
+
+def _catalogue_of(path, sections, tle_dtype):
+    layout = bytes(sections[LAYOUT_SECTION]).decode()
+    if layout != layout_of(tle_dtype):
+        raise ValueError("Catalogue {} records are laid out as {}, not as the device's tle struct {}. Run make tle-fetch to rebuild it."
+                         .format(path, layout, layout_of(tle_dtype)))
+
+    tle_array = sections[TLE_SECTION].view(tle_dtype)
+    norad_ids = sections[NORAD_IDS_SECTION].view('S{}'.format(NORAD_ID_WIDTH))
+    sat_info = SatInfo(norad_ids,
+                       StringTable(sections[NAME_OFFSETS_SECTION].view('<u4'), sections[NAMES_SECTION]),
+                       StringTable(sections[TAG_OFFSETS_SECTION].view('<u4'), sections[TAG_NAMES_SECTION]),
+                       sections[TAG_BITS_SECTION].view('<u8').reshape(len(norad_ids), -1),
+                       StringTable(sections[DESC_OFFSETS_SECTION].view('<u4'), sections[DESCRIPTIONS_SECTION]))
+    if len(sat_info) != len(tle_array):
+        raise ValueError("Catalogue {} has {} records but details for {}".format(path, len(tle_array), len(sat_info)))
+    return (tle_array, sat_info,)
+
+def _tle_lines_of(path, sections):
+    if TLE_LINES_SECTION not in sections:
+        raise ValueError("Catalogue {} does not have the TLE lines. Run make tle-fetch to rebuild it.".format(path))
+    return sections[TLE_LINES_SECTION].reshape(-1, 2, tle.LINE_LENGTH)
+
+def read_sections(path):
+    """ The catalogue's sections, by name, as byte arrays mapped from the file.  The file is
+        mapped once, so they all come from the same catalogue, even if it is replaced.
+    """
+    if os.path.getsize(path) < _HEADER_DTYPE.itemsize:
+        raise ValueError("{} is not a satellite catalogue".format(path))
+    contents = np.memmap(path, np.uint8, mode='r')
+
+    header = contents[:_HEADER_DTYPE.itemsize].view(_HEADER_DTYPE)
+    if header[0]['magic'] != MAGIC:
+        raise ValueError("{} is not a satellite catalogue".format(path))
+    if header[0]['version'] != VERSION:
+        raise ValueError("Catalogue {} is version {}, expected {}. Run make tle-fetch to rebuild it."
+                         .format(path, header[0]['version'], VERSION))
+
+    table_end = _HEADER_DTYPE.itemsize + int(header[0]['n_sections']) * _SECTION_DTYPE.itemsize
+    table = contents[_HEADER_DTYPE.itemsize:table_end].view(_SECTION_DTYPE)
+    sections = {}
+    for section in table:
+        offset = int(section['offset'])
+        sections[section['name'].decode()] = contents[offset:offset + int(section['nbytes'])]
+    return sections
+
+def compile_tle_lines(path, tle_names, line1, line2, sat_info):
+    """ Parses the element lines of the satellites and writes them, with their details, as a
+        catalogue.  The names are only used in error messages.
+    """
+    # Parsed all at once.
+    line1 = tle.to_fixed_width(line1)
+    line2 = tle.to_fixed_width(line2)
+    tle_array = tle.parse_tle_lines(tle_names, line1, line2, build_catalogue_tle_dtype())
+    write_catalogue(path, tle_array, sat_info, np.stack((line1, line2,), axis=1))
+    return len(tle_array)
+
+def _string_table(strings):
+    encoded = [string.encode() for string in strings]
+    offsets = np.zeros(len(encoded) + 1, '<u4')
+    offsets[1:] = np.cumsum([len(string) for string in encoded])
+    return (offsets.tobytes(), b''.join(encoded),)
+
+def _align(offset):
+    return (offset + SECTION_ALIGNMENT - 1) // SECTION_ALIGNMENT * SECTION_ALIGNMENT
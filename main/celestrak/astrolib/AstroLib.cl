@@ -7710,212 +7710,215 @@
 //
 //
 //
-//	/* ------------------------------------------------------------------------------
-//	*
-//	*                           function sun
-//	*
-//	*  this function calculates the geocentric equatorial position vector
-//	*    the sun given the julian date. Sergey K (2022) has noted that improved results
-//	*    are found assuming the oputput is in a precessing frame (TEME) and converting to ICRF.
-//	*    this is the low precision formula and is valid for years from 1950 to 2050.
-//	*    accuaracy of apparent coordinates is about 0.01 degrees.  notice many of
-//	*    the calculations are performed in degrees, and are not changed until later.
-//	*    this is due to the fact that the almanac uses degrees exclusively in their formulations.
-//	*
-//	*  author        : david vallado                  719-573-2600   27 may 2002
-//	*
-//	*  revisions
-//	*    vallado     - fix mean lon of sun                            7 may 2004
-//	*
-//	*  inputs          description                                   range / units
-//	*    jdtdb         - epoch julian date                         days from 4713 BC
-//	*    jdtdbF        - epoch julian date fraction                day fraction from jdutc
-//	*
-//	*  outputs       :
-//	*    rsun        -  position vector of the sun                 au
-//	*    rtasc       - right ascension                             rad
-//	*    decl        - declination                                 rad
-//	*
-//	*  locals        :
-//	*    meanlong    - mean longitude
-//	*    meananomaly - mean anomaly
-//	*    eclplong    - ecliptic longitude
-//	*    obliquity   - mean obliquity of the ecliptic
-//	*    tut1        - julian centuries of ut1 from
-//	*                  jan 1, 2000 12h
-//	*    ttdb        - julian centuries of tdb from
-//	*                  jan 1, 2000 12h
-//	*    hr          - hours                                       0 .. 24              10
-//	*    min         - minutes                                     0 .. 59              15
-//	*    sec         - seconds                                     0.0  .. 59.99          30.00
-//	*    temp        - temporary variable
-//	*    deg         - degrees
-//	*
-//	*  coupling      :
-//	*    none.
-//	*
-//	*  references    :
-//	*    vallado       2013, 279, alg 29, ex 5-1
-//	* --------------------------------------------------------------------------- */
-//
-//	void sun
-//	(
-//		double jdtdb, double jdtdbF,
-//		double rsun[3], double& rtasc, double& decl
-//	)
-//	{
-//		double deg2rad;
-//		double tut1, meanlong, ttdb, meananomaly, eclplong, obliquity, magr;
-//
-//		deg2rad = pi / 180.0;
-//
-//		// -------------------------  implementation   -----------------
-//		// -------------------  initialize values   --------------------
-//		tut1 = (jdtdb + jdtdbF - 2451545.0) / 36525.0;
-//
-//		meanlong = 280.460 + 36000.77 * tut1;
-//		meanlong = fmod(meanlong, 360.0);  //deg
-//
-//		ttdb = tut1;
-//		meananomaly = 357.5277233 + 35999.05034 * ttdb;
-//		meananomaly = fmod(meananomaly * deg2rad, twopi);  //rad
-//		if (meananomaly < 0.0)
-//		{
-//			meananomaly = twopi + meananomaly;
-//		}
-//		eclplong = meanlong + 1.914666471 * sin(meananomaly)
-//			+ 0.019994643 * sin(2.0 * meananomaly); //deg
-//		obliquity = 23.439291 - 0.0130042 * ttdb;  //deg
-//		meanlong = meanlong * deg2rad;
-//		if (meanlong < 0.0)
-//		{
-//			meanlong = twopi + meanlong;
-//		}
-//		eclplong = eclplong * deg2rad;
-//		obliquity = obliquity * deg2rad;
-//
-//		// --------- find magnitude of sun vector, ) components ------
-//		magr = 1.000140612 - 0.016708617 * cos(meananomaly)
-//			- 0.000139589 * cos(2.0 *meananomaly);    // in au's
-//
-//		rsun[0] = magr * cos(eclplong);
-//		rsun[1] = magr * cos(obliquity) * sin(eclplong);
-//		rsun[2] = magr * sin(obliquity) * sin(eclplong);
-//
-//		rtasc = atan(cos(obliquity) * tan(eclplong));
-//
-//		// --- check that rtasc is in the same quadrant as eclplong ----
-//		if (eclplong < 0.0)
-//		{
-//			eclplong = eclplong + twopi;    // make sure it's in 0 to 2pi range
-//		}
-//		if (fabs(eclplong - rtasc) > pi * 0.5)
-//		{
-//			rtasc = rtasc + 0.5 * pi * MathTimeLib::round((eclplong - rtasc) / (0.5 * pi));
-//		}
-//		decl = asin(sin(obliquity) * sin(eclplong));
-//
-//	}  // sun
-//
-//
-//
-//	/* -----------------------------------------------------------------------------
-//	*
-//	*                           function moon
-//	*
-//	*  this function calculates the geocentric equatorial (ijk) position vector
-//	*    for the moon given the julian date.
-//	*
-//	*  author        : david vallado                  719-573-2600   27 may 2002
-//	*
-//	*  revisions
-//	*                -
-//	*
-//	*  inputs          description                            range / units
-//	*    jdtdb         - epoch julian date                    days from 4713 BC
-//	*    jdtdbF        - epoch julian date fraction            day fraction from jdutc
-//	*
-//	*  outputs       :
-//	*    rmoon       -  position vector of moon                    km
-//	*    rtasc       - right ascension                             rad
-//	*    decl        - declination                                 rad
-//	*
-//	*  locals        :
-//	*    eclplong    - ecliptic longitude
-//	*    eclplat     - eclpitic latitude
-//	*    hzparal     - horizontal parallax
-//	*    L           - geocentric direction cosines
-//	*    m           -             "     "
-//	*    n           -             "     "
-//	*    ttdb        - julian centuries of tdb from
-//	*                  jan 1, 2000 12h
-//	*    hr          - hours                                       0 .. 24
-//	*    min         - minutes                                     0 .. 59
-//	*    sec         - seconds                                     0.0  .. 59.99
-//	*    deg         - degrees
-//	*
-//	*  coupling      :
-//	*    none.
-//	*
-//	*  references    :
-//	*    vallado       2013, 288, alg 31, ex 5-3
-//	* --------------------------------------------------------------------------- */
+	/* ------------------------------------------------------------------------------
+	*
+	*                           function sun
+	*
+	*  this function calculates the geocentric equatorial position vector
+	*    the sun given the julian date. Sergey K (2022) has noted that improved results
+	*    are found assuming the oputput is in a precessing frame (TEME) and converting to ICRF.
+	*    this is the low precision formula and is valid for years from 1950 to 2050.
+	*    accuaracy of apparent coordinates is about 0.01 degrees.  notice many of
+	*    the calculations are performed in degrees, and are not changed until later.
+	*    this is due to the fact that the almanac uses degrees exclusively in their formulations.
+	*
+	*  author        : david vallado                  719-573-2600   27 may 2002
+	*
+	*  revisions
+	*    vallado     - fix mean lon of sun                            7 may 2004
+	*
+	*  inputs          description                                   range / units
+	*    jdtdb         - epoch julian date                         days from 4713 BC
+	*    jdtdbF        - epoch julian date fraction                day fraction from jdutc
+	*
+	*  outputs       :
+	*    rsun        -  position vector of the sun                 au
+	*    rtasc       - right ascension                             rad
+	*    decl        - declination                                 rad
+	*
+	*  locals        :
+	*    meanlong    - mean longitude
+	*    meananomaly - mean anomaly
+	*    eclplong    - ecliptic longitude
+	*    obliquity   - mean obliquity of the ecliptic
+	*    tut1        - julian centuries of ut1 from
+	*                  jan 1, 2000 12h
+	*    ttdb        - julian centuries of tdb from
+	*                  jan 1, 2000 12h
+	*    hr          - hours                                       0 .. 24              10
+	*    min         - minutes                                     0 .. 59              15
+	*    sec         - seconds                                     0.0  .. 59.99          30.00
+	*    temp        - temporary variable
+	*    deg         - degrees
+	*
+	*  coupling      :
+	*    none.
+	*
+	*  references    :
+	*    vallado       2013, 279, alg 29, ex 5-1
+	* --------------------------------------------------------------------------- */
+
+	void sun
+	(
+		double jdtdb, double jdtdbF,
+		double rsun[3], double* rtasc, double* decl
+	)
+	{
+		const double twopi = (2.0 * pi);
+		double deg2rad;
+		double tut1, meanlong, ttdb, meananomaly, eclplong, obliquity, magr;
+
+		deg2rad = pi / 180.0;
+
+		// -------------------------  implementation   -----------------
+		// -------------------  initialize values   --------------------
+		tut1 = (jdtdb + jdtdbF - 2451545.0) / 36525.0;
+
+		meanlong = 280.460 + 36000.77 * tut1;
+		meanlong = fmod(meanlong, 360.0);  //deg
+
+		ttdb = tut1;
+		meananomaly = 357.5277233 + 35999.05034 * ttdb;
+		meananomaly = fmod(meananomaly * deg2rad, twopi);  //rad
+		if (meananomaly < 0.0)
+		{
+			meananomaly = twopi + meananomaly;
+		}
+		eclplong = meanlong + 1.914666471 * sin(meananomaly)
+			+ 0.019994643 * sin(2.0 * meananomaly); //deg
+		obliquity = 23.439291 - 0.0130042 * ttdb;  //deg
+		meanlong = meanlong * deg2rad;
+		if (meanlong < 0.0)
+		{
+			meanlong = twopi + meanlong;
+		}
+		eclplong = eclplong * deg2rad;
+		obliquity = obliquity * deg2rad;
+
+		// --------- find magnitude of sun vector, ) components ------
+		magr = 1.000140612 - 0.016708617 * cos(meananomaly)
+			- 0.000139589 * cos(2.0 *meananomaly);    // in au's
+
+		rsun[0] = magr * cos(eclplong);
+		rsun[1] = magr * cos(obliquity) * sin(eclplong);
+		rsun[2] = magr * sin(obliquity) * sin(eclplong);
+
+		*rtasc = atan(cos(obliquity) * tan(eclplong));
+
+		// --- check that rtasc is in the same quadrant as eclplong ----
+		if (eclplong < 0.0)
+		{
+			eclplong = eclplong + twopi;    // make sure it's in 0 to 2pi range
+		}
+		if (fabs(eclplong - *rtasc) > pi * 0.5)
+		{
+			*rtasc = *rtasc + 0.5 * pi * round((eclplong - *rtasc) / (0.5 * pi));
+		}
+		*decl = asin(sin(obliquity) * sin(eclplong));
+
+	}  // sun
 //
-//	void moon
-//	(
-//		double jdtdb, double jdtdbF,
-//		double rmoon[3], double& rtasc, double& decl
-//	)
-//	{
-//		double deg2rad, magr;
-//		double ttdb, l, m, n, eclplong, eclplat, hzparal, obliquity;
 //
-//		deg2rad = pi / 180.0;
 //
-//		// -------------------------  implementation   -----------------
-//		ttdb = (jdtdb + jdtdbF - 2451545.0) / 36525.0;
-//
-//		eclplong = 218.32 + 481267.8813 * ttdb
-//			+ 6.29 * sin((134.9 + 477198.85 * ttdb) * deg2rad)
-//			- 1.27 * sin((259.2 - 413335.38 * ttdb) * deg2rad)
-//			+ 0.66 * sin((235.7 + 890534.23 * ttdb) * deg2rad)
-//			+ 0.21 * sin((269.9 + 954397.70 * ttdb) * deg2rad)
-//			- 0.19 * sin((357.5 + 35999.05 * ttdb) * deg2rad)
-//			- 0.11 * sin((186.6 + 966404.05 * ttdb) * deg2rad);      // deg
-//
-//		eclplat = 5.13 * sin((93.3 + 483202.03 * ttdb) * deg2rad)
-//			+ 0.28 * sin((228.2 + 960400.87 * ttdb) * deg2rad)
-//			- 0.28 * sin((318.3 + 6003.18 * ttdb) * deg2rad)
-//			- 0.17 * sin((217.6 - 407332.20 * ttdb) * deg2rad);      // deg
-//
-//		hzparal = 0.9508 + 0.0518 * cos((134.9 + 477198.85 * ttdb)
-//			* deg2rad)
-//			+ 0.0095 * cos((259.2 - 413335.38 * ttdb) * deg2rad)
-//			+ 0.0078 * cos((235.7 + 890534.23 * ttdb) * deg2rad)
-//			+ 0.0028 * cos((269.9 + 954397.70 * ttdb) * deg2rad);    // deg
-//
-//		eclplong = fmod(eclplong * deg2rad, twopi);
-//		eclplat = fmod(eclplat * deg2rad, twopi);
-//		hzparal = fmod(hzparal * deg2rad, twopi);
-//
-//		obliquity = 23.439291 - 0.0130042 * ttdb;  //deg
-//		obliquity = obliquity * deg2rad;
-//
-//		// ------------ find the geocentric direction cosines ----------
-//		l = cos(eclplat) * cos(eclplong);
-//		m = cos(obliquity) * cos(eclplat) * sin(eclplong) - sin(obliquity) * sin(eclplat);
-//		n = sin(obliquity) * cos(eclplat) * sin(eclplong) + cos(obliquity) * sin(eclplat);
-//
-//		// ------------- calculate moon position vector ----------------
-//		magr = re / sin(hzparal);  // km
-//		rmoon[0] = magr * l;
-//		rmoon[1] = magr * m;
-//		rmoon[2] = magr * n;
-//
-//		// -------------- find rt ascension and declination ------------
-//		rtasc = atan2(m, l);
-//		decl = asin(n);
-//	}  // moon
+	/* -----------------------------------------------------------------------------
+	*
+	*                           function moon
+	*
+	*  this function calculates the geocentric equatorial (ijk) position vector
+	*    for the moon given the julian date.
+	*
+	*  author        : david vallado                  719-573-2600   27 may 2002
+	*
+	*  revisions
+	*                -
+	*
+	*  inputs          description                            range / units
+	*    jdtdb         - epoch julian date                    days from 4713 BC
+	*    jdtdbF        - epoch julian date fraction            day fraction from jdutc
+	*
+	*  outputs       :
+	*    rmoon       -  position vector of moon                    km
+	*    rtasc       - right ascension                             rad
+	*    decl        - declination                                 rad
+	*
+	*  locals        :
+	*    eclplong    - ecliptic longitude
+	*    eclplat     - eclpitic latitude
+	*    hzparal     - horizontal parallax
+	*    L           - geocentric direction cosines
+	*    m           -             "     "
+	*    n           -             "     "
+	*    ttdb        - julian centuries of tdb from
+	*                  jan 1, 2000 12h
+	*    hr          - hours                                       0 .. 24
+	*    min         - minutes                                     0 .. 59
+	*    sec         - seconds                                     0.0  .. 59.99
+	*    deg         - degrees
+	*
+	*  coupling      :
+	*    none.
+	*
+	*  references    :
+	*    vallado       2013, 288, alg 31, ex 5-3
+	* --------------------------------------------------------------------------- */
+
+	void moon
+	(
+		double jdtdb, double jdtdbF,
+		double rmoon[3], double* rtasc, double* decl
+	)
+	{
+		const double twopi = (2.0 * pi);
+		const double re = 6378.1363;              // km  stk uses .1363
+		double deg2rad, magr;
+		double ttdb, l, m, n, eclplong, eclplat, hzparal, obliquity;
+
+		deg2rad = pi / 180.0;
+
+		// -------------------------  implementation   -----------------
+		ttdb = (jdtdb + jdtdbF - 2451545.0) / 36525.0;
+
+		eclplong = 218.32 + 481267.8813 * ttdb
+			+ 6.29 * sin((134.9 + 477198.85 * ttdb) * deg2rad)
+			- 1.27 * sin((259.2 - 413335.38 * ttdb) * deg2rad)
+			+ 0.66 * sin((235.7 + 890534.23 * ttdb) * deg2rad)
+			+ 0.21 * sin((269.9 + 954397.70 * ttdb) * deg2rad)
+			- 0.19 * sin((357.5 + 35999.05 * ttdb) * deg2rad)
+			- 0.11 * sin((186.6 + 966404.05 * ttdb) * deg2rad);      // deg
+
+		eclplat = 5.13 * sin((93.3 + 483202.03 * ttdb) * deg2rad)
+			+ 0.28 * sin((228.2 + 960400.87 * ttdb) * deg2rad)
+			- 0.28 * sin((318.3 + 6003.18 * ttdb) * deg2rad)
+			- 0.17 * sin((217.6 - 407332.20 * ttdb) * deg2rad);      // deg
+
+		hzparal = 0.9508 + 0.0518 * cos((134.9 + 477198.85 * ttdb)
+			* deg2rad)
+			+ 0.0095 * cos((259.2 - 413335.38 * ttdb) * deg2rad)
+			+ 0.0078 * cos((235.7 + 890534.23 * ttdb) * deg2rad)
+			+ 0.0028 * cos((269.9 + 954397.70 * ttdb) * deg2rad);    // deg
+
+		eclplong = fmod(eclplong * deg2rad, twopi);
+		eclplat = fmod(eclplat * deg2rad, twopi);
+		hzparal = fmod(hzparal * deg2rad, twopi);
+
+		obliquity = 23.439291 - 0.0130042 * ttdb;  //deg
+		obliquity = obliquity * deg2rad;
+
+		// ------------ find the geocentric direction cosines ----------
+		l = cos(eclplat) * cos(eclplong);
+		m = cos(obliquity) * cos(eclplat) * sin(eclplong) - sin(obliquity) * sin(eclplat);
+		n = sin(obliquity) * cos(eclplat) * sin(eclplong) + cos(obliquity) * sin(eclplat);
+
+		// ------------- calculate moon position vector ----------------
+		magr = re / sin(hzparal);  // km
+		rmoon[0] = magr * l;
+		rmoon[1] = magr * m;
+		rmoon[2] = magr * n;
+
+		// -------------- find rt ascension and declination ------------
+		*rtasc = atan2(m, l);
+		*decl = asin(n);
+	}  // moon
 //
 
 	// IOD type routines -----------------------------------------------------
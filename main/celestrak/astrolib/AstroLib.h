@@ -440,11 +440,11 @@ typedef enum
 //		double rmoon[3], double& rmmag
 //	);
 //
-//	void sun
-//	(
-//		double jdtdb, double jdtdbF,
-//		double rsun[3], double& rtasc, double& decl
-//	);
+	void sun
+	(
+		double jdtdb, double jdtdbF,
+		double rsun[3], double* rtasc, double* decl
+	);
 //
 //	void sunmoonjpl
 //	(
@@ -456,11 +456,11 @@ typedef enum
 //		double rmoon[3], double& rtascm, double& declm
 //	);
 //
-//	void moon
-//	(
-//		double jdtdb, double jdtdbF,
-//		double rmoon[3], double& rtasc, double& decl
-//	);
+	void moon
+	(
+		double jdtdb, double jdtdbF,
+		double rmoon[3], double* rtasc, double* decl
+	);
 //
 	// IOD type routines
 	void site
@@ -5,7 +5,8 @@
 /*
  * The original twoline2rv routine initialised the satrec struct directly
  * from the NORAD TLE (two line elements).
- * OpenCL does not support sscanf, so the tle struct provides the record items already parsed using Python.
+ * OpenCL does not support sscanf, so the tle struct provides the record items already parsed,
+ * either by Python or by parse_tle_kernel.cl.
  * Portions taken from original celestrak routine twoline2rv
  */
 void init_satrec(elsetrec* satrec, __global const tle *tle) {
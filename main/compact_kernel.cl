@@ -0,0 +1,47 @@
+/*
+ * Stream compaction: the values whose flag is set are copied, in order, to the start of
+ * compacted, and their number to n_compacted.  The count stays on the device, so later
+ * kernels can be launched for the most there could be and return early past it.
+ *
+ * It runs as a single work-group, stepping through the flags a work-group at a time with
+ * a scan (prefix sum) in local memory.  The lists are at most the size of the catalogue,
+ * so this is quicker than splitting the scan between work-groups.
+ */
+__kernel void compact_flagged(
+    int n,
+    __global const int *flags,
+    __global const int *values,
+    __global int *compacted,
+    __global int *n_compacted,
+    __local int *scan
+)
+{
+    const int lid = get_local_id(0);
+    const int size = get_local_size(0);
+
+    int total = 0;
+    for (int base = 0; base < n; base += size) {
+        const int i = base + lid;
+        const int flag = (i < n && flags[i]) ? 1 : 0;
+
+        // Inclusive scan of the flags in this step.
+        scan[lid] = flag;
+        barrier(CLK_LOCAL_MEM_FENCE);
+        for (int offset = 1; offset < size; offset *= 2) {
+            int add = lid >= offset ? scan[lid - offset] : 0;
+            barrier(CLK_LOCAL_MEM_FENCE);
+            scan[lid] += add;
+            barrier(CLK_LOCAL_MEM_FENCE);
+        }
+
+        if (flag) {
+            compacted[total + scan[lid] - 1] = values[i];
+        }
+        total += scan[size - 1];
+        barrier(CLK_LOCAL_MEM_FENCE);
+    }
+
+    if (lid == 0) {
+        *n_compacted = total;
+    }
+}
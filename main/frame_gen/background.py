@@ -0,0 +1,69 @@
+""" Background
+
+What the satellites are drawn over: a gradient that brightens towards the horizon so the
+projection looks domed, the horizon ring, and a grid of elevation rings and compass lines.
+It is built once for the image size and copied to the device, where each frame's channels
+are copied from it rather than cleared, so it costs nothing more per frame.
+
+The image is the sky looking up, as projected by generate_projections_kernel.cl: the zenith
+at the centre, the horizon the edge of the ellipse filling the image, north at the top and
+east to the left.
+"""
+import numpy as np
+import pyopencl as cl
+
+class Background:
+    def __init__(self, zenith_rgb=(0, 0, 0), horizon_rgb=(0, 0, 0), ring_rgb=None, grid_rgb=None,
+                 grid_elevations_deg=()):
+        """ ring_rgb and grid_rgb are None for no horizon ring or grid. """
+        self.zenith_rgb = zenith_rgb
+        self.horizon_rgb = horizon_rgb
+        self.ring_rgb = ring_rgb
+        self.grid_rgb = grid_rgb
+        self.grid_elevations_deg = grid_elevations_deg
+
+    def build_channels(self, width, height):
+        """ The background, as the red, green and blue channels of each pixel, indexed by
+            (y, x, channel).
+        """
+        radius_x = width / 2.0
+        radius_y = height / 2.0
+        # Pixels are drawn where the projection truncates to, so their centres are half a
+        # pixel on.
+        dx = np.arange(width) + 0.5 - radius_x
+        dy = np.arange(height)[:, np.newaxis] + 0.5 - radius_y
+        # The cosine of the elevation, 0 at the zenith and 1 on the horizon.
+        rho = np.sqrt((dx / radius_x) ** 2 + (dy / radius_y) ** 2)
+        # Roughly how many pixels away from the ring through a pixel it is.
+        pixels_per_rho = (radius_x + radius_y) / 2.0
+        above = rho <= 1.0
+
+        channels = np.zeros([height, width, 3], np.float32)
+        zenith = np.array(self.zenith_rgb, np.float32)
+        horizon = np.array(self.horizon_rgb, np.float32)
+        channels[above] = zenith + (horizon - zenith) * rho[above, np.newaxis] ** 2
+
+        if self.grid_rgb is not None:
+            for elevation in self.grid_elevations_deg:
+                _add_line(channels, (rho - np.cos(np.radians(elevation))) * pixels_per_rho, self.grid_rgb)
+            # North-south and east-west.
+            _add_line(channels, np.where(above, dx, np.inf), self.grid_rgb)
+            _add_line(channels, np.where(above, dy, np.inf), self.grid_rgb)
+        if self.ring_rgb is not None:
+            _add_line(channels, (rho - 1.0) * pixels_per_rho, self.ring_rgb)
+
+        return np.minimum(np.rint(channels), 255).astype(cl.cltypes.uint)
+
+def _add_line(channels, distance, rgb):
+    """ Adds a line a pixel wide, anti-aliased, along where distance, in pixels, is zero. """
+    weight = np.clip(1.0 - np.abs(distance), 0.0, 1.0)
+    channels += weight[..., np.newaxis] * np.array(rgb, np.float32)
+
+BLACK = Background()
+
+DEFAULT_BACKGROUND = Background(
+    zenith_rgb=(0, 0, 12),
+    horizon_rgb=(18, 28, 56),
+    ring_rgb=(90, 90, 110),
+    grid_rgb=(28, 28, 40),
+    grid_elevations_deg=(30, 60))
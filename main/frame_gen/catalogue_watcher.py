@@ -0,0 +1,28 @@
+import os
+
+class CatalogueWatcher:
+    """ Notices when the catalogue has been replaced, as it is by make tle-fetch.
+
+        The catalogue is written aside and moved into place, so a new one has a new inode, and
+        the one mapped by the frame generator is left as it was.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._identity = self._identity_of()
+
+    def changed(self):
+        """ Whether the catalogue has changed since this was last asked, or since it was created. """
+        identity = self._identity_of()
+        if identity == self._identity:
+            return False
+        self._identity = identity
+        # Not changed if it has gone, perhaps only for a moment.
+        return identity is not None
+
+    def _identity_of(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns,)
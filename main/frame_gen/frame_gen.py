@@ -1,12 +1,27 @@
-import glob
+import sys
+import threading
+from collections import deque
 import pyopencl as cl
 import numpy as np
 from datetime import datetime, timezone, timedelta
 import time as tm
 
 import tle
+import catalogue
 import dtype as dt
 import jtime
+import observer
+import point
+from frame_gen.pass_index import PassIndex
+from frame_gen import satrec_cache
+from frame_gen.catalogue_watcher import CatalogueWatcher
+from frame_gen.slot_map import SlotMap, SlotSatInfo
+from frame_gen.sat_filter import SatFilter
+from frame_gen import palette
+from frame_gen.palette import build_style_dtype
+from frame_gen import background
+from frame_gen import sky
+from frame_gen.projections import ProjectionsGenerator
 from gui.gui import IMAGE_HEIGHT, IMAGE_WIDTH
 
 # Current difference between UT1 and UTC (UT1-UTC).
@@ -15,6 +30,37 @@ from gui.gui import IMAGE_HEIGHT, IMAGE_WIDTH
 #UT1_UTC_DIFF_SECS=0.0939  # 2025-10-31
 UT1_UTC_DIFF_SECS=0.07024  # 2026-02-05
 
+# Where the sky is viewed from.  Each satellite is propagated once per frame
+# and then projected for all the sites, so extra sites cost little.
+SITES = [
+    observer.ROYAL_GREENWICH_OBSERVATORY,
+    # observer.CLOTH_HALL_LEEDS,
+    # observer.YORK,
+]
+
+# Which satellites are shown, for example only stations and visible objects:
+#   SatFilter(tags=['Space station', 'Visible'])
+# or everything in low earth orbit except the debris:
+#   SatFilter(regimes=[sat_filter.LEO], exclude_tags=['Debris'])
+# The rest are dropped on the host, so neither their passes nor projections are worked out.
+SAT_FILTER = SatFilter()
+
+# The colour and size each satellite is drawn, chosen by its tags and orbit (see palette.py).
+PALETTE = palette.DEFAULT_PALETTE
+
+# What the satellites are drawn over (see background.py), or background.BLACK for nothing.
+BACKGROUND = background.DEFAULT_BACKGROUND
+
+# Whether the sun, moon and stars are drawn behind the satellites, and how faint the stars
+# drawn are.  The stars are fetched by make star-fetch.
+SHOW_SKY=True
+STAR_MAX_MAGNITUDE=5.5
+
+# Frames of trail drawn behind each satellite, fading with age, or 0 for no trails.
+TRAIL_FRAMES=0
+# How bright the newest part of a trail is, compared with the satellite.
+TRAIL_INTENSITY=0.6
+
 # RGBA - red, green, blue & alpha.
 #IMAGE_CHANNELS=4
 
@@ -22,49 +68,201 @@ UT1_UTC_DIFF_SECS=0.07024  # 2026-02-05
 FRAME_PERIOD_SECS=0.25  # 4 frames per second
 
 # The number of images/frames generated in one pass.
-# Processing of intermediate for a satellite is skipped if both the first and last are not in view.
-# So the larger the number, the more efficient, but the greater danger of sats that should be in view
-# getting missed out.  We can assume that sats take at least 5 mins to cross the sky.
+# Satellites that cannot be above the horizon during the pass are dropped using a bound on how
+# fast they can move, so no pass is missed however long the batch.  Only points are kept for each
+# frame, so longer batches need little memory, but the first frame is longer coming.
 IMAGE_FRAMES=4*15  # 15 seconds at 4 FPS.
 
-def create_images(queue, flags, opencl_ctx):
+# Whether the TLEs are parsed on the device from the catalogue's raw lines, rather than
+# using the records parsed on the host when the catalogue was compiled.
+PARSE_TLES_ON_DEVICE=True
+
+# Where initialised satrecs are kept between runs, so sgp4init is only run for new or changed TLEs.
+SATREC_CACHE_DIR='caches/satrecs'
+
+# How often to look for a new catalogue.  Its new and changed satellites are swapped in
+# between batches, without restarting.
+CATALOGUE_CHECK_SECS=60
+
+# Whether the points have the satellite's latitude, longitude, altitude and speed, for the
+# details of the tracked satellite.
+GEODETIC_POINTS=True
+
+# Frames generated ahead of the gui.  Generation waits once there are this many, or they
+# hold this much memory, until the gui releases the frames it has displayed.
+# The images take most of the memory, 4 bytes a pixel for each site: about 4.5MiB a frame for
+# a site at 1080x1080.  So there is room for the points and about a batch of images, and the
+# generator is about a batch ahead rather than FRAME_RING_FRAMES.
+FRAME_RING_FRAMES=3*IMAGE_FRAMES
+FRAME_RING_BYTES=64*1024*1024 + IMAGE_FRAMES*len(SITES)*IMAGE_HEIGHT*IMAGE_WIDTH*4
+
+# Batches in flight.  The next batch is computed on the device while the frames of the last
+# are handed to the gui.
+N_BATCH_SLOTS=2
+
+# Initial room for points on the device in each batch.  It is doubled if there are more.
+INITIAL_MAX_POINTS=64*1024
+
+# Passes are predicted a window at a time, in the background, for the next window once the
+# last is less than the lookahead ahead.  Only the satellites with a pass in a batch are
+# projected.
+PASS_WINDOW_SECS=60*60
+PASS_LOOKAHEAD_SECS=30*60
+# How often a satellite near the horizon is sampled when looking for the start and end of a pass.
+PASS_STEP_SECS=10.0
+# Passes kept for each satellite in a window.  If there are more, the last runs to the end of the window.
+MAX_PASSES=8
+
+def create_images(frame_ring, flags, opencl_ctx):
     opencl = OpenCl(opencl_ctx)
-    satrec_size = _find_satrec_size(opencl)
 
     now = datetime.now(timezone.utc).replace(microsecond=0)
     start_time = now + timedelta(seconds=10)
 
-    # TODO: loop back to here at intervals. Perhaps do every loop but skip if inode not changed.
-    # Perhaps just update tle records that have changed.
-    tle_array, sat_info = _read_tle_files(opencl)
-
-    satrec_buf = _calc_satrecs(opencl, tle_array, satrec_size)
-    flags.satrec_buf = satrec_buf
+    # Watched from before it is read, so a catalogue replaced while it is read is reloaded.
+    watcher = CatalogueWatcher(catalogue.CATALOGUE_PATH)
+    tle_array, sat_info, tle_lines = _read_catalogue(opencl)
     n_tle = len(tle_array)
 
+    satrec_calculator = _SatrecCalculator(opencl)
+    satrecs = _init_satrecs(opencl, satrec_calculator, tle_array, tle_lines, sat_info)
+    satrec_buf = cl.Buffer(opencl.ctx, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR, hostbuf=satrecs)
+    flags.site_names = [site[0] for site in SITES]
+
     n_jtimes = IMAGE_FRAMES
     n_jtimes_seconds = timedelta(seconds=n_jtimes * FRAME_PERIOD_SECS)
     jTimeCalculator = _JTimeCalculator(opencl, n_jtimes, FRAME_PERIOD_SECS)
-    projectionsGenerator = _ProjectionsGenerator(opencl, n_jtimes, jTimeCalculator.jtime_buf, n_tle, satrec_buf)
+    observer_buf = _build_observer_buf(opencl, SITES)
+    projectionsGenerator = ProjectionsGenerator(opencl, n_jtimes, FRAME_PERIOD_SECS, jTimeCalculator.jtime_itemsize, n_tle,
+                                                satrec_buf, len(SITES), observer_buf, IMAGE_WIDTH, IMAGE_HEIGHT,
+                                                N_BATCH_SLOTS, INITIAL_MAX_POINTS, GEODETIC_POINTS)
+    frameRenderer = _FrameRenderer(opencl, projectionsGenerator.point_dtype, len(SITES), PALETTE,
+                                   BACKGROUND, TRAIL_FRAMES, TRAIL_INTENSITY)
+    frameRenderer.set_styles(PALETTE.style_indices(sat_info, tle_array))
+    skyProjector = None
+    if SHOW_SKY:
+        stars = _read_stars()
+        skyProjector = _SkyProjector(opencl, n_jtimes, len(SITES), observer_buf,
+                                     sky.star_directions(stars, jtime.julian_date(start_time)))
+        frameRenderer.set_sky(sky.build_sky_styles(stars, frameRenderer.style_dtype))
     frame_delta = timedelta(seconds=FRAME_PERIOD_SECS)
 
+    # Whether each satrec is shown, by SAT_FILTER.  Only those shown have their passes predicted
+    # and are projected.
+    shown = SAT_FILTER.mask(sat_info, tle_array)
+
+    # The pass predictor has its own command queue, so it can run while frames are generated.
+    pass_index = PassIndex()
+    pass_predictor = _PassPredictor(OpenCl(opencl.ctx), satrec_buf, len(SITES), observer_buf, shown)
+    predict_passes_thread = threading.Thread(target=_predict_passes,
+                                             args=(pass_index, pass_predictor, start_time, flags,))
+    predict_passes_thread.start()
+
+    # A new catalogue is prepared in the background, and swapped in between batches.
+    reloader = _CatalogueReloader(OpenCl(opencl.ctx), watcher, tle_lines, sat_info)
+    reload_thread = threading.Thread(target=reloader.watch, args=(flags,))
+    reload_thread.start()
+    update = None
+
+    # The slots of the batches enqueued on the device, oldest first.
+    in_flight = deque()
+    n_enqueued = 0
     while not flags.exiting:
-        # Don't work too far ahead.
-        while not flags.exiting and start_time > datetime.now(timezone.utc) + (3 * n_jtimes_seconds):
-            tm.sleep(1)
-        if flags.exiting:
-            break
-
-        jtimes_event = jTimeCalculator.calc_jtimes(start_time)
-        time = start_time
-        frames, infos = projectionsGenerator.generate_projections(jtimes_event)
-        for i_frame in range(n_jtimes):
+        if update is None:
+            update = reloader.take_update()
+        if update is not None and not in_flight:
+            # No batches are using the satrecs, so the reloaded catalogue can be swapped in.
+            satrec_buf = satrec_calculator.patch_satrecs(satrec_buf, n_tle, update)
+            n_tle = update.n_slots
+            projectionsGenerator.set_satrecs(satrec_buf, n_tle)
+            frameRenderer.set_styles(update.styles)
+            pass_predictor.set_satrecs(satrec_buf, update.changed_slots, update.shown)
+            sat_info = update.sat_info
+            shown = update.shown
+            update = None
+            continue
+
+        # Keep the device busy with the next batch while the frames of the last are handed over.
+        # How far ahead it works is bounded by the room in the frame ring.
+        if len(in_flight) < N_BATCH_SLOTS and update is None:
+            end_time = start_time + n_jtimes_seconds
+            # While the passes aren't predicted, a batch in flight is collected rather than waited behind.
+            if pass_index.wait_for_window(end_time.timestamp(), timeout=0 if in_flight else 1):
+                satrec_indices = pass_index.satellites_visible_between(start_time.timestamp(), end_time.timestamp())
+                # The passes may be from before a reload changed which are shown.
+                satrec_indices = satrec_indices[shown[satrec_indices]]
+
+                slot = projectionsGenerator.slots[n_enqueued % N_BATCH_SLOTS]
+                jtimes_event = jTimeCalculator.calc_jtimes(start_time, slot.jtime_buf)
+                projectionsGenerator.enqueue(slot, start_time, jtimes_event, satrec_indices)
+                if skyProjector is not None:
+                    skyProjector.enqueue(slot, jtimes_event)
+                in_flight.append(slot)
+                n_enqueued += 1
+                start_time += n_jtimes_seconds
+                continue
+            if not in_flight:
+                continue
+
+        slot = in_flight.popleft()
+        time = slot.start_time
+        points, positions, row_of_satrec = projectionsGenerator.collect(slot)
+        # The positions are shared by the frames of the batch, so each is charged its share.
+        shared_bytes = (positions.nbytes + row_of_satrec.nbytes) // n_jtimes
+        for i_frame, frame_points in enumerate(point.split_frames(points, n_jtimes)):
             time += frame_delta
-            frame = frames[i_frame]
-            info = infos[i_frame]
-            queue.put((time, frame, info, sat_info,))
+            # The points for all the sites.
+            frame_positions = point.FramePositions(positions[:, i_frame], row_of_satrec)
+            # The pixels for all the sites.
+            images = frameRenderer.render(frame_points, slot.sky_positions_buf, i_frame, slot.sky_event)
+            frame = (time, frame_points, frame_positions, sat_info, images,)
+            n_bytes = frame_points.nbytes + shared_bytes + images.nbytes
+            while not flags.exiting and not frame_ring.put(frame, n_bytes, timeout=1):
+                pass
+
+    predict_passes_thread.join()
+    reload_thread.join()
+
+def _predict_passes(pass_index, pass_predictor, window_start, flags):
+    """ Keeps the pass index ahead of the current time.  If that fails, everything is told to
+        exit, rather than waiting for passes that will never come.
+    """
+    try:
+        _keep_passes_ahead(pass_index, pass_predictor, window_start, flags)
+    except Exception as e:
+        flags.error = e
+        flags.exiting = True
+        raise
+
+def _keep_passes_ahead(pass_index, pass_predictor, window_start, flags):
+    window = timedelta(seconds=PASS_WINDOW_SECS)
+    lookahead = timedelta(seconds=PASS_LOOKAHEAD_SECS)
+    first_window_start = window_start
+    while not flags.exiting:
+        changed = pass_predictor.take_changed_satrecs()
+        if len(changed) > 0:
+            # The passes of satellites changed by a catalogue reload are predicted again, for the
+            # windows still in the index.
+            satrec_indices, aos, los = [], [], []
+            for start in (window_start - 2 * window, window_start - window):
+                if start >= first_window_start:
+                    window_passes = pass_predictor.predict_passes(start, PASS_WINDOW_SECS)
+                    in_changed = np.isin(window_passes[0], changed)
+                    for passes, window_pass in zip((satrec_indices, aos, los), window_passes):
+                        passes.append(window_pass[in_changed])
+            if satrec_indices:
+                pass_index.replace_satrecs(changed, np.concatenate(satrec_indices), np.concatenate(aos), np.concatenate(los))
+            continue
+
+        if window_start > datetime.now(timezone.utc) + lookahead:
+            tm.sleep(1)
+            continue
 
-        start_time += n_jtimes_seconds
+        satrec_indices, aos, los = pass_predictor.predict_passes(window_start, PASS_WINDOW_SECS)
+        # Keep the last window, the frames being generated may still be in it.
+        pass_index.add_window((window_start + window).timestamp(), satrec_indices, aos, los,
+                              discard_before=(window_start - window).timestamp())
+        window_start += window
 
 class OpenCl:
     def __init__(self, opencl_ctx):
@@ -73,93 +271,250 @@ class OpenCl:
         #self.queue = cl.CommandQueue(opencl_ctx, properties=cl.command_queue_properties.PROFILING_ENABLE)
         self.queue = cl.CommandQueue(opencl_ctx)
 
-def _read_tle_files(opencl):
-
-    # Todo remove fix of size !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-    tle_pathnames = sorted(glob.glob("./caches/tle/*.tle"))    ####[:49]
-
+def _read_catalogue(opencl):
+    """ The tle records, mapped from the catalogue laid out as the device's tle struct, the
+        satellites' NORAD ids, names and tags, and their element lines.
+    """
     tle_dtype = tle.build_tle_dtype()
     tle_dtype = dt.to_opencl_dtype(opencl.device, tle_dtype, 'tle', 'tle.h')
 
-    tle_array = np.empty(len(tle_pathnames), tle_dtype)
-
-    for i, tle_pathname in enumerate(tle_pathnames):
-        with open(tle_pathname, 'r') as file:
-            tle_lines = file.readlines()
-            if len(tle_lines) != 2:
-                raise Exception("{} does not have 2 lines".format(tle_pathname))
-
-        tle_dict = tle.parse_tle(tle_pathname, tle_lines[0].strip(), tle_lines[1].strip())
-        for key, value in tle_dict.items():
-            tle_array[i][key] = value
-
-    # return tle_array
-
-    sat_info = []
-    for i in range(0, len(tle_array)):
-        sat_num = tle_array[i]['satnum']
-        norad_id = ''
-        for c in sat_num:
-            if c < 1:
-                break
-            norad_id += chr(c)
-
-        desc_path = "./caches/tle/{}.desc".format(norad_id)
-        with open(desc_path, 'r') as file:
-            name = file.readline()
-            tags = ''
-            for t in file.readlines():
-                tags += t
-        sat_info.append({'norad_id':norad_id,'name':name,'tags':tags})
-
-    return (tle_array, sat_info,)
-
-def _find_satrec_size(opencl):
-    """ We don't know size of satrec struct for buffer, so we use opencl kernel to get it."""
-
-    program = cl.Program(
-        opencl.ctx, '#include "find_satrec_size_kernel.cl"'
-    ).build(
-        options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
-        cache_dir='caches/opencl_cachedir/'
-    )
-
-    output_array = np.empty(1, cl.cltypes.uint)
-    mf = cl.mem_flags
-    output_buf = cl.Buffer(opencl.ctx, mf.WRITE_ONLY, size=output_array.nbytes)
+    return catalogue.read_catalogue_and_tle_lines(catalogue.CATALOGUE_PATH, tle_dtype)
+
+def _read_stars():
+    """ The stars to draw, or none if there is no star catalogue. """
+    stars = sky.read_stars(sky.STAR_CATALOGUE_CACHE_PATH, STAR_MAX_MAGNITUDE)
+    if stars is None:
+        # The stars are optional, so unlike the satellite catalogue it is not an error.
+        print("No star catalogue at {}. Run make star-fetch to draw the stars.".format(sky.STAR_CATALOGUE_CACHE_PATH),
+              file=sys.stderr)
+        return np.empty(0, sky.build_star_dtype())
+    return stars
+
+def _init_satrecs(opencl, satrec_calculator, tle_array, tle_lines, sat_info):
+    """ The satrecs for the tle records, as rows of bytes ready to copy to the device.  Those
+        cached from an earlier run are reused, and only the rest initialised.
+    """
+    satrec_size = satrec_calculator.satrec_size
+    cache = satrec_cache.SatrecCache(SATREC_CACHE_DIR, satrec_cache.layout_identity(opencl.device, satrec_size))
+    keys = satrec_cache.tle_keys(tle_lines)
+
+    satrecs, missing = cache.lookup(keys, satrec_size)
+    if len(missing) > 0:
+        satrecs[missing] = satrec_calculator.calc_satrecs(missing, tle_array, tle_lines, sat_info)
+        cache.save(keys, satrecs)
+    return satrecs
+
+class _CatalogueUpdate:
+    """ The changes from a reloaded catalogue, ready to be swapped in between batches. """
+    def __init__(self, n_slots, changed_slots, satrec_rows, sat_info, shown, styles):
+        self.n_slots = n_slots
+        self.changed_slots = changed_slots
+        # The satrecs for the changed slots, as rows of bytes.
+        self.satrec_rows = satrec_rows
+        self.sat_info = sat_info
+        # Whether the satellite in each slot passes SAT_FILTER, and its style in PALETTE.
+        # Retired slots aren't shown.
+        self.shown = shown
+        self.styles = styles
+
+class _CatalogueReloader:
+    """ Watches for a new catalogue, from make tle-fetch, and prepares the satrecs of the
+        satellites that are new or changed in it.  The satellites keep their slots, so satrec
+        indices stay the same.
+
+        The watcher must have been made before the catalogue loaded was read.
+    """
+    def __init__(self, opencl, watcher, tle_lines, sat_info):
+        self.opencl = opencl
+        self.watcher = watcher
+        self._lock = threading.Lock()
+        self._update = None
+        # The catalogue loaded, until the slot map is needed.
+        self._tle_lines = tle_lines
+        self._sat_info = sat_info
+        self._slot_map = None
+
+    def take_update(self):
+        """ The update prepared for a new catalogue, if there is one. """
+        with self._lock:
+            update = self._update
+            self._update = None
+            return update
+
+    def watch(self, flags):
+        satrec_calculator = None
+        last_check = tm.monotonic()
+        while not flags.exiting:
+            tm.sleep(1)
+            if tm.monotonic() - last_check < CATALOGUE_CHECK_SECS:
+                continue
+            last_check = tm.monotonic()
+            with self._lock:
+                # The next is prepared against the slots of the last, once it is taken.
+                if self._update is not None:
+                    continue
+            if not self.watcher.changed():
+                continue
+
+            if satrec_calculator is None:
+                satrec_calculator = _SatrecCalculator(self.opencl)
+            try:
+                update = self._prepare_update(satrec_calculator)
+            except (OSError, ValueError, cl.Error) as e:
+                # Tried again when the catalogue is next replaced.
+                print("Could not reload catalogue {}: {}".format(catalogue.CATALOGUE_PATH, e), file=sys.stderr)
+                continue
+            with self._lock:
+                self._update = update
+
+    def _prepare_update(self, satrec_calculator):
+        if self._slot_map is None:
+            self._slot_map = SlotMap(self._sat_info.norad_ids(), satrec_cache.tle_keys(self._tle_lines))
+
+        tle_array, sat_info, tle_lines = catalogue.read_catalogue_and_tle_lines(catalogue.CATALOGUE_PATH,
+                                                                                satrec_calculator.tle_dtype)
+        slot_map, slots, changed_records = self._slot_map.update(sat_info.norad_ids(), satrec_cache.tle_keys(tle_lines))
+
+        # Only those not in the satrec cache are initialised.
+        satrecs = _init_satrecs(self.opencl, satrec_calculator, tle_array, tle_lines, sat_info)
+
+        # Retired slots aren't shown.
+        shown = np.zeros(slot_map.n_slots, bool)
+        shown[slots] = SAT_FILTER.mask(sat_info, tle_array)
+        styles = np.zeros(slot_map.n_slots, np.uint8)
+        styles[slots] = PALETTE.style_indices(sat_info, tle_array)
+
+        self._slot_map = slot_map
+        return _CatalogueUpdate(slot_map.n_slots, slots[changed_records], satrecs[changed_records],
+                                SlotSatInfo(sat_info, slot_map.record_of_slot), shown, styles)
+
+class _SatrecCalculator:
+    """ Initialises satrecs on the device with sgp4init, from TLEs parsed there from their lines
+        if PARSE_TLES_ON_DEVICE, or else from the tle records parsed on the host.
+    """
+    def __init__(self, opencl):
+        self.opencl = opencl
 
-    kernel = cl.Kernel(program, 'find_satrec_size')
-    kernel.set_arg(0, output_buf)
-    k_event = cl.enqueue_nd_range_kernel(opencl.queue, kernel, (1,), None)
+        program = cl.Program(
+            opencl.ctx, '#include "calc_satrecs_kernel.cl"'
+        ).build(
+            # https://registry.khronos.org/OpenCL/specs/3.0-unified/html/OpenCL_API.html#compiler-options
+            options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+            cache_dir='caches/opencl_cachedir/'
+        )
+        self.kernel = cl.Kernel(program, 'calc_satrecs')
+        self.scatter_kernel = cl.Kernel(program, 'scatter_satrecs')
+
+        if PARSE_TLES_ON_DEVICE:
+            parse_program = cl.Program(
+                opencl.ctx, '#include "parse_tle_kernel.cl"'
+            ).build(
+                options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+                cache_dir='caches/opencl_cachedir/'
+            )
+            self.parse_kernel = cl.Kernel(parse_program, 'parse_tle_lines')
+
+        self.tle_dtype = cl.tools.get_or_register_dtype('tle')
+        self.satrec_size = self._find_satrec_size(program)
+
+    def _find_satrec_size(self, program):
+        """ We don't know size of satrec struct for buffer, so we use opencl kernel to get it."""
+
+        output_array = np.empty(1, cl.cltypes.uint)
+        output_buf = cl.Buffer(self.opencl.ctx, cl.mem_flags.WRITE_ONLY, size=output_array.nbytes)
+
+        kernel = cl.Kernel(program, 'satrec_size')
+        kernel.set_arg(0, output_buf)
+        k_event = cl.enqueue_nd_range_kernel(self.opencl.queue, kernel, (1,), None)
+        cl.enqueue_copy(self.opencl.queue, output_array, output_buf, wait_for=[k_event]).wait()
+        return int(output_array[0])
+
+    def calc_satrecs(self, indices, tle_array, tle_lines, sat_info):
+        """ The satrecs for the TLEs at the indices, as rows of bytes. """
+        n_tle = len(indices)
+        satrecs = np.empty((n_tle, self.satrec_size), np.uint8)
+        if n_tle == 0:
+            return satrecs
+
+        mf = cl.mem_flags
+        if PARSE_TLES_ON_DEVICE:
+            norad_ids = sat_info.norad_ids()
+            tle_buf, tle_event = self._parse_tles(np.ascontiguousarray(tle_lines[indices]),
+                                                  [norad_ids[i] for i in indices])
+        else:
+            tle_buf = cl.Buffer(self.opencl.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR,
+                                hostbuf=np.ascontiguousarray(tle_array[indices]))
+            tle_event = None
+        satrec_buf = cl.Buffer(self.opencl.ctx, mf.WRITE_ONLY | mf.HOST_READ_ONLY, size=satrecs.nbytes)
+
+        self.kernel.set_arg(0, tle_buf)
+        self.kernel.set_arg(1, satrec_buf)
+        event = cl.enqueue_nd_range_kernel(self.opencl.queue, self.kernel, (n_tle,), None,
+                                           wait_for=[tle_event] if tle_event is not None else None)
+        cl.enqueue_copy(self.opencl.queue, satrecs, satrec_buf, wait_for=[event]).wait()
+        # _stats('calc_satrecs', event)
+        return satrecs
+
+    def patch_satrecs(self, satrec_buf, n_tle, update):
+        """ A new satrec buffer, with the n_tle satrecs in satrec_buf and the changed satrecs of the
+            catalogue update scattered into their slots.  The old buffer is left as it was, for
+            anything still using it.
+        """
+        mf = cl.mem_flags
+        new_satrec_buf = cl.Buffer(self.opencl.ctx, mf.READ_WRITE | mf.HOST_NO_ACCESS,
+                                   size=max(update.n_slots, 1) * self.satrec_size)
+        events = []
+        if n_tle > 0:
+            events.append(cl.enqueue_copy(self.opencl.queue, new_satrec_buf, satrec_buf,
+                                          byte_count=n_tle * self.satrec_size))
+
+        n_changed = len(update.changed_slots)
+        if n_changed > 0:
+            slots_buf = cl.Buffer(self.opencl.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR,
+                                  hostbuf=np.ascontiguousarray(update.changed_slots, cl.cltypes.int))
+            rows_buf = cl.Buffer(self.opencl.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=update.satrec_rows)
+            self.scatter_kernel.set_arg(0, slots_buf)
+            self.scatter_kernel.set_arg(1, rows_buf)
+            self.scatter_kernel.set_arg(2, new_satrec_buf)
+            events = [cl.enqueue_nd_range_kernel(self.opencl.queue, self.scatter_kernel, (n_changed,), None,
+                                                 wait_for=events)]
+        if events:
+            cl.wait_for_events(events)
+        return new_satrec_buf
+
+    def _parse_tles(self, tle_lines, norad_ids):
+        """ Parses the TLE lines into tle records on the device, where they are left for calc_satrecs. """
+        n_tle = len(tle_lines)
+        errors = np.empty(n_tle, cl.cltypes.int)
+
+        mf = cl.mem_flags
+        lines_buf = cl.Buffer(self.opencl.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=tle_lines)
+        tle_buf = cl.Buffer(self.opencl.ctx, mf.READ_WRITE | mf.HOST_NO_ACCESS, size=n_tle * self.tle_dtype.itemsize)
+        errors_buf = cl.Buffer(self.opencl.ctx, mf.WRITE_ONLY | mf.HOST_READ_ONLY, size=errors.nbytes)
 
-    event = cl.enqueue_copy(opencl.queue, output_array, output_buf, wait_for=[k_event])
-    event.wait()
-    # _stats('find_satrec_size', event)
+        self.parse_kernel.set_arg(0, lines_buf)
+        self.parse_kernel.set_arg(1, tle_buf)
+        self.parse_kernel.set_arg(2, errors_buf)
+        event = cl.enqueue_nd_range_kernel(self.opencl.queue, self.parse_kernel, (n_tle,), None)
+        cl.enqueue_copy(self.opencl.queue, errors, errors_buf, wait_for=[event]).wait()
 
-    return output_array[0]
+        if errors.any():
+            tle.report_tle_errors(norad_ids, errors)
+        return (tle_buf, event,)
 
-def _calc_satrecs(opencl, tle_array, satrec_size):
-    program = cl.Program(
-        opencl.ctx, '#include "calc_satrecs_kernel.cl"'
-    ).build(
-        # https://registry.khronos.org/OpenCL/specs/3.0-unified/html/OpenCL_API.html#compiler-options
-        options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
-        cache_dir='caches/opencl_cachedir/'
-    )
+def _build_observer_buf(opencl, sites):
+    """ The observers are built once here, so sites can be changed without recompiling the kernels."""
 
-    n_tle = len(tle_array)
+    observer_dtype = observer.build_observer_dtype()
+    observer_dtype = dt.to_opencl_dtype(opencl.device, observer_dtype, 'observer', 'observer.h')
 
-    mf = cl.mem_flags
-    tle_buf = cl.Buffer(opencl.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=tle_array)
-    satrec_buf = cl.Buffer(opencl.ctx, mf.READ_WRITE | mf.HOST_NO_ACCESS, size=n_tle * satrec_size)
+    observer_array = np.empty(len(sites), observer_dtype)
+    for i, (_, latitude_deg, longitude_deg, altitude_km) in enumerate(sites):
+        for key, value in observer.calc_observer(latitude_deg, longitude_deg, altitude_km).items():
+            observer_array[i][key] = value
 
-    kernel = cl.Kernel(program, 'calc_satrecs')
-    kernel.set_arg(0, tle_buf)
-    kernel.set_arg(1, satrec_buf)
-    event = cl.enqueue_nd_range_kernel(opencl.queue, kernel, (n_tle,), None)
-    event.wait()
-    # _stats('calc_satrecs', event)
-    return satrec_buf
+    mf = cl.mem_flags
+    return cl.Buffer(opencl.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=observer_array)
 
 class _JTimeCalculator:
     def __init__(self, opencl, n_jtimes, frame_period_secs):
@@ -177,12 +532,10 @@ class _JTimeCalculator:
 
         self.n_jtimes = n_jtimes
         self.frame_period_secs = frame_period_secs
-        mf = cl.mem_flags
-        self.jtime_buf = cl.Buffer(opencl.ctx, mf.READ_WRITE | mf.HOST_NO_ACCESS,
-                                   size=jtime_dtype.itemsize * n_jtimes)
+        self.jtime_itemsize = jtime_dtype.itemsize
         self.kernel = cl.Kernel(program, 'calc_jtime')
 
-    def calc_jtimes(self, start_time):
+    def calc_jtimes(self, start_time, jtime_buf):
 
         p_year = cl.cltypes.int(start_time.year)
         p_month = cl.cltypes.int(start_time.month)
@@ -201,114 +554,305 @@ class _JTimeCalculator:
         self.kernel.set_arg(5, p_sec)
         self.kernel.set_arg(6, p_frame_period_secs)
         self.kernel.set_arg(7, p_ut1_utc_diff_secs)
-        self.kernel.set_arg(8, self.jtime_buf)
+        self.kernel.set_arg(8, jtime_buf)
 
         event = cl.enqueue_nd_range_kernel(self.opencl.queue, self.kernel, (self.n_jtimes,), None)
         return event
 
-# Will need to re-use kernel and buffers.
-class _ProjectionsGenerator:
-    def __init__(self, opencl, n_jtimes, jtime_buf, n_tle, satrec_buf):
+class _PassPredictor:
+    """ Predicts the passes of the satrecs that are shown.  The others are not propagated. """
+    def __init__(self, opencl, satrec_buf, n_observers, observer_buf, shown):
         self.opencl = opencl
 
         program = cl.Program(
-            opencl.ctx, '#include "generate_projections_kernel.cl"'
+            opencl.ctx, '#include "predict_passes_kernel.cl"'
         ).build(
             options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
             cache_dir='caches/opencl_cachedir/'
         )
 
-        self.kernel = cl.Kernel(program, 'generate_projections')
-        self.jtime_buf = jtime_buf
-        self.n_jtimes = n_jtimes
-        self.satrec_buf = satrec_buf
-        self.n_tle = n_tle
+        self.kernel = cl.Kernel(program, 'predict_passes')
+        self.n_observers = n_observers
+        self.observer_buf = observer_buf
+
+        # The satrecs are swapped from the frame generator's thread when the catalogue is reloaded.
+        self._lock = threading.Lock()
+        self._satrec_buf = satrec_buf
+        self._shown = shown
+        self._changed_satrecs = np.empty(0, np.int32)
+        self._allocated_shown = None
+
+    def _allocate(self, shown):
+        self.satrec_indices = np.ascontiguousarray(np.nonzero(shown)[0], cl.cltypes.int)
+        n_shown = len(self.satrec_indices)
+        self.pass_times = np.empty([n_shown, MAX_PASSES, 2], cl.cltypes.double)
+        self.n_passes = np.empty(n_shown, cl.cltypes.int)
+        mf = cl.mem_flags
+        self.satrec_indices_buf = cl.Buffer(self.opencl.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR,
+                                            hostbuf=np.append(self.satrec_indices, 0).astype(cl.cltypes.int))
+        self.pass_times_buf = cl.Buffer(self.opencl.ctx, mf.WRITE_ONLY | mf.HOST_READ_ONLY, size=max(self.pass_times.nbytes, 1))
+        self.n_passes_buf = cl.Buffer(self.opencl.ctx, mf.WRITE_ONLY | mf.HOST_READ_ONLY, size=max(self.n_passes.nbytes, 1))
+
+    def set_satrecs(self, satrec_buf, changed_satrecs, shown):
+        """ Swaps in the satrecs of a reloaded catalogue, and which are shown.  The passes of the
+            changed satrecs, and those shown or hidden since, are to be predicted again (see
+            take_changed_satrecs).
+        """
+        with self._lock:
+            # There are never fewer slots.
+            was_shown = np.zeros(len(shown), bool)
+            was_shown[:len(self._shown)] = self._shown
+            self._satrec_buf = satrec_buf
+            self._shown = shown
+            self._changed_satrecs = np.union1d(self._changed_satrecs,
+                                               np.union1d(changed_satrecs, np.nonzero(was_shown != shown)[0]))
+
+    def take_changed_satrecs(self):
+        """ The satrecs changed since last asked. """
+        with self._lock:
+            changed = self._changed_satrecs
+            self._changed_satrecs = np.empty(0, np.int32)
+            return changed
+
+    def predict_passes(self, window_start, window_secs):
+        """ Returns the satrec index, aos and los (as POSIX timestamps) of each pass in the window. """
+
+        with self._lock:
+            satrec_buf = self._satrec_buf
+            if self._shown is not self._allocated_shown:
+                self._allocate(self._shown)
+                self._allocated_shown = self._shown
+        if len(self.satrec_indices) == 0:
+            return (np.empty(0, np.int32), np.empty(0), np.empty(0),)
+
+        self.kernel.set_scalar_arg_dtypes([cl.cltypes.int, cl.cltypes.int, cl.cltypes.int,
+                                           cl.cltypes.int, cl.cltypes.int, cl.cltypes.double,
+                                           cl.cltypes.double, cl.cltypes.double, cl.cltypes.double,
+                                           cl.cltypes.int, cl.cltypes.int,
+                                           None, None, None, None, None])
+
+        self.kernel.set_arg(0, cl.cltypes.int(window_start.year))
+        self.kernel.set_arg(1, cl.cltypes.int(window_start.month))
+        self.kernel.set_arg(2, cl.cltypes.int(window_start.day))
+        self.kernel.set_arg(3, cl.cltypes.int(window_start.hour))
+        self.kernel.set_arg(4, cl.cltypes.int(window_start.minute))
+        self.kernel.set_arg(5, cl.cltypes.double(window_start.second))
+        self.kernel.set_arg(6, cl.cltypes.double(UT1_UTC_DIFF_SECS))
+        self.kernel.set_arg(7, cl.cltypes.double(window_secs))
+        self.kernel.set_arg(8, cl.cltypes.double(PASS_STEP_SECS))
+        self.kernel.set_arg(9, cl.cltypes.int(MAX_PASSES))
+        self.kernel.set_arg(10, cl.cltypes.int(self.n_observers))
+        self.kernel.set_arg(11, self.satrec_indices_buf)
+        self.kernel.set_arg(12, satrec_buf)
+        self.kernel.set_arg(13, self.observer_buf)
+        self.kernel.set_arg(14, self.pass_times_buf)
+        self.kernel.set_arg(15, self.n_passes_buf)
+
+        # Each work item is for a shown satrec.
+        event = cl.enqueue_nd_range_kernel(self.opencl.queue, self.kernel, (len(self.satrec_indices),), None)
+        cl.enqueue_copy(self.opencl.queue, self.pass_times, self.pass_times_buf, wait_for=[event])
+        cl.enqueue_copy(self.opencl.queue, self.n_passes, self.n_passes_buf, wait_for=[event]).wait()
+
+        # Gather the (aos, los) pairs in use.
+        in_use = np.arange(MAX_PASSES) < self.n_passes[:, np.newaxis]
+        satrec_indices = self.satrec_indices[np.nonzero(in_use)[0]].astype(np.int32)
+        pass_times = self.pass_times[in_use] + window_start.timestamp()
+        return (satrec_indices, pass_times[:, 0], pass_times[:, 1],)
+
+class _FrameRenderer:
+    """ Draws the points of a frame into an image for each site, on the device, so the gui is
+        given the pixels to show.  The images are RGBA, packed into little endian 32 bit
+        pixels.  Each image starts as a copy of the background, made on the device, and the
+        sky is drawn into it from the positions worked out for the batch by _SkyProjector.
+
+        The frames must be drawn in order for the trails, which are drawn from a ring buffer of
+        where each satellite was in the last trail_frames frames, kept on the device.
+
+        It draws on a queue of its own, chained to the sky positions by their event, so drawing
+        the frames of one batch isn't held up behind the kernels of the next.  Only reading back
+        the images blocks.
+    """
+    def __init__(self, opencl, point_dtype, n_observers, palette, background, trail_frames, trail_intensity):
+        self.opencl = opencl
+        self.queue = cl.CommandQueue(opencl.ctx)
+        self.point_dtype = point_dtype
+        self.n_observers = n_observers
+        self.trail_frames = trail_frames
+        self.trail_intensity = trail_intensity
 
-        format = cl.ImageFormat(cl.channel_order.RGBA, cl.channel_type.UNSIGNED_INT8)
+        self.style_dtype = dt.to_opencl_dtype(opencl.device, build_style_dtype(), 'style', 'style.h')
+        program = cl.Program(
+            opencl.ctx, '#include "render_kernel.cl"'
+        ).build(
+            options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+            cache_dir='caches/opencl_cachedir/'
+        )
+        self.draw_kernel = cl.Kernel(program, 'draw_points')
+        self.trail_kernel = cl.Kernel(program, 'draw_trails')
+        self.sky_kernel = cl.Kernel(program, 'draw_sky')
+        self.pack_kernel = cl.Kernel(program, 'pack_pixels')
 
         mf = cl.mem_flags
-        self.device_image_buf = cl.create_image(self.opencl.ctx, mf.WRITE_ONLY | mf.HOST_READ_ONLY, format,
-                                                shape=(IMAGE_WIDTH, IMAGE_HEIGHT, IMAGE_FRAMES))
-
-        dummy_output_info_array = np.empty([IMAGE_FRAMES, IMAGE_HEIGHT, IMAGE_WIDTH], cl.cltypes.uint)
-        self.info_buf_size=dummy_output_info_array.nbytes
-        self.device_info_buf = cl.Buffer(self.opencl.ctx, mf.WRITE_ONLY | mf.HOST_READ_ONLY, size=self.info_buf_size)
-
-        # I can't make any sense of how the fill color works, but all 0's gives black.
-        red = 0
-        green = 0
-        blue = 0
-        alpha = 0
-        self.fill_colour = np.array([red, green, blue, alpha], dtype=cl.cltypes.uint) 
-
-        self.info_fill_pattern = cl.cltypes.uint(0)
-
-    def generate_projections(self, jtimes_event):
-
-        fill_image_event = cl.enqueue_fill_image(
-            self.opencl.queue,
-            self.device_image_buf,
-            self.fill_colour,
-            origin=(0,0,0),
-            region=(IMAGE_WIDTH, IMAGE_HEIGHT, IMAGE_FRAMES)
-        )
-        
-        fill_info_event = cl.enqueue_fill_buffer(
-            self.opencl.queue,
-            self.device_info_buf,
-            self.info_fill_pattern,
-            offset=0,
-            size=self.info_buf_size
+        self.palette_buf = cl.Buffer(opencl.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR,
+                                     hostbuf=palette.build_styles(self.style_dtype))
+        self.background_buf = cl.Buffer(opencl.ctx, mf.READ_ONLY | mf.HOST_NO_ACCESS | mf.COPY_HOST_PTR,
+                                        hostbuf=background.build_channels(IMAGE_WIDTH, IMAGE_HEIGHT))
+        self.n_pixels = n_observers * IMAGE_HEIGHT * IMAGE_WIDTH
+        self.channels_buf = cl.Buffer(opencl.ctx, mf.READ_WRITE | mf.HOST_NO_ACCESS,
+                                      size=self.n_pixels * 3 * np.dtype(cl.cltypes.uint).itemsize)
+        self.pixels_buf = cl.Buffer(opencl.ctx, mf.WRITE_ONLY | mf.HOST_READ_ONLY,
+                                    size=self.n_pixels * np.dtype(cl.cltypes.uint).itemsize)
+        self.max_points = 0
+        self.points_buf = None
+        self.style_buf = None
+        self.n_satrecs = 0
+        self.trails_buf = None
+        self.n_rendered = 0
+        self.n_sky_objects = 0
+        self.sky_styles_buf = None
+
+    def set_styles(self, style_of_satrec):
+        """ Sets the index into the palette of the style of each satrec. """
+        self.style_buf = cl.Buffer(self.opencl.ctx, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,
+                                   hostbuf=np.ascontiguousarray(np.append(style_of_satrec, 0), cl.cltypes.uchar))
+        if self.trail_frames > 0 and len(style_of_satrec) != self.n_satrecs:
+            # The trails start again.
+            self.n_satrecs = len(style_of_satrec)
+            self.trails_buf = cl.Buffer(self.opencl.ctx, cl.mem_flags.READ_WRITE | cl.mem_flags.HOST_NO_ACCESS,
+                                        size=self._trail_row_size() * self.trail_frames)
+            cl.enqueue_fill_buffer(self.queue, self.trails_buf, cl.cltypes.int(-1),
+                                   offset=0, size=self._trail_row_size() * self.trail_frames)
+
+    def set_sky(self, sky_styles):
+        """ Sets the style of each sky object. """
+        self.n_sky_objects = len(sky_styles)
+        self.sky_styles_buf = cl.Buffer(self.opencl.ctx, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,
+                                        hostbuf=sky_styles)
+
+    def render(self, frame_points, sky_positions_buf=None, i_frame=0, sky_event=None):
+        """ The image of the frame for each site, indexed by (site, y, x).  The sky is drawn
+            from the frame's positions in sky_positions_buf, if given, once sky_event is done.
+        """
+        if len(frame_points) > self.max_points:
+            self.max_points = 2 * len(frame_points)
+            self.points_buf = cl.Buffer(self.opencl.ctx, cl.mem_flags.READ_ONLY | cl.mem_flags.HOST_WRITE_ONLY,
+                                        size=self.max_points * self.point_dtype.itemsize)
+
+        image_size = IMAGE_HEIGHT * IMAGE_WIDTH * 3 * np.dtype(cl.cltypes.uint).itemsize
+        events = [cl.enqueue_copy(self.queue, self.channels_buf, self.background_buf,
+                                  byte_count=image_size, dst_offset=observer_index * image_size)
+                  for observer_index in range(self.n_observers)]
+        trail_row = self.n_rendered % max(self.trail_frames, 1)
+        if self.trail_frames > 0:
+            # Where the satellites were trail_frames ago is forgotten.
+            events.append(cl.enqueue_fill_buffer(self.queue, self.trails_buf, cl.cltypes.int(-1),
+                                                 offset=trail_row * self._trail_row_size(), size=self._trail_row_size()))
+        self.n_rendered += 1
+
+        if sky_positions_buf is not None and self.n_sky_objects > 0:
+            events.append(self._enqueue_sky(sky_positions_buf, i_frame, events + [sky_event]))
+
+        if len(frame_points) > 0:
+            events.append(cl.enqueue_copy(self.queue, self.points_buf,
+                                          np.ascontiguousarray(frame_points, self.point_dtype), is_blocking=False))
+
+            # Both have a work item for each point.
+            events = [self._enqueue_draw(self.draw_kernel, cl.cltypes.double(palette.REFERENCE_RANGE_KM),
+                                         len(frame_points), trail_row, events)]
+            if self.trail_frames > 0:
+                events = [self._enqueue_draw(self.trail_kernel, cl.cltypes.float(self.trail_intensity),
+                                             len(frame_points), trail_row, events)]
+
+        self.pack_kernel.set_arg(0, self.channels_buf)
+        self.pack_kernel.set_arg(1, self.pixels_buf)
+        # Each work item is for a pixel.
+        pack_event = cl.enqueue_nd_range_kernel(self.queue, self.pack_kernel, (self.n_pixels,), None,
+                                                wait_for=events)
+
+        images = np.empty([self.n_observers, IMAGE_HEIGHT, IMAGE_WIDTH], cl.cltypes.uint)
+        cl.enqueue_copy(self.queue, images, self.pixels_buf, wait_for=[pack_event], is_blocking=True)
+        return images
+
+    def _enqueue_draw(self, kernel, scale, n_points, trail_row, wait_for):
+        """ Enqueues draw_points or draw_trails, which take the same arguments but for the scale. """
+        kernel.set_scalar_arg_dtypes([cl.cltypes.int, cl.cltypes.int, type(scale),
+                                      None, None, None, None,
+                                      cl.cltypes.int, cl.cltypes.int, cl.cltypes.int, cl.cltypes.int, None])
+        kernel.set_arg(0, cl.cltypes.int(IMAGE_WIDTH))
+        kernel.set_arg(1, cl.cltypes.int(IMAGE_HEIGHT))
+        kernel.set_arg(2, scale)
+        kernel.set_arg(3, self.points_buf)
+        kernel.set_arg(4, self.style_buf)
+        kernel.set_arg(5, self.palette_buf)
+        kernel.set_arg(6, self.channels_buf)
+        kernel.set_arg(7, cl.cltypes.int(self.trail_frames))
+        kernel.set_arg(8, cl.cltypes.int(trail_row))
+        kernel.set_arg(9, cl.cltypes.int(self.n_observers))
+        kernel.set_arg(10, cl.cltypes.int(self.n_satrecs))
+        # Not used without trails, but must be set.
+        kernel.set_arg(11, self.trails_buf if self.trails_buf is not None else self.pixels_buf)
+        return cl.enqueue_nd_range_kernel(self.queue, kernel, (n_points,), None, wait_for=wait_for)
+
+    def _enqueue_sky(self, sky_positions_buf, i_frame, wait_for):
+        self.sky_kernel.set_scalar_arg_dtypes([cl.cltypes.int, cl.cltypes.int, cl.cltypes.int, None, None, None])
+        self.sky_kernel.set_arg(0, cl.cltypes.int(IMAGE_WIDTH))
+        self.sky_kernel.set_arg(1, cl.cltypes.int(IMAGE_HEIGHT))
+        self.sky_kernel.set_arg(2, cl.cltypes.int(i_frame))
+        self.sky_kernel.set_arg(3, sky_positions_buf)
+        self.sky_kernel.set_arg(4, self.sky_styles_buf)
+        self.sky_kernel.set_arg(5, self.channels_buf)
+        # Each work item is for a sky object and observer.
+        return cl.enqueue_nd_range_kernel(self.queue, self.sky_kernel, (self.n_sky_objects, self.n_observers), None,
+                                          wait_for=wait_for)
+
+    def _trail_row_size(self):
+        return self.n_observers * self.n_satrecs * 2 * np.dtype(cl.cltypes.int).itemsize
+
+class _SkyProjector:
+    """ Works out where the sun, moon and stars are in each frame of a batch, for each site,
+        with a kernel launched once for the batch.  The positions are left on the device in
+        the batch's slot, for _FrameRenderer to draw.
+    """
+    def __init__(self, opencl, n_jtimes, n_observers, observer_buf, star_directions):
+        self.opencl = opencl
+        self.n_jtimes = n_jtimes
+        self.n_observers = n_observers
+        self.observer_buf = observer_buf
+        self.n_objects = sky.FIRST_STAR + len(star_directions)
+
+        program = cl.Program(
+            opencl.ctx, '#include "sky_kernel.cl"'
+        ).build(
+            options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+            cache_dir='caches/opencl_cachedir/'
         )
+        self.kernel = cl.Kernel(program, 'project_sky')
 
-        self.kernel.set_scalar_arg_dtypes([cl.cltypes.int, cl.cltypes.int, cl.cltypes.int, None, None, None, None])
+        # With a spare, so it is never empty.
+        self.star_buf = cl.Buffer(opencl.ctx, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,
+                                  hostbuf=np.append(star_directions, np.zeros(3)).astype(cl.cltypes.double))
 
+    def enqueue(self, slot, jtimes_event):
+        """ Starts working out the sky positions for the batch in the slot, once the jtimes
+            are calculated by jtimes_event.
+        """
+        if slot.sky_positions_buf is None:
+            slot.sky_positions_buf = cl.Buffer(self.opencl.ctx, cl.mem_flags.READ_WRITE | cl.mem_flags.HOST_NO_ACCESS,
+                                               size=self.n_jtimes * self.n_observers * self.n_objects * 2 * np.dtype(cl.cltypes.int).itemsize)
+
+        self.kernel.set_scalar_arg_dtypes([cl.cltypes.int, cl.cltypes.int, cl.cltypes.int, None, None, None, None])
         self.kernel.set_arg(0, cl.cltypes.int(IMAGE_WIDTH))
         self.kernel.set_arg(1, cl.cltypes.int(IMAGE_HEIGHT))
-        # Use either IMAGE_FRAMES or passed number consistently.
-        self.kernel.set_arg(2, cl.cltypes.int(self.n_jtimes))
-        self.kernel.set_arg(3, self.jtime_buf)
-        self.kernel.set_arg(4, self.satrec_buf)
-        self.kernel.set_arg(5, self.device_image_buf)
-        self.kernel.set_arg(6, self.device_info_buf)
-
-        # Each work item is for a satrec and gets the current set of jtimes.
-        projections_event = cl.enqueue_nd_range_kernel(self.opencl.queue, self.kernel, (self.n_tle,), None,
-                                                        wait_for=[jtimes_event,fill_image_event,fill_info_event])
-        
-        # Copy the result from the device to the host
-        (image_array,image_map_event,row_pitch,slice_pitch) = cl.enqueue_map_image(
-            self.opencl.queue,
-            self.device_image_buf,
-            cl.map_flags.READ,
-            origin=(0,0,0),
-            region=(IMAGE_WIDTH, IMAGE_HEIGHT, IMAGE_FRAMES),
-            shape=(IMAGE_FRAMES, IMAGE_HEIGHT, IMAGE_WIDTH),
-            dtype=cl.cltypes.uint,
-            is_blocking=False,
-            wait_for=[projections_event]
-        )
-    
-        (info_array,info_map_event) = cl.enqueue_map_buffer(
-            self.opencl.queue,
-            self.device_info_buf,
-            cl.map_flags.READ,
-            offset=0,
-            shape=(IMAGE_FRAMES, IMAGE_HEIGHT, IMAGE_WIDTH),
-            dtype=cl.cltypes.uint,
-            is_blocking=False,
-            wait_for=[projections_event]
-        )
-
-        image_map_event.wait()
-        info_map_event.wait()
-
-        # _stats('calc_jtimes', jtimes_event)
-        # _stats('fill', fill_event)
-        # _stats('generate_projections', projections_event)
-        # _stats('copy_image', map_event)
-        self.opencl.queue.finish()
-        return (image_array, info_array,)
+        self.kernel.set_arg(2, cl.cltypes.int(self.n_observers))
+        self.kernel.set_arg(3, slot.jtime_buf)
+        self.kernel.set_arg(4, self.observer_buf)
+        self.kernel.set_arg(5, self.star_buf)
+        self.kernel.set_arg(6, slot.sky_positions_buf)
+
+        # A work item for each object and frame.
+        slot.sky_event = cl.enqueue_nd_range_kernel(self.opencl.queue, self.kernel, (self.n_objects, self.n_jtimes), None,
+                                                    wait_for=[jtimes_event])
+        self.opencl.queue.flush()
 
 # def _stats(event_name, event):
 #     print(event_name)
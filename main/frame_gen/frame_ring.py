@@ -0,0 +1,59 @@
+import threading
+from collections import deque
+
+class FrameRing:
+    """ The frames handed from the frame generator to the gui, bounded by both the number of frames
+        and the bytes they hold.
+
+        The generator puts each frame with its size, blocking while there isn't room.  The gui gets
+        the frames in order and releases each once it has been displayed, which is when its memory
+        is given back for the generator to reuse.  A frame is always let in when the ring is empty,
+        so one bigger than the budget can't hold things up for ever.
+    """
+
+    def __init__(self, max_frames, max_bytes):
+        self._condition = threading.Condition()
+        self._max_frames = max_frames
+        self._max_bytes = max_bytes
+        self._frames = deque()
+        # The sizes of the frames got but not yet released, oldest first.
+        self._taken = deque()
+        self.n_bytes = 0
+
+    def __len__(self):
+        """ The frames waiting and not yet released. """
+        with self._condition:
+            return len(self._frames) + len(self._taken)
+
+    def put(self, frame, n_bytes, timeout=None):
+        """ Add a frame, waiting until there is room for it.  Returns False on timeout. """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._has_room(n_bytes), timeout):
+                return False
+            self._frames.append((frame, n_bytes,))
+            self.n_bytes += n_bytes
+            self._condition.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """ The oldest frame, waiting for one if need be.  Returns None on timeout.
+            The frame holds its place in the ring until it is released.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: len(self._frames) > 0, timeout):
+                return None
+            frame, n_bytes = self._frames.popleft()
+            self._taken.append(n_bytes)
+            return frame
+
+    def release(self):
+        """ Give back the room of the oldest frame got, once it is finished with. """
+        with self._condition:
+            self.n_bytes -= self._taken.popleft()
+            self._condition.notify_all()
+
+    def _has_room(self, n_bytes):
+        n_frames = len(self._frames) + len(self._taken)
+        if n_frames == 0:
+            return True
+        return n_frames < self._max_frames and self.n_bytes + n_bytes <= self._max_bytes
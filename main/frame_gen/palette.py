@@ -0,0 +1,76 @@
+""" Palette
+
+How each satellite is drawn: its colour, and the radius of the disc drawn for it.  Each
+satellite is given the style of the first rule it passes, or the first style if none.  The
+styles are copied to the device as an array of the style struct, and each satellite's
+index into them as a byte.
+"""
+import numpy as np
+import pyopencl as cl
+from frame_gen import sat_filter
+from frame_gen.sat_filter import SatFilter
+
+COLOUR = 'colour'  # RGBA packed into a little endian 32 bit pixel, with alpha ignored.
+RADIUS = 'radius'  # pixels, at REFERENCE_RANGE_KM or closer
+
+# Discs shrink for satellites further away than this, down to a single pixel.
+REFERENCE_RANGE_KM = 1000.0
+
+MAX_STYLES = 256
+
+def build_style_dtype():
+    """Returns Numpy dtype definition of style C struct we will pass to the OpenCL kernal"""
+
+    return np.dtype([
+        (COLOUR, cl.cltypes.uint),
+        (RADIUS, cl.cltypes.float)
+    ])
+
+class Style:
+    def __init__(self, rgb, radius=0.0):
+        self.rgb = rgb
+        self.radius = radius
+
+class Palette:
+    def __init__(self, styles, rules=()):
+        """ rules is a list of (SatFilter, style index), tried in order. """
+        if len(styles) > MAX_STYLES:
+            raise Exception("Palette has {} styles, more than {}".format(len(styles), MAX_STYLES))
+        self.styles = styles
+        self.rules = rules
+
+    def build_styles(self, style_dtype):
+        """ The styles, as an array of style_dtype for the device. """
+        styles = np.zeros(len(self.styles), style_dtype)
+        for i, style in enumerate(self.styles):
+            red, green, blue = style.rgb
+            styles[i][COLOUR] = red | green << 8 | blue << 16
+            styles[i][RADIUS] = style.radius
+        return styles
+
+    def style_indices(self, sat_info, tle_array):
+        """ The index of the style of each satellite. """
+        indices = np.zeros(len(tle_array), np.uint8)
+        # The earlier rules are applied last, so they win.
+        for sat_filter, style_index in reversed(self.rules):
+            indices[sat_filter.mask(sat_info, tle_array)] = style_index
+        return indices
+
+ROCKET_BODY_TAGS = ['Rocket body', 'Stage 1 rocket body', 'Stage 2 rocket body']
+
+DEFAULT_PALETTE = Palette(
+    [
+        Style((200, 200, 200)),
+        Style((255, 215, 0), radius=2.5),  # space stations
+        Style((255, 255, 255), radius=1.5),  # visible to the naked eye
+        Style((170, 60, 60)),  # debris
+        Style((255, 140, 0)),  # rocket bodies
+        Style((110, 160, 255), radius=1.0),  # geosynchronous
+    ],
+    [
+        (SatFilter(tags=['Space station']), 1),
+        (SatFilter(tags=['Visible']), 2),
+        (SatFilter(tags=['Debris']), 3),
+        (SatFilter(tags=ROCKET_BODY_TAGS), 4),
+        (SatFilter(regimes=[sat_filter.GEO]), 5),
+    ])
@@ -0,0 +1,73 @@
+import threading
+import numpy as np
+
+class PassIndex:
+    """ Predicted passes of the satellites over the observers, so only those that may be visible
+        need be projected.
+
+        Each pass is a satrec index with acquisition and loss of signal times (aos, los), as
+        POSIX timestamps.  The passes are kept sorted by aos, so those overlapping a period are
+        found with a binary search.  Passes are added a window of time at a time, by the pass
+        predictor running ahead on its own thread.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._satrec_indices = np.empty(0, np.int32)
+        self._aos = np.empty(0, np.float64)
+        self._los = np.empty(0, np.float64)
+        self._max_duration = 0.0
+        self.covered_until = None
+
+    def add_window(self, window_end, satrec_indices, aos, los, discard_before=None):
+        """ Add the passes predicted up to window_end, the end of the window they were predicted for.
+            Passes that were over before discard_before are dropped.
+        """
+        with self._condition:
+            satrec_indices = np.concatenate((self._satrec_indices, np.asarray(satrec_indices, np.int32)))
+            aos = np.concatenate((self._aos, np.asarray(aos, np.float64)))
+            los = np.concatenate((self._los, np.asarray(los, np.float64)))
+
+            if discard_before is not None:
+                keep = los >= discard_before
+                satrec_indices, aos, los = satrec_indices[keep], aos[keep], los[keep]
+
+            order = np.argsort(aos, kind='stable')
+            self._satrec_indices = satrec_indices[order]
+            self._aos = aos[order]
+            self._los = los[order]
+            self._max_duration = float(np.max(self._los - self._aos)) if len(self._aos) else 0.0
+            self.covered_until = window_end
+            self._condition.notify_all()
+
+    def replace_satrecs(self, replaced, satrec_indices, aos, los):
+        """ Replace all the passes of the replaced satrecs, with passes predicted again for the
+            windows already added.
+        """
+        with self._condition:
+            keep = ~np.isin(self._satrec_indices, replaced)
+            satrec_indices = np.concatenate((self._satrec_indices[keep], np.asarray(satrec_indices, np.int32)))
+            aos = np.concatenate((self._aos[keep], np.asarray(aos, np.float64)))
+            los = np.concatenate((self._los[keep], np.asarray(los, np.float64)))
+
+            order = np.argsort(aos, kind='stable')
+            self._satrec_indices = satrec_indices[order]
+            self._aos = aos[order]
+            self._los = los[order]
+            self._max_duration = float(np.max(self._los - self._aos)) if len(self._aos) else 0.0
+
+    def wait_for_window(self, end, timeout=None):
+        """ Wait until the passes up to end have been predicted.  Returns False on timeout. """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self.covered_until is not None and self.covered_until >= end, timeout)
+
+    def satellites_visible_between(self, start, end):
+        """ The sorted satrec indices of the satellites with a pass overlapping start to end. """
+        with self._condition:
+            # Passes that start after the end can't overlap, and none that started before
+            # start - max_duration can still be running.
+            first = np.searchsorted(self._aos, start - self._max_duration, side='left')
+            last = np.searchsorted(self._aos, end, side='right')
+            overlapping = self._los[first:last] >= start
+            return np.unique(self._satrec_indices[first:last][overlapping])
@@ -0,0 +1,247 @@
+""" Projections
+
+The satellites' points and positions for batches of frames, generated on the device by
+generate_projections_kernel.cl.  Each batch is enqueued into a slot of device buffers and
+collected from it later, so the device works on one batch while the frames of another are
+handed to the gui.
+"""
+import pyopencl as cl
+import numpy as np
+
+import dtype as dt
+import point
+
+class BatchSlot:
+    """ The device buffers for a batch.  There is a slot for each batch in flight, so the next
+        batch can be computed into one while the last is read from another.
+    """
+    def __init__(self, opencl, n_jtimes, jtime_itemsize, n_tle, n_observers, position_itemsize):
+        self.opencl = opencl
+        mf = cl.mem_flags
+        self.jtime_buf = cl.Buffer(opencl.ctx, mf.READ_WRITE | mf.HOST_NO_ACCESS, size=jtime_itemsize * n_jtimes)
+
+        # The satrecs with a pass in the batch, which of them are flagged as visible,
+        # and the flagged ones compacted with their number.
+        index_list_size = max(n_tle, 1) * np.dtype(cl.cltypes.int).itemsize
+        self.satrec_indices_buf = cl.Buffer(opencl.ctx, mf.READ_ONLY | mf.HOST_WRITE_ONLY, size=index_list_size)
+        self.flags_buf = cl.Buffer(opencl.ctx, mf.READ_WRITE | mf.HOST_NO_ACCESS, size=index_list_size)
+        self.visible_indices_buf = cl.Buffer(opencl.ctx, mf.READ_WRITE | mf.HOST_READ_ONLY, size=index_list_size)
+        self.n_visible_buf = cl.Buffer(opencl.ctx, mf.READ_WRITE | mf.HOST_READ_ONLY,
+                                       size=np.dtype(cl.cltypes.int).itemsize)
+
+        # Position of each flagged satrec in each frame for each observer.
+        self.positions_buf = cl.Buffer(opencl.ctx, mf.WRITE_ONLY | mf.HOST_READ_ONLY,
+                                       size=max(n_tle, 1) * n_jtimes * n_observers * position_itemsize)
+
+        self.n_points_buf = cl.Buffer(opencl.ctx, mf.READ_WRITE, size=np.dtype(cl.cltypes.int).itemsize)
+        self.max_points = 0
+        self.points_buf = None
+
+        # Where the sky objects are in each frame, from frame_gen._SkyProjector, if the sky is shown.
+        self.sky_positions_buf = None
+        self.sky_event = None
+
+        # The batch in the slot, set when it is enqueued.
+        self.start_time = None
+        self.satrec_indices = None
+        self.n_candidates = 0
+        self.jtimes_event = None
+        self.compact_event = None
+        self.counts_event = None
+        self.n_points = np.zeros(1, cl.cltypes.int)
+        self.n_visible = np.zeros(1, cl.cltypes.int)
+
+    def allocate_points(self, max_points, point_itemsize):
+        self.max_points = max_points
+        self.points_buf = cl.Buffer(self.opencl.ctx, cl.mem_flags.WRITE_ONLY | cl.mem_flags.HOST_READ_ONLY,
+                                    size=max_points * point_itemsize)
+
+class ProjectionsGenerator:
+    """ Generates the points for batches of frames, with a batch computing on the device while
+        the one before is read back and handed to the gui.
+
+        The kernels run in order on the compute queue.  Copies to and from the device go on a
+        queue of their own, chained to the kernels by events, so reading back one slot doesn't
+        hold up the kernels of the other.
+    """
+    def __init__(self, opencl, n_jtimes, frame_period_secs, jtime_itemsize, n_tle, satrec_buf, n_observers, observer_buf,
+                 image_width, image_height, n_slots, initial_max_points, geodetic):
+        """ There are n_slots batches in flight, each with room for initial_max_points points at
+            first.  The points have the satellite's geodetic position and speed if geodetic.
+        """
+        self.opencl = opencl
+        self.transfer_queue = cl.CommandQueue(opencl.ctx)
+
+        self.point_dtype = dt.to_opencl_dtype(opencl.device, point.build_point_dtype(geodetic=geodetic),
+                                              'point', 'point.h')
+        self.position_dtype = dt.to_opencl_dtype(opencl.device, point.build_position_dtype(), 'position', 'position.h')
+
+        program = cl.Program(
+            opencl.ctx, '#include "generate_projections_kernel.cl"'
+        ).build(
+            options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ' + (point.GEODETIC_BUILD_OPTION if geodetic else ''),
+            cache_dir='caches/opencl_cachedir/'
+        )
+
+        compact_program = cl.Program(
+            opencl.ctx, '#include "compact_kernel.cl"'
+        ).build(
+            options=' -I main/ ',
+            cache_dir='caches/opencl_cachedir/'
+        )
+
+        self.flag_kernel = cl.Kernel(program, 'flag_visible')
+        self.compact_kernel = cl.Kernel(compact_program, 'compact_flagged')
+        self.kernel = cl.Kernel(program, 'generate_projections')
+        self.compact_work_group_size = min(256, self.compact_kernel.get_work_group_info(
+            cl.kernel_work_group_info.WORK_GROUP_SIZE, opencl.device))
+        self.n_jtimes = n_jtimes
+        self.frame_period_secs = frame_period_secs
+        self.satrec_buf = satrec_buf
+        self.n_observers = n_observers
+        self.observer_buf = observer_buf
+        self.n_tle = n_tle
+        self.image_width = image_width
+        self.image_height = image_height
+
+        self.jtime_itemsize = jtime_itemsize
+        self.n_slots = n_slots
+        self.slots = []
+        self._allocate_slots(initial_max_points)
+
+    def _allocate_slots(self, max_points):
+        self.slots = []
+        for _ in range(self.n_slots):
+            slot = BatchSlot(self.opencl, self.n_jtimes, self.jtime_itemsize, self.n_tle, self.n_observers,
+                             self.position_dtype.itemsize)
+            slot.allocate_points(max_points, self.point_dtype.itemsize)
+            self.slots.append(slot)
+
+    def set_satrecs(self, satrec_buf, n_tle):
+        """ Swaps in the satrecs of a reloaded catalogue.  There must be no batches in flight. """
+        self.satrec_buf = satrec_buf
+        grown = n_tle > self.n_tle
+        self.n_tle = n_tle
+        if grown:
+            self._allocate_slots(max(slot.max_points for slot in self.slots))
+
+    def enqueue(self, slot, start_time, jtimes_event, satrec_indices):
+        """ Starts the batch on the device, without waiting for it.  The jtimes must be
+            calculated into the slot's jtime buffer by jtimes_event.
+        """
+        slot.start_time = start_time
+        slot.jtimes_event = jtimes_event
+        # Kept until the copy to the device is done.
+        slot.satrec_indices = np.ascontiguousarray(satrec_indices, dtype=cl.cltypes.int)
+        slot.n_candidates = len(slot.satrec_indices)
+        if slot.n_candidates == 0:
+            return
+
+        indices_event = cl.enqueue_copy(self.transfer_queue, slot.satrec_indices_buf, slot.satrec_indices,
+                                        is_blocking=False)
+        flag_event = self._flag_visible(slot, jtimes_event, indices_event)
+        slot.compact_event = self._compact_visible(slot, flag_event)
+        self._enqueue_projections(slot)
+
+    def collect(self, slot):
+        """ Waits for the batch in the slot.  Returns the points in the batch, sorted by frame,
+            the positions of the flagged satrecs indexed by (row, frame, observer), and the row
+            of each satrec (-1 if not flagged).
+        """
+
+        row_of_satrec = np.full(self.n_tle, -1, np.int32)
+        if slot.n_candidates == 0:
+            slot.jtimes_event.wait()
+            return (np.empty(0, self.point_dtype),
+                    np.empty([0, self.n_jtimes, self.n_observers], self.position_dtype),
+                    row_of_satrec,)
+
+        slot.counts_event.wait()
+        while slot.n_points[0] > slot.max_points:
+            # Not enough room for them all, so make more and try again.
+            slot.allocate_points(2 * int(slot.n_points[0]), self.point_dtype.itemsize)
+            self._enqueue_projections(slot)
+            slot.counts_event.wait()
+
+        # Copy just the points and positions used from the device to the host.
+        n_visible = slot.n_visible[0]
+        points = np.empty(slot.n_points[0], self.point_dtype)
+        visible_indices = np.empty(n_visible, cl.cltypes.int)
+        positions = np.empty([n_visible, self.n_jtimes, self.n_observers], self.position_dtype)
+        if len(points) > 0:
+            cl.enqueue_copy(self.transfer_queue, points, slot.points_buf, is_blocking=False)
+        if len(visible_indices) > 0:
+            cl.enqueue_copy(self.transfer_queue, visible_indices, slot.visible_indices_buf, is_blocking=False)
+            cl.enqueue_copy(self.transfer_queue, positions, slot.positions_buf, is_blocking=False)
+        self.transfer_queue.finish()
+
+        row_of_satrec[visible_indices] = np.arange(len(visible_indices))
+
+        return (points[np.argsort(points[point.FRAME], kind='stable')], positions, row_of_satrec,)
+
+    def _enqueue_projections(self, slot):
+        reset_event = cl.enqueue_fill_buffer(self.opencl.queue, slot.n_points_buf, cl.cltypes.int(0),
+                                             offset=0, size=slot.n_points.nbytes)
+
+        self.kernel.set_scalar_arg_dtypes([cl.cltypes.int, cl.cltypes.int, cl.cltypes.int, cl.cltypes.int,
+                                           None, None, None, None, None, None,
+                                           cl.cltypes.int, None, None])
+
+        self.kernel.set_arg(0, cl.cltypes.int(self.image_width))
+        self.kernel.set_arg(1, cl.cltypes.int(self.image_height))
+        self.kernel.set_arg(2, cl.cltypes.int(self.n_jtimes))
+        self.kernel.set_arg(3, cl.cltypes.int(self.n_observers))
+        self.kernel.set_arg(4, slot.jtime_buf)
+        self.kernel.set_arg(5, slot.visible_indices_buf)
+        self.kernel.set_arg(6, slot.n_visible_buf)
+        self.kernel.set_arg(7, self.satrec_buf)
+        self.kernel.set_arg(8, self.observer_buf)
+        self.kernel.set_arg(9, slot.positions_buf)
+        self.kernel.set_arg(10, cl.cltypes.int(slot.max_points))
+        self.kernel.set_arg(11, slot.points_buf)
+        self.kernel.set_arg(12, slot.n_points_buf)
+
+        # A work item for each satrec and frame, for as many satrecs as may have been flagged.
+        projections_event = cl.enqueue_nd_range_kernel(self.opencl.queue, self.kernel, (slot.n_candidates, self.n_jtimes), None,
+                                                        wait_for=[slot.compact_event, reset_event])
+
+        # The counts are read back as soon as they are ready, so collecting only waits on them.
+        cl.enqueue_copy(self.transfer_queue, slot.n_visible, slot.n_visible_buf, is_blocking=False,
+                        wait_for=[projections_event])
+        slot.counts_event = cl.enqueue_copy(self.transfer_queue, slot.n_points, slot.n_points_buf, is_blocking=False,
+                                            wait_for=[projections_event])
+        # Flushed, so the device starts on it while the host does other things.
+        self.opencl.queue.flush()
+        self.transfer_queue.flush()
+
+    def _flag_visible(self, slot, jtimes_event, indices_event):
+        self.flag_kernel.set_scalar_arg_dtypes([cl.cltypes.int, cl.cltypes.double, cl.cltypes.int,
+                                                None, None, None, None, None])
+
+        self.flag_kernel.set_arg(0, cl.cltypes.int(self.n_jtimes))
+        self.flag_kernel.set_arg(1, cl.cltypes.double(self.frame_period_secs))
+        self.flag_kernel.set_arg(2, cl.cltypes.int(self.n_observers))
+        self.flag_kernel.set_arg(3, slot.jtime_buf)
+        self.flag_kernel.set_arg(4, slot.satrec_indices_buf)
+        self.flag_kernel.set_arg(5, self.satrec_buf)
+        self.flag_kernel.set_arg(6, self.observer_buf)
+        self.flag_kernel.set_arg(7, slot.flags_buf)
+
+        # Each work item is for a satrec with a pass in the batch.
+        return cl.enqueue_nd_range_kernel(self.opencl.queue, self.flag_kernel, (slot.n_candidates,), None,
+                                          wait_for=[jtimes_event, indices_event])
+
+    def _compact_visible(self, slot, flag_event):
+        self.compact_kernel.set_scalar_arg_dtypes([cl.cltypes.int, None, None, None, None, None])
+
+        self.compact_kernel.set_arg(0, cl.cltypes.int(slot.n_candidates))
+        self.compact_kernel.set_arg(1, slot.flags_buf)
+        self.compact_kernel.set_arg(2, slot.satrec_indices_buf)
+        self.compact_kernel.set_arg(3, slot.visible_indices_buf)
+        self.compact_kernel.set_arg(4, slot.n_visible_buf)
+        self.compact_kernel.set_arg(5, cl.LocalMemory(self.compact_work_group_size * np.dtype(cl.cltypes.int).itemsize))
+
+        # A single work-group.
+        return cl.enqueue_nd_range_kernel(self.opencl.queue, self.compact_kernel,
+                                          (self.compact_work_group_size,), (self.compact_work_group_size,),
+                                          wait_for=[flag_event])
@@ -0,0 +1,77 @@
+import numpy as np
+import tle
+
+# Orbit regimes, by period and shape.
+LEO = 'LEO'
+MEO = 'MEO'
+GEO = 'GEO'
+HEO = 'HEO'
+REGIMES = [LEO, MEO, GEO, HEO]
+
+# Low earth orbits go round in 128 minutes or less.
+LEO_MAX_PERIOD_MINS = 128.0
+# Geosynchronous orbits go round once a sidereal day, about 1.0027 times a day.
+GEO_MEAN_MOTION_RANGE = (0.99, 1.01)
+GEO_MAX_ECCENTRICITY = 0.01
+# More eccentric orbits are highly elliptical, whatever their period.
+HEO_MIN_ECCENTRICITY = 0.25
+
+EARTH_RADIUS_KM = 6378.135
+# km^3/s^2, as WGS-72 used by sgp4.
+EARTH_MU = 398600.8
+
+class SatFilter:
+    """ Which of the satellites are shown.  Only those that pass every test given are shown.
+
+        tags: shown if they have any of these tags (see catalogue.description_tags).
+        exclude_tags: not shown if they have any of these tags.
+        regimes: shown if in one of these orbit regimes.
+        altitude_km: (min, max) shown if their orbit reaches into this band.
+        inclination_deg: (min, max) shown if inclined within this range.
+    """
+
+    def __init__(self, tags=None, exclude_tags=(), regimes=None, altitude_km=None, inclination_deg=None):
+        self.tags = tags
+        self.exclude_tags = exclude_tags
+        self.regimes = regimes
+        self.altitude_km = altitude_km
+        self.inclination_deg = inclination_deg
+
+    def mask(self, sat_info, tle_array):
+        """ Whether each satellite is shown, given their details and tle records. """
+        shown = np.ones(len(tle_array), bool)
+        if self.tags is not None:
+            shown &= np.logical_or.reduce([sat_info.tag_mask(tag) for tag in self.tags], initial=False)
+        for tag in self.exclude_tags:
+            shown &= ~sat_info.tag_mask(tag)
+        if self.regimes is not None:
+            shown &= np.isin(orbit_regimes(tle_array), self.regimes)
+        if self.altitude_km is not None:
+            perigee, apogee = perigee_apogee_altitudes(tle_array)
+            shown &= (apogee >= self.altitude_km[0]) & (perigee <= self.altitude_km[1])
+        if self.inclination_deg is not None:
+            inclination = tle_array[tle.ORBITAL_INCLINATION]
+            shown &= (inclination >= self.inclination_deg[0]) & (inclination <= self.inclination_deg[1])
+        return shown
+
+def orbit_regimes(tle_array):
+    """ The orbit regime of each satellite, from its mean motion and eccentricity. """
+    mean_motion = tle_array[tle.MEAN_MOTION]
+    eccentricity = tle_array[tle.ORBITAL_ECCENTRICITY]
+
+    regimes = np.full(len(tle_array), MEO, object)
+    regimes[24 * 60 / np.maximum(mean_motion, 1e-9) <= LEO_MAX_PERIOD_MINS] = LEO
+    regimes[(mean_motion >= GEO_MEAN_MOTION_RANGE[0]) & (mean_motion <= GEO_MEAN_MOTION_RANGE[1])
+            & (eccentricity < GEO_MAX_ECCENTRICITY)] = GEO
+    regimes[eccentricity >= HEO_MIN_ECCENTRICITY] = HEO
+    return regimes
+
+def perigee_apogee_altitudes(tle_array):
+    """ The lowest and highest altitude of each satellite's orbit in km, from its mean motion
+        in revolutions a day and eccentricity.
+    """
+    radians_per_sec = np.maximum(tle_array[tle.MEAN_MOTION], 1e-9) * 2 * np.pi / (24 * 60 * 60)
+    semi_major_axis = np.cbrt(EARTH_MU / radians_per_sec ** 2)
+    eccentricity = tle_array[tle.ORBITAL_ECCENTRICITY]
+    return (semi_major_axis * (1 - eccentricity) - EARTH_RADIUS_KM,
+            semi_major_axis * (1 + eccentricity) - EARTH_RADIUS_KM,)
@@ -0,0 +1,78 @@
+import hashlib
+import os
+import numpy as np
+
+# Files whose contents determine how a TLE is parsed, what sgp4init makes of it and how the
+# satrec is laid out.
+SATREC_SOURCES = [
+    'main/tle.py',
+    'main/parse_tle_kernel.cl',
+    'main/calc_satrecs_kernel.cl',
+    'main/celestrak/sgp4/init_satrec.cl',
+    'main/celestrak/sgp4/SGP4.h',
+    'main/celestrak/sgp4/SGP4.cl',
+]
+
+KEY_SIZE = 16
+
+class SatrecCache:
+    """ Initialised satrecs kept on disk, so sgp4init need only be run for TLEs that are new or
+        have changed since the last start.
+
+        Each satrec is keyed by a hash of its TLE lines.  The satrecs depend on the device and
+        the code that made them too, so there is a file for each layout identity: a hash of the
+        device, the satrec size and the sources that initialise it.
+    """
+
+    def __init__(self, cache_dir, layout_identity):
+        self.path = os.path.join(cache_dir, 'satrecs-{}.npz'.format(layout_identity))
+        self._keys = np.empty(0, 'S{}'.format(KEY_SIZE))
+        self._satrecs = None
+        if os.path.exists(self.path):
+            with np.load(self.path) as cached:
+                self._keys = cached['keys']
+                self._satrecs = cached['satrecs']
+
+    def lookup(self, keys, satrec_size):
+        """ The satrecs cached for the keys, as rows of bytes, and the indices of the keys that
+            were not found, whose rows are left zeroed.
+        """
+        satrecs = np.zeros((len(keys), satrec_size), np.uint8)
+        if len(self._keys) == 0 or self._satrecs.shape[1] != satrec_size:
+            return (satrecs, np.arange(len(keys)),)
+
+        # The cached keys are kept sorted.
+        positions = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        found = self._keys[positions] == keys
+        satrecs[found] = self._satrecs[positions[found]]
+        return (satrecs, np.nonzero(~found)[0],)
+
+    def save(self, keys, satrecs):
+        """ Replaces the cache with the satrecs for the keys, so records for TLEs no longer in the
+            catalogue are dropped.  It is written aside and then moved into place.
+        """
+        keys, first = np.unique(keys, return_index=True)
+        self._keys = keys
+        self._satrecs = np.ascontiguousarray(satrecs[first])
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as file:
+            np.savez(file, keys=self._keys, satrecs=self._satrecs)
+        os.replace(tmp_path, self.path)
+
+def tle_keys(tle_lines):
+    """ A hash of the lines of each TLE, given as an array of characters indexed by satellite. """
+    rows = np.ascontiguousarray(tle_lines, np.uint8).reshape(len(tle_lines), -1)
+    return np.array([hashlib.blake2b(row.tobytes(), digest_size=KEY_SIZE).digest() for row in rows],
+                    'S{}'.format(KEY_SIZE))
+
+def layout_identity(device, satrec_size, sources=SATREC_SOURCES):
+    """ A hash of what the satrecs depend on other than the TLEs. """
+    identity = hashlib.blake2b(digest_size=8)
+    for part in (device.platform.name, device.name, device.version, device.driver_version, str(satrec_size)):
+        identity.update(part.encode() + b'\0')
+    for source in sources:
+        with open(source, 'rb') as file:
+            identity.update(file.read())
+    return identity.hexdigest()
@@ -0,0 +1,151 @@
+""" Sky
+
+The sun, moon and bright stars, drawn behind the satellites.
+
+The stars are from the Yale Bright Star Catalogue, fetched by make star-fetch.  Their
+directions are precessed from J2000 to the date once, on the host, into a table for the
+device.  Each batch, sky_kernel.cl works out where the sun and moon are, rotates the whole
+sky by the earth's rotation for each frame and projects it for each site.
+
+Each sky object has a style, as in palette.py, with sun and moon first and then the stars,
+brightest first.
+"""
+import gzip
+import os
+import sys
+import numpy as np
+import pyopencl as cl
+from frame_gen.palette import COLOUR, RADIUS
+
+# The fixed width catalogue, V/50 at CDS.
+STAR_CATALOGUE_URL = 'https://cdsarc.cds.unistra.fr'
+STAR_CATALOGUE_PATH = '/ftp/V/50/catalog.gz'
+STAR_CATALOGUE_CACHE_PATH = './caches/bsc5.dat.gz'
+
+RIGHT_ASCENSION = 'ra'  # J2000, radians
+DECLINATION = 'dec'  # J2000, radians
+MAGNITUDE = 'magnitude'  # visual
+COLOUR_INDEX = 'bv'  # B-V, bluer stars lower
+
+# Columns of the catalogue, counting from 0.
+_RA_HOURS = slice(75, 77)
+_RA_MINUTES = slice(77, 79)
+_RA_SECONDS = slice(79, 83)
+_DEC_SIGN = slice(83, 84)
+_DEC_DEGREES = slice(84, 86)
+_DEC_MINUTES = slice(86, 88)
+_DEC_SECONDS = slice(88, 90)
+_MAGNITUDE = slice(102, 107)
+_COLOUR_INDEX = slice(109, 114)
+
+# Indices of the sky objects.
+SUN = 0
+MOON = 1
+FIRST_STAR = 2
+
+SUN_STYLE = ((255, 236, 170), 4.0)
+MOON_STYLE = ((225, 225, 215), 3.0)
+# Stars this bright or brighter are drawn full strength, as small discs.
+BRIGHT_STAR_MAGNITUDE = 1.5
+BRIGHT_STAR_RADIUS = 1.0
+# The faintest are drawn this bright.
+MIN_STAR_INTENSITY = 0.2
+
+# Julian date of J2000.
+_J2000 = 2451545.0
+_ARCSECONDS = np.pi / (180 * 3600)
+
+def build_star_dtype():
+    return np.dtype([
+        (RIGHT_ASCENSION, np.float64),
+        (DECLINATION, np.float64),
+        (MAGNITUDE, np.float32),
+        (COLOUR_INDEX, np.float32)
+    ])
+
+def read_stars(path, max_magnitude):
+    """ The stars of the catalogue as bright as max_magnitude, brightest first.  None if
+        there is no catalogue.
+    """
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, 'rt', encoding='ascii', errors='replace') as file:
+        stars = _parse_stars(file, max_magnitude)
+    return stars[np.argsort(stars[MAGNITUDE], kind='stable')]
+
+def _parse_stars(lines, max_magnitude):
+    rows = []
+    for line in lines:
+        line = line.ljust(_COLOUR_INDEX.stop)
+        # A few entries are not stars, and have no position.
+        if not line[_RA_HOURS].strip() or not line[_MAGNITUDE].strip():
+            continue
+        magnitude = float(line[_MAGNITUDE])
+        if magnitude > max_magnitude:
+            continue
+        ra_hours = int(line[_RA_HOURS]) + int(line[_RA_MINUTES]) / 60 + float(line[_RA_SECONDS]) / 3600
+        dec_degrees = int(line[_DEC_DEGREES]) + int(line[_DEC_MINUTES]) / 60 + int(line[_DEC_SECONDS]) / 3600
+        if line[_DEC_SIGN] == '-':
+            dec_degrees = -dec_degrees
+        colour_index = float(line[_COLOUR_INDEX]) if line[_COLOUR_INDEX].strip() else 0.6
+        rows.append((np.radians(ra_hours * 15), np.radians(dec_degrees), magnitude, colour_index,))
+    return np.array(rows, build_star_dtype())
+
+def star_directions(stars, julian_date):
+    """ Unit vectors towards the stars, in the mean equator and equinox of the date, as rows
+        of x, y, z.  Precessed from J2000 with the IAU 1976 angles.
+    """
+    t = (julian_date - _J2000) / 36525.0
+    zeta = (2306.2181 * t + 0.30188 * t ** 2 + 0.017998 * t ** 3) * _ARCSECONDS
+    z = (2306.2181 * t + 1.09468 * t ** 2 + 0.018203 * t ** 3) * _ARCSECONDS
+    theta = (2004.3109 * t - 0.42665 * t ** 2 - 0.041833 * t ** 3) * _ARCSECONDS
+    precession = _rotate_z(z) @ _rotate_y(theta) @ _rotate_z(zeta)
+
+    ra = stars[RIGHT_ASCENSION]
+    dec = stars[DECLINATION]
+    j2000 = np.stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=1)
+    return np.ascontiguousarray(j2000 @ precession.T, cl.cltypes.double)
+
+def _rotate_z(angle):
+    """ Rotates vectors by angle about the z axis. """
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]])
+
+def _rotate_y(angle):
+    """ Rotates vectors by angle about the y axis, towards the z axis from the x axis. """
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, 0.0, -s], [0.0, 1.0, 0.0], [s, 0.0, c]])
+
+def build_sky_styles(stars, style_dtype):
+    """ The style of each sky object, as an array of style_dtype for the device. """
+    styles = np.zeros(FIRST_STAR + len(stars), style_dtype)
+    for index, (rgb, radius) in ((SUN, SUN_STYLE), (MOON, MOON_STYLE)):
+        styles[index][COLOUR] = _pack(*rgb)
+        styles[index][RADIUS] = radius
+
+    magnitude = stars[MAGNITUDE]
+    faintest = max(float(magnitude.max()), BRIGHT_STAR_MAGNITUDE + 1.0) if len(stars) else 0.0
+    intensity = np.clip((faintest - magnitude) / (faintest - BRIGHT_STAR_MAGNITUDE), 0.0, 1.0)
+    intensity = MIN_STAR_INTENSITY + (1.0 - MIN_STAR_INTENSITY) * intensity
+    red, green, blue = (np.rint(channel * intensity).astype(np.uint32) for channel in _star_tints(stars[COLOUR_INDEX]))
+    styles[FIRST_STAR:][COLOUR] = _pack(red, green, blue)
+    styles[FIRST_STAR:][RADIUS] = np.where(magnitude <= BRIGHT_STAR_MAGNITUDE, BRIGHT_STAR_RADIUS, 0.0)
+    return styles
+
+def _star_tints(colour_index):
+    """ Roughly the colour of stars of each B-V, from blue-white through white to orange. """
+    bluer = np.clip(-colour_index / 0.4, 0.0, 1.0)
+    redder = np.clip((colour_index - 0.6) / 1.0, 0.0, 1.0)
+    red = 255 - 85 * bluer
+    green = 255 - 65 * bluer - 75 * redder
+    blue = 255 - 135 * redder
+    return (red, green, blue,)
+
+def _pack(red, green, blue):
+    return np.uint32(red) | np.uint32(green) << 8 | np.uint32(blue) << 16
+
+if __name__ == '__main__':
+    import tle_fetch
+    print("{:13} {}".format(tle_fetch.fetch_url(STAR_CATALOGUE_URL, STAR_CATALOGUE_PATH,
+                                                sys.argv[1] if len(sys.argv) > 1 else STAR_CATALOGUE_CACHE_PATH),
+                            STAR_CATALOGUE_PATH))
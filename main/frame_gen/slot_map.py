@@ -0,0 +1,89 @@
+import numpy as np
+import catalogue
+
+class SlotMap:
+    """ Which satrec slot each satellite is in, so a satellite keeps its satrec index when the
+        catalogue is reloaded, and indices held by the gui stay valid.
+
+        Satellites new to a catalogue are given slots after the last, and the slots of those no
+        longer in it are kept but retired.  Each slot has the key of the TLE it holds the satrec
+        for (see satrec_cache.tle_keys), so TLEs that have changed are found.
+    """
+
+    def __init__(self, norad_ids, keys, record_of_slot=None):
+        self.norad_ids = np.asarray(norad_ids, object)
+        self.keys = np.asarray(keys)
+        # The record in the catalogue for each slot, -1 if retired.
+        self.record_of_slot = (np.arange(len(self.norad_ids)) if record_of_slot is None
+                               else np.asarray(record_of_slot))
+
+    @property
+    def n_slots(self):
+        return len(self.norad_ids)
+
+    @property
+    def active(self):
+        """ Whether each slot holds a satellite in the catalogue. """
+        return self.record_of_slot >= 0
+
+    def update(self, norad_ids, keys):
+        """ Maps the records of a new catalogue into slots.  Returns the new SlotMap, the slot of
+            each record, and the records that are new or whose TLE has changed.
+        """
+        slot_of_id = {norad_id: slot for slot, norad_id in enumerate(self.norad_ids)}
+        new_ids = []
+        slots = np.empty(len(norad_ids), np.int32)
+        for record, norad_id in enumerate(norad_ids):
+            slot = slot_of_id.get(norad_id)
+            if slot is None:
+                slot = self.n_slots + len(new_ids)
+                new_ids.append(norad_id)
+            slots[record] = slot
+
+        n_slots = self.n_slots + len(new_ids)
+        old_keys = np.concatenate((self.keys, np.zeros(len(new_ids), self.keys.dtype)))
+        keys = np.asarray(keys, self.keys.dtype)
+        changed_records = np.nonzero((slots >= self.n_slots) | (old_keys[slots] != keys))[0]
+
+        # Retired slots keep their key, so the satellite is seen as unchanged if it comes back.
+        slot_keys = old_keys
+        slot_keys[slots] = keys
+        record_of_slot = np.full(n_slots, -1)
+        record_of_slot[slots] = np.arange(len(slots))
+
+        slot_map = SlotMap(np.concatenate((self.norad_ids, np.asarray(new_ids, object))),
+                           slot_keys, record_of_slot)
+        return (slot_map, slots, changed_records,)
+
+class SlotSatInfo:
+    """ The details of the satellites, as catalogue.SatInfo, indexed by slot. """
+
+    def __init__(self, sat_info, record_of_slot):
+        self._sat_info = sat_info
+        self._record_of_slot = record_of_slot
+        self.tag_names = sat_info.tag_names
+
+    def __len__(self):
+        return len(self._record_of_slot)
+
+    def __getitem__(self, slot):
+        record = self._record_of_slot[slot]
+        if record < 0:
+            return {catalogue.NORAD_ID: '', catalogue.NAME: '', catalogue.TAGS: ''}
+        return self._sat_info[record]
+
+    def norad_ids(self):
+        """ The NORAD id of the satellite in each slot, empty if retired. """
+        norad_ids = self._sat_info.norad_ids()
+        return ['' if record < 0 else norad_ids[record] for record in self._record_of_slot]
+
+    def tag_mask(self, tag):
+        """ Whether the satellite in each slot has the tag. """
+        retired = self._record_of_slot < 0
+        mask = self._sat_info.tag_mask(tag)[np.where(retired, 0, self._record_of_slot)]
+        mask[retired] = False
+        return mask
+
+    def tags_of(self, slot):
+        record = self._record_of_slot[slot]
+        return [] if record < 0 else self._sat_info.tags_of(record)
@@ -1,6 +1,9 @@
 #pragma OPENCL EXTENSION cl_khr_fp64 : enable
 
 #include "jtime.h"
+#include "observer.h"
+#include "point.h"
+#include "position.h"
 #include "celestrak/mathtimelib/MathTimeLib.h"
 #include "celestrak/astrolib/AstroLib.h"
 #include "celestrak/sgp4/SGP4.h"
@@ -8,75 +11,156 @@
 #include "celestrak/astrolib/AstroLib.cl"
 #include "celestrak/sgp4/SGP4.cl"
 #include "calc_ecef.cl"
+#include "observer_razel.cl"
+#include "visibility_bound.cl"
+#include "calc_geodetic.cl"
+
+bool calc_ecef_at(elsetrec *satrec, __global const jtime *jt, double recef[3], double vecef[3]);
+void project_for_observers(int frame, double recef[3], double vecef[3], int n_observers, __global const observer *observers, int image_width, int image_height, size_t satrec_index, __global position *frame_positions, int max_points, __global point *points, __global int *n_points);
+bool calc_razel(double recef[3], double vecef[3], const observer *obs, double *range, double *azimuth, double *elevation);
+int project(int frame, int observer_index, double range, double azimuth, double elevation, int image_width, int image_height, size_t satrec_index, __global position *pos, int max_points, __global point *points, __global int *n_points);
+#ifdef POINT_GEODETIC
+void set_geodetic(__global point *p, double recef[3], double vecef[3]);
+#endif
+
+/*
+ * The projections are generated by two kernels, with the compact_flagged kernel between them.
+ *
+ * flag_visible has a work item for each of the satellites in satrec_indices, those with a
+ * pass predicted in the batch by predict_passes_kernel.cl that are shown, by the filter in
+ * frame_gen.py.  It propagates them to the first frame, and flags them if the bound in visibility_bound.cl allows them to be above an observer's
+ * horizon before the last frame.
+ *
+ * generate_projections has a work item for each flagged satellite and frame, so the work
+ * items do the same work, rather than most returning early while a few loop over every
+ * frame.  It is launched for all the satellites in satrec_indices, as the number flagged
+ * stays on the device, and the work items past n_visible return straight away.
+ *
+ * A point is appended to points for each observer the satellite is above the horizon of.
+ * n_points is the number there would be without the max_points limit, so the caller can
+ * tell if some were dropped.  If built with POINT_GEODETIC defined, the points also have the
+ * satellite's geodetic latitude, longitude, altitude and speed.
+ *
+ * The position of each flagged satellite in each frame, for each observer, is also written to
+ * positions, indexed by (visible index, frame, observer).  With visible_indices, this gives
+ * where any satellite is without searching the points.
+ */
+__kernel void flag_visible(
+    int n_jtimes,
+    double frame_period_secs,
+    int n_observers,
+    __global const jtime *jtimes,
+    __global const int *satrec_indices,
+    __global const elsetrec *satrec_array,
+    __global const observer *observers,
+    __global int *flags
+)
+{
+    const size_t i = get_global_id(0);
+    elsetrec satrec = satrec_array[satrec_indices[i]];
 
-bool calc_razel(elsetrec *satrec, __global const jtime *jt, double *range, double *azimuth, double *elevation);
-void project(__write_only image3d_t image, int frame, double range, double azimuth, double elevation, int image_width, int image_height, char* satnum, size_t satrec_index, __global uint *info);
+    double recef[3], vecef[3];
+    if (!calc_ecef_at(&satrec, &jtimes[0], recef, vecef)) {
+        // Let generate_projections try the other frames.
+        flags[i] = 1;
+        return;
+    }
+
+    double slack = horizon_slack(recef, max_orbit_radius(&satrec), n_observers, observers);
+    flags[i] = frames_to_skip(slack, max_angular_rate(&satrec), frame_period_secs) < n_jtimes;
+}
 
 __kernel void generate_projections(
     int image_width,
     int image_height,
     int n_jtimes,
+    int n_observers,
     __global const jtime *jtimes,
+    __global const int *visible_indices,
+    __global const int *n_visible,
     __global const elsetrec *satrec_array,
-    __write_only image3d_t image,
-    __global uint *info
+    __global const observer *observers,
+    __global position *positions,
+    int max_points,
+    __global point *points,
+    __global int *n_points
 )
-{        
-    double first_range, first_azimuth, first_elevation;
-    double range, azimuth, elevation;
-    double last_range, last_azimuth, last_elevation;
+{
+    const size_t visible = get_global_id(0);
+    const int frame = get_global_id(1);
+    if (visible >= *n_visible) {
+        return;
+    }
 
-    size_t satrec_index = get_global_id(0);
+    const size_t satrec_index = visible_indices[visible];
     elsetrec satrec = satrec_array[satrec_index];
 
-    bool first_visible = calc_razel(&satrec, &jtimes[0], &first_range, &first_azimuth, &first_elevation);
-
-    bool only_one_point = n_jtimes < 2;
-    bool last_visible = only_one_point ? first_visible :
-        calc_razel(&satrec, &jtimes[n_jtimes-1], &last_range, &last_azimuth, &last_elevation);
-
-    if (!first_visible && !last_visible) {
-        // Go no further if both first and last points are not visible
-        return;
-    }
+    __global position *frame_positions = &positions[(visible * n_jtimes + frame) * n_observers];
 
-    if (first_visible) {
-        project(image, 0, first_range, first_azimuth, first_elevation, image_width, image_height, satrec.satnum, satrec_index, info);
-    }
-    for (int frame = 1; frame < n_jtimes-1; frame++) {
-        bool visible = calc_razel(&satrec, &jtimes[frame], &range, &azimuth, &elevation);
-        if (visible) {
-            project(image, frame, range, azimuth, elevation, image_width, image_height, satrec.satnum, satrec_index, info);
+    double recef[3], vecef[3];
+    if (calc_ecef_at(&satrec, &jtimes[frame], recef, vecef)) {
+        project_for_observers(frame, recef, vecef, n_observers, observers, image_width, image_height, satrec_index, frame_positions, max_points, points, n_points);
+    } else {
+        for (int i = 0; i < n_observers; i++) {
+            frame_positions[i].visible = 0;
         }
     }
-    if (last_visible && !only_one_point) {
-        project(image, n_jtimes-1, last_range, last_azimuth, last_elevation, image_width, image_height, satrec.satnum, satrec_index, info);
-    }
 }
 
-bool calc_razel(
+bool calc_ecef_at(
     elsetrec *satrec,
     __global const jtime *jt,
-    double *range,
-    double *azimuth,
-    double *elevation
+    double recef[3],
+    double vecef[3]
 )
 {
     const jtime jt2 = *jt;
+    return calc_ecef(satrec, &jt2, recef, vecef);
+}
 
-    double recef[3], vecef[3], aecef[3];
-
-    if (!calc_ecef(satrec, &jt2, recef, vecef, aecef)) {
-        return false;
+void project_for_observers(
+    int frame,
+    double recef[3],
+    double vecef[3],
+    int n_observers,
+    __global const observer *observers,
+    int image_width,
+    int image_height,
+    size_t satrec_index,
+    __global position *frame_positions,
+    int max_points,
+    __global point *points,
+    __global int *n_points
+)
+{
+    double range, azimuth, elevation;
+    for (int i = 0; i < n_observers; i++) {
+        const observer obs = observers[i];
+        if (calc_razel(recef, vecef, &obs, &range, &azimuth, &elevation)) {
+            int p = project(frame, i, range, azimuth, elevation, image_width, image_height, satrec_index, &frame_positions[i], max_points, points, n_points);
+#ifdef POINT_GEODETIC
+            if (p >= 0) {
+                set_geodetic(&points[p], recef, vecef);
+            }
+#endif
+        } else {
+            frame_positions[i].visible = 0;
+        }
     }
+}
 
-    //double site_latgd = 53.7965 *pi/180.0, site_lon = -1.54785 *pi/180.0, site_alt = 0.096; // Cloth Hall Leeds
-    double site_latgd = 51.477928 *pi/180.0, site_lon = -0.001545 *pi/180.0, site_alt = 0.068; // Royal Greenwich Observatory
-    //double site_latgd = 53.966 *pi/180.0, site_lon = -1.074 *pi/180.0, site_alt = 0.013; // York
-
-    // Convert lon/lat to direction for a particular site.
-    double rho, az, el, drho, daz, del;
-	rv_razel(recef, vecef, site_latgd, site_lon, site_alt, &rho, &az, &el, &drho, &daz, &del);
+bool calc_razel(
+    double recef[3],
+    double vecef[3],
+    const observer *obs,
+    double *range,
+    double *azimuth,
+    double *elevation
+)
+{
+    // Convert to direction from the observer's site.
+    double rho, az, el;
+    observer_razel(obs, recef, vecef, &rho, &az, &el);
 
     *range = rho;
     *azimuth = az;
@@ -86,7 +170,8 @@ bool calc_razel(
 }
 
 // Which way around these should be?
-void project(__write_only image3d_t image, int frame, double range, double azimuth, double elevation, int image_width, int image_height, char* satnum, size_t satrec_index, __global uint *info) {
+// Returns the index of the point appended, or -1 if there was no room.
+int project(int frame, int observer_index, double range, double azimuth, double elevation, int image_width, int image_height, size_t satrec_index, __global position *pos, int max_points, __global point *points, __global int *n_points) {
     // Range doesn't come into it, just the direction.
     const double r0w = image_width/2.0;
     const double rw = cos(elevation) * r0w;
@@ -96,42 +181,33 @@ void project(__write_only image3d_t image, int frame, double range, double azimu
     const double r = cos(elevation) * r0;
     const int y = (int)(r0 - cos(azimuth) * r);
 
-    // printf("%3d %s - range=%lf, azimuth=%lf, elevation=%lf, x=%d, y=%d\n", frame, satnum, range, azimuth, elevation, x, y);
-    // int4 coords = 0;
-    // coords.s0 = frame;
-    // coords.s1 = y;
-    // coords.s2 = x;
-    //write_imageui(image, coords, 0xffffffff);
-
-    // float4 color = (float4)(
-    //     255.0f,    // R
-    //     255.0f,    // G
-    //     255.0f,    // B
-    //     1.0f       // A
-    // );
-    // write_imagef(image, (int4)(x, y, frame, 0), color);
-
-    int4 coords = (int4)(x, y, frame, 0);
-    uint4 color = (uint4)(
-        255,    // R
-        255,    // G
-        255,    // B
-        0     // A
-    );
-    write_imageui(image, coords, color);
-
-    // Perhaps should use separate buffer with diff size, don't get byte order issues.
-    // int4 sat_index_coords = (int4)(x, y, 2*frame + 1, 0);
-    // uint4 fake_color = (uint4)(
-    //     satrec_index | 255,    // R
-    //     (satrec_index >> 8) | 255,    // G
-    //     (satrec_index >> 16) | 255,    // B
-    //     0     // A
-    // );
-    // // printf("x=%d, y=%d, idx=%d\n", x, y, satrec_index);
-    // write_imageui(image, sat_index_coords, fake_color);
-
-    int info_frame_offset = frame * image_width * image_height;
-    int info_row_offset = y * image_width;
-    info[info_frame_offset + info_row_offset + x] = satrec_index + 1;
+    pos->x = x;
+    pos->y = y;
+    pos->visible = 1;
+
+    const int i = atomic_inc(n_points);
+    if (i < max_points) {
+        points[i].frame = frame;
+        points[i].observer_index = observer_index;
+        points[i].x = x;
+        points[i].y = y;
+        points[i].satrec_index = satrec_index;
+        points[i].range = range;
+        points[i].elevation = elevation;
+        return i;
+    }
+    return -1;
+}
+
+#ifdef POINT_GEODETIC
+void set_geodetic(__global point *p, double recef[3], double vecef[3])
+{
+    double latitude, longitude, altitude, speed;
+    calc_geodetic(recef, vecef, &latitude, &longitude, &altitude, &speed);
+
+    p->latitude = latitude;
+    p->longitude = longitude;
+    p->altitude = altitude;
+    p->speed = speed;
 }
+#endif
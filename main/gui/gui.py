@@ -1,15 +1,8 @@
-import numpy as np
 from datetime import datetime, timezone, timedelta
 from PIL import Image, ImageTk, ImageDraw
 import PySimpleGUI as sg
-import pyopencl as cl
-import dtype as dt
-
-# Current difference between UT1 and UTC (UT1-UTC).
-# https://www.nist.gov/pml/time-and-frequency-division/time-realization/leap-seconds
-# Also: https://www.iers.org/IERS/EN/DataProducts/tools/eop_of_today/eop_of_today_tool.html
-#UT1_UTC_DIFF_SECS=0.0939  # 2025-10-31
-UT1_UTC_DIFF_SECS=0.07024  # 2026-02-05
+import point
+from gui.point_index import PointIndex
 
 # The size of each image
 # Should get actual canvas size once gui rendered.
@@ -22,11 +15,13 @@ else:
     IMAGE_HEIGHT=SCREEN_WIDTH
     IMAGE_WIDTH=SCREEN_WIDTH
 
-def gui_display_images(queue, flags, opencl_ctx):
+def gui_display_images(frame_ring, flags):
     
-    latlong_calc = None
-    latlong = [np.nan]
+    # Details of the tracked satellite from its point in the frame, None when not visible.
+    tracked_point = None
     norad_id_str = None
+    # Which of the sites is displayed.  Cycled with 's'.
+    site_index = 0
     
     sg.theme('Black')
     sg.set_options(element_padding=(0,0),margins=(0,0))
@@ -56,6 +51,11 @@ def gui_display_images(queue, flags, opencl_ctx):
         font=font,
         expand_x=True
     )
+    site_txt = sg.Text(
+        key='site',
+        font=font,
+        expand_x=True
+    )
     norad_id_txt = sg.Text(
         key='norad_id',
         font=font,
@@ -102,6 +102,7 @@ def gui_display_images(queue, flags, opencl_ctx):
     info_panel = sg.Column([
             [title_txt],
             [time_txt],
+            [site_txt],
             [sg.Sizer(space_size, space_size)],
             [norad_id_txt, sg.Sizer(30, 10), copy_but],
             [name_txt],
@@ -140,20 +141,26 @@ def gui_display_images(queue, flags, opencl_ctx):
     max_wait_millis = 1000
     max_wait_delta = timedelta(milliseconds=max_wait_millis)
 
-    tracked_sat_found = False
+    # The tracked satellite stays selected, while below the horizon too, until another click.
+    tracking_sat = False
 
     while not flags.exiting:
-        ftime, frame, info, sat_info = queue.get()
-
-        if latlong_calc == None:
-            latlong_calc = _LatlongCalculator(opencl_ctx, flags.satrec_buf)
-
-        image = Image.fromarray(frame)
-        if tracked_sat_found:
-            tracked_sat_found,tracked_sat_y,tracked_sat_x = search_for_sat(sat_idx, info, tracked_sat_y, tracked_sat_x, 150)
-            if tracked_sat_found:
-                ImageDraw.Draw(image).circle((tracked_sat_x,tracked_sat_y,), 10, outline=80)
-                latlong = latlong_calc.calculate_latlong(ftime, sat_idx)
+        frame = frame_ring.get(timeout=1)
+        if frame is None:
+            continue
+        ftime, frame_points, frame_positions, sat_info, images = frame
+        # The site of this frame, which stays labelled until the next, if the site is changed.
+        frame_site_index = site_index
+        site_points = frame_points[frame_points[point.OBSERVER_INDEX] == frame_site_index]
+        point_index = PointIndex(site_points, IMAGE_WIDTH, IMAGE_HEIGHT)
+
+        # Drawn on the device, as RGBA packed into 32 bit pixels.
+        image = Image.fromarray(images[frame_site_index].view('u1').reshape(IMAGE_HEIGHT, IMAGE_WIDTH, 4), 'RGBA')
+        if tracking_sat:
+            tracked_sat_visible,tracked_sat_y,tracked_sat_x = frame_positions.find(sat_idx, frame_site_index)
+            if tracked_sat_visible:
+                ImageDraw.Draw(image).circle((tracked_sat_x,tracked_sat_y,), 10, outline=(80,80,80))
+            tracked_point = _find_point(site_points, sat_idx)
         tk_frame = ImageTk.PhotoImage(image=image)
 
         waiting_for_frame_time=True
@@ -177,47 +184,50 @@ def gui_display_images(queue, flags, opencl_ctx):
             if key == 'q' or key == 'escape':
                 flags.exiting=True
                 break
+            if key == 's':
+                # Takes effect from the next frame.
+                site_index = (site_index + 1) % len(flags.site_names)
             if key == 'copy_norad_clipboard' and norad_id_str != None:
                 sg.clipboard_set(norad_id_str)
 
         window['frame'].update(data=tk_frame)
         window['time'].update(value=ftime.astimezone().strftime('%Y-%m-%d %H:%M:%S %Z'))
+        window['site'].update(value=flags.site_names[frame_site_index])
         
         if pos.clicked:
-            found,y,x = search_for_nonzero_near_click(info, pos.y, pos.x, 30)
+            found,y,x,clicked_sat_idx = point_index.nearest(pos.y, pos.x, 30)
             if not found:
                 norad_id_str = None
                 window['norad_id'].update('')
                 window['copy_norad_clipboard'].update(visible=False)
                 window['name'].update('')
                 window['tags'].update('')
-                tracked_sat_found = False
-                latlong = [np.nan]
+                tracking_sat = False
+                tracked_point = None
             else:
-                sat_idx = info[y, x] - 1
-                latlong = latlong_calc.calculate_latlong(ftime, sat_idx)
+                sat_idx = clicked_sat_idx
+                tracked_point = _find_point(site_points, sat_idx)
                 norad_id_str = sat_info[sat_idx]['norad_id']
                 window['norad_id'].update(value="NORAD id: {}".format(norad_id_str))
                 window['copy_norad_clipboard'].update(visible=True)
                 window['name'].update(value="Name:        {}".format(sat_info[sat_idx]['name']))
                 window['tags'].update(value=sat_info[sat_idx]['tags'])
-                tracked_sat_found = True
-                tracked_sat_x = x
-                tracked_sat_y = y
+                tracking_sat = True
             pos.clicked = False
 
-        if not np.isnan(latlong[0]):
-            window['altitude'].update(value="Altitude:     {:-3,.0f} km".format(latlong[1]))
-            window['longitude'].update(value="Longitude:  {:-3,.2f}".format(latlong[4]))
-            window['latitude'].update(value="Latitude:     {:-3,.2f}".format(latlong[3]))
-            window['velocity'].update(value="Velocity:      {:-3,.1f} km/s".format(latlong[0]))
+        if tracked_point is not None and point.ALTITUDE in tracked_point.dtype.names:
+            window['altitude'].update(value="Altitude:     {:-3,.0f} km".format(tracked_point[point.ALTITUDE]))
+            window['longitude'].update(value="Longitude:  {:-3,.2f}".format(tracked_point[point.LONGITUDE]))
+            window['latitude'].update(value="Latitude:     {:-3,.2f}".format(tracked_point[point.LATITUDE]))
+            window['velocity'].update(value="Velocity:      {:-3,.1f} km/s".format(tracked_point[point.SPEED]))
         else:
             window['altitude'].update("")
             window['longitude'].update("")
             window['latitude'].update("")
             window['velocity'].update("")
 
-        queue.task_done()
+        # Displayed, so the frame generator can have its room back.
+        frame_ring.release()
 
     window.close()
 
@@ -240,108 +250,7 @@ def click_handler(event):
     pos.y = event.y
     pos.clicked = True
 
-def search_for_nonzero_near_click(info, click_y, click_x, max_search_distance):
-    matcher = lambda y, x: info[y, x] != 0
-    height, width = info.shape
-    return search_box(matcher, click_y, click_x, height, width, max_search_distance)
-
-def search_for_sat(sat_idx, info, last_known_y, last_known_x, max_search_distance):
-    matcher = lambda y, x: info[y, x] == sat_idx + 1
-    height, width = info.shape
-    return search_box(matcher, last_known_y, last_known_x, height, width, max_search_distance)
-
-def search_box(matcher, start_y, start_x, height, width, max_search_distance):
-    if matcher(start_y, start_x):
-        return (True, start_y, start_x,)
-
-    # Search increasing larger pixel boxes around point.
-    for dist_from_click in range(1, max_search_distance + 1):
-        top_y = max(start_y - dist_from_click, 0)
-        bot_y = min(start_y + dist_from_click, height - 1)
-        left_x = max(start_x - dist_from_click, 0)
-        right_x = min(start_x + dist_from_click, width - 1)
-
-        # Search left and right sides of pixel box.
-        for y in range(top_y, bot_y + 1):
-            if matcher(y, left_x):
-                return (True, y, left_x,)
-            if matcher(y, right_x):
-                return (True, y, right_x,)
-        
-        # Search top and bottom sides of pixel box.
-        # No need to do first and last pixels again.
-        for x in range(left_x + 1, right_x):
-            if matcher(top_y, x):
-                return (True, top_y, x,)
-            if matcher(bot_y, x):
-                return (True, bot_y, x,)
-            
-    return (False,None,None,)
-
-class _LatlongCalculator:
-    def __init__(self, opencl_ctx, satrec_buf):
-        self.open_ctx = opencl_ctx
-        #self.opencl_queue = cl.CommandQueue(opencl_ctx, properties=cl.command_queue_properties.PROFILING_ENABLE)
-        self.opencl_queue = cl.CommandQueue(opencl_ctx)
-
-        self.satrec_buf = satrec_buf
-
-        program = cl.Program(
-            opencl_ctx, '#include "calc_latlong_kernel.cl"'
-        ).build(
-            options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
-            cache_dir='caches/opencl_cachedir/'
-        )
-
-        self.kernel = cl.Kernel(program, 'calc_latlong')
-        
-        mf = cl.mem_flags
-        self.output_size = 5
-        dummy_output_array = np.empty([self.output_size], cl.cltypes.double)
-        self.output_buf = cl.Buffer(opencl_ctx, mf.READ_WRITE | mf.HOST_READ_ONLY,
-                                    size=dummy_output_array.nbytes)
-
-    def calculate_latlong(self, time, sat_idx):
-
-        # TODO: check that indexed record has the expected norad id.
-
-        p_year = cl.cltypes.int(time.year)
-        p_month = cl.cltypes.int(time.month)
-        p_day = cl.cltypes.int(time.day)
-        p_hour = cl.cltypes.int(time.hour)
-        p_min = cl.cltypes.int(time.minute)
-        p_sec = cl.cltypes.double(time.second)
-        p_ut1_utc_diff_secs = cl.cltypes.double(UT1_UTC_DIFF_SECS)
-
-        self.kernel.set_scalar_arg_dtypes([
-            cl.cltypes.int, cl.cltypes.int, cl.cltypes.int,
-            cl.cltypes.int, cl.cltypes.int, cl.cltypes.double,
-            cl.cltypes.double, cl.cltypes.long, None, None])
-
-        self.kernel.set_arg(0, p_year)
-        self.kernel.set_arg(1, p_month)
-        self.kernel.set_arg(2, p_day)
-        self.kernel.set_arg(3, p_hour)
-        self.kernel.set_arg(4, p_min)
-        self.kernel.set_arg(5, p_sec)
-        self.kernel.set_arg(6, p_ut1_utc_diff_secs)
-        self.kernel.set_arg(7, sat_idx)
-        self.kernel.set_arg(8, self.satrec_buf)
-        self.kernel.set_arg(9, self.output_buf)
-
-        kernel_event = cl.enqueue_nd_range_kernel(self.opencl_queue, self.kernel, (1,), None)
-        
-        (output_array,map_event) = cl.enqueue_map_buffer(
-            self.opencl_queue,
-            self.output_buf,
-            cl.map_flags.READ,
-            offset=0,
-            shape=(self.output_size,),
-            dtype=cl.cltypes.double,
-            is_blocking=False,
-            wait_for=[kernel_event]
-        )
-
-        map_event.wait()
-        self.opencl_queue.finish()
-        return output_array
+def _find_point(site_points, sat_idx):
+    """ The satellite's point in the frame, or None if it is not visible. """
+    matches = site_points[site_points[point.SATREC_INDEX] == sat_idx]
+    return matches[0] if len(matches) > 0 else None
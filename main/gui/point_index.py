@@ -0,0 +1,58 @@
+import numpy as np
+import point
+
+# Size of the square grid cells, in pixels.
+CELL_SIZE = 32
+
+class PointIndex:
+    """ Index of the points in a frame, for finding what was clicked on.
+
+        The points are bucketed into a grid of square cells, sorted by cell, so a search
+        looks only at the few cells around it.
+    """
+
+    def __init__(self, points, width, height):
+        self.n_cols = (width + CELL_SIZE - 1) // CELL_SIZE
+        self.n_rows = (height + CELL_SIZE - 1) // CELL_SIZE
+
+        # The projection can put a point on the horizon just past the last pixel, so it is kept
+        # in the last column or row.
+        cols = np.minimum(points[point.X] // CELL_SIZE, self.n_cols - 1)
+        rows = np.minimum(points[point.Y] // CELL_SIZE, self.n_rows - 1)
+        cells = rows * self.n_cols + cols
+        by_cell = np.argsort(cells, kind='stable')
+        self.ys = points[point.Y][by_cell]
+        self.xs = points[point.X][by_cell]
+        self.satrec_indices = points[point.SATREC_INDEX][by_cell]
+        # Points in cell c are from cell_starts[c] to cell_starts[c + 1].
+        self.cell_starts = np.searchsorted(cells[by_cell], np.arange(self.n_rows * self.n_cols + 1))
+
+    def nearest(self, y, x, max_distance):
+        """ The nearest point no more than max_distance pixels away across or down, as
+            (found, y, x, satrec_index).
+        """
+        top = max((y - max_distance) // CELL_SIZE, 0)
+        bottom = min((y + max_distance) // CELL_SIZE, self.n_rows - 1)
+        left = max((x - max_distance) // CELL_SIZE, 0)
+        right = min((x + max_distance) // CELL_SIZE, self.n_cols - 1)
+        if top > bottom or left > right:
+            return (False, None, None, None,)
+
+        # Each row of cells is a run of the sorted points.
+        candidates = np.concatenate([
+            np.arange(self.cell_starts[row * self.n_cols + left], self.cell_starts[row * self.n_cols + right + 1])
+            for row in range(top, bottom + 1)
+        ])
+        if len(candidates) == 0:
+            return (False, None, None, None,)
+
+        dy = np.abs(self.ys[candidates] - y)
+        dx = np.abs(self.xs[candidates] - x)
+        distance = np.maximum(dy, dx)
+        # Closest along the diagonal first, then straight line distance.
+        closest = np.lexsort((dy * dy + dx * dx, distance))[0]
+        if distance[closest] > max_distance:
+            return (False, None, None, None,)
+
+        i = candidates[closest]
+        return (True, int(self.ys[i]), int(self.xs[i]), int(self.satrec_indices[i]),)
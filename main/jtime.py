@@ -11,6 +11,11 @@ JULIAN_DATE_UT1_FRACTION_INTO_DAY = 'jdut1Frac'
 # Comments in code make it unclear if this is the correct time system's century,
 # but they are probably all the same.
 JULIAN_CENTRURIES_OF_DYNAMIC_TIME = 'ttt'
+# Rotation from TEME to ECEF for this time, as a row major 3x3 matrix.
+# It only depends on the time, so is calculated once per frame rather than per satellite.
+TEME_TO_ECEF = 'teme_ecef'
+# Rate term of the rotation, so that: vecef = teme_ecef * vteme + teme_ecef_rate * rteme
+TEME_TO_ECEF_RATE = 'teme_ecef_rate'
 
 def build_jtime_dtype():
     """Returns Numpy dtype definition of jtime C struct we will pass to the OpenCL kernal"""
@@ -20,6 +25,15 @@ def build_jtime_dtype():
         (JULIAN_FRACTION_INTO_DAY, cl.cltypes.double),
         (JULIAN_DATE_UT1, cl.cltypes.double),
         (JULIAN_DATE_UT1_FRACTION_INTO_DAY, cl.cltypes.double),
-        (JULIAN_CENTRURIES_OF_DYNAMIC_TIME, cl.cltypes.double)
+        (JULIAN_CENTRURIES_OF_DYNAMIC_TIME, cl.cltypes.double),
+        (TEME_TO_ECEF, (cl.cltypes.double, 9,)),
+        (TEME_TO_ECEF_RATE, (cl.cltypes.double, 9,))
     ])
 
+
+# Julian date of the unix epoch, 1970-01-01 00:00 UTC.
+_UNIX_EPOCH_JULIAN_DATE = 2440587.5
+
+def julian_date(utc_datetime):
+    """ The julian date of a time, in UTC, on the host for things that change slowly. """
+    return _UNIX_EPOCH_JULIAN_DATE + utc_datetime.timestamp() / (24 * 60 * 60)
@@ -1,24 +1,29 @@
 import pyopencl as cl
-import queue
+import sys
 import threading
 
-from frame_gen.frame_gen import create_images
+from frame_gen.frame_gen import create_images, FRAME_RING_FRAMES, FRAME_RING_BYTES
+from frame_gen.frame_ring import FrameRing
 from gui.gui import gui_display_images
 
 class Flags:
     def __init__(self):
         self.exiting = False
-        # So not a flag - just shared between threads.
-        self.satrec_buf = None
+        # So not flags - just shared between threads.
+        self.site_names = None
+        # The exception a thread failed with, after which everything exits.
+        self.error = None
 
 def main():
     flags = Flags()
-    q = queue.Queue()
+    frame_ring = FrameRing(FRAME_RING_FRAMES, FRAME_RING_BYTES)
     opencl_ctx = cl.create_some_context(interactive=False)
-    create_images_thread = threading.Thread(target=create_images, args=(q, flags, opencl_ctx,))
+    create_images_thread = threading.Thread(target=create_images, args=(frame_ring, flags, opencl_ctx,))
     create_images_thread.start()
-    gui_display_images(q, flags, opencl_ctx)
+    gui_display_images(frame_ring, flags)
     create_images_thread.join()
+    if flags.error is not None:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
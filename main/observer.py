@@ -0,0 +1,76 @@
+""" Observer sites
+
+The position of the observer on the Earth is fixed, so the site's ECEF
+position and the rotation from ECEF into the site's topocentric horizon
+(SEZ - south, east, zenith) frame are calculated once here, rather than
+for every satellite in every frame.
+
+See: vallado 2013, 265, alg 27 (rv_razel) and 430, alg 51 (site).
+"""
+import numpy as np
+import pyopencl as cl
+
+LATITUDE = 'latgd'  # geodetic latitude, radians
+LONGITUDE = 'lon'  # radians
+ALTITUDE = 'alt'  # km
+SITE_ECEF = 'rsecef'  # site position, km
+# Rotation from ECEF to SEZ as a row major 3x3 matrix.
+ECEF_TO_SEZ = 'ecef_sez'
+# Distance of the site's horizon plane from the centre of the Earth (site position . zenith), km.
+# Anything further than this along the zenith direction is above the horizon.
+HORIZON_HEIGHT = 'horizon_height'
+
+# (name, geodetic latitude degrees, longitude degrees, altitude km)
+ROYAL_GREENWICH_OBSERVATORY = ('Royal Greenwich Observatory', 51.477928, -0.001545, 0.068)
+CLOTH_HALL_LEEDS = ('Cloth Hall Leeds', 53.7965, -1.54785, 0.096)
+YORK = ('York', 53.966, -1.074, 0.013)
+
+# WGS-84, as used by the celestrak site routine.
+_EARTH_RADIUS_KM = 6378.137
+_EARTH_ECCENTRICITY_SQUARED = 0.00669437999013
+
+def build_observer_dtype():
+    """Returns Numpy dtype definition of observer C struct we will pass to the OpenCL kernal"""
+
+    return np.dtype([
+        (LATITUDE, cl.cltypes.double),
+        (LONGITUDE, cl.cltypes.double),
+        (ALTITUDE, cl.cltypes.double),
+        (SITE_ECEF, (cl.cltypes.double, 3,)),
+        (ECEF_TO_SEZ, (cl.cltypes.double, 9,)),
+        (HORIZON_HEIGHT, cl.cltypes.double)
+    ])
+
+def calc_observer(latitude_deg, longitude_deg, altitude_km):
+    """Calculate the observer fields into a dict that can be assigned into the Numpy array, that will be converted to C structs to pass to OpenCL kernal"""
+
+    latgd = np.radians(latitude_deg)
+    lon = np.radians(longitude_deg)
+
+    sin_lat = np.sin(latgd)
+    cos_lat = np.cos(latgd)
+    sin_lon = np.sin(lon)
+    cos_lon = np.cos(lon)
+
+    # Same as the celestrak site routine.
+    cearth = _EARTH_RADIUS_KM / np.sqrt(1.0 - (_EARTH_ECCENTRICITY_SQUARED * sin_lat * sin_lat))
+    rdel = (cearth + altitude_km) * cos_lat
+    rk = ((1.0 - _EARTH_ECCENTRICITY_SQUARED) * cearth + altitude_km) * sin_lat
+
+    # Same as the rot3(lon) followed by rot2(pi/2 - latgd) in the celestrak rv_razel routine.
+    rsecef = np.array([rdel * cos_lon, rdel * sin_lon, rk])
+
+    ecef_sez = np.array([
+        sin_lat * cos_lon, sin_lat * sin_lon, -cos_lat,
+        -sin_lon,          cos_lon,           0.0,
+        cos_lat * cos_lon, cos_lat * sin_lon, sin_lat
+    ])
+
+    obs = {}
+    obs[LATITUDE] = cl.cltypes.double(latgd)
+    obs[LONGITUDE] = cl.cltypes.double(lon)
+    obs[ALTITUDE] = cl.cltypes.double(altitude_km)
+    obs[SITE_ECEF] = rsecef.astype(cl.cltypes.double)
+    obs[ECEF_TO_SEZ] = ecef_sez.astype(cl.cltypes.double)
+    obs[HORIZON_HEIGHT] = cl.cltypes.double(np.dot(rsecef, ecef_sez[6:9]))
+    return obs
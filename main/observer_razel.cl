@@ -0,0 +1,51 @@
+#include "observer.h"
+#include "celestrak/sgp4/SGP4.h"
+
+/*
+ * Range, azimuth and elevation of a satellite from an observer's site.
+ * The same as the celestrak rv_razel routine (without the rates), but using the site
+ * position and SEZ rotation calculated once on the host, instead of for every call.
+ */
+void observer_razel(
+    const observer *obs,
+    double recef[3], double vecef[3],
+    double *rho, double *az, double *el
+)
+{
+    const double halfpi = pi / 2.0;
+    const double small = 0.0000001;
+
+    double rhoecef[3], rhosez[3], drhosez[3];
+    for (int i = 0; i < 3; i++) {
+        rhoecef[i] = recef[i] - obs->rsecef[i];
+    }
+    for (int row = 0; row < 3; row++) {
+        rhosez[row] = 0.0;
+        drhosez[row] = 0.0;
+        for (int col = 0; col < 3; col++) {
+            rhosez[row] += obs->ecef_sez[row*3 + col] * rhoecef[col];
+            drhosez[row] += obs->ecef_sez[row*3 + col] * vecef[col];
+        }
+    }
+    *rho = sqrt(rhosez[0] * rhosez[0] + rhosez[1] * rhosez[1] + rhosez[2] * rhosez[2]);
+
+    double temp = sqrt(rhosez[0] * rhosez[0] + rhosez[1] * rhosez[1]);
+    if (fabs(rhosez[1]) < small)
+        if (temp < small)
+        {
+            double temp1 = sqrt(drhosez[0] * drhosez[0] + drhosez[1] * drhosez[1]);
+            *az = atan2(drhosez[1] / temp1, -drhosez[0] / temp1);
+        }
+        else
+            if (rhosez[0] > 0.0)
+                *az = pi;
+            else
+                *az = 0.0;
+    else
+        *az = atan2(rhosez[1] / temp, -rhosez[0] / temp);
+
+    if (temp < small)  // directly over the north pole
+        *el = (rhosez[2] < 0.0 ? -1.0 : 1.0) * halfpi; // +- 90
+    else
+        *el = asin(rhosez[2] / *rho);
+}
@@ -0,0 +1,178 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+#include "tle.h"
+
+/*
+ * Parses TLEs on the device, a work item for each satellite, so the catalogue's raw lines can
+ * go straight to calc_satrecs without being parsed on the host.  It decodes the fields the
+ * same way as tle.parse_tle_lines, and gives the same values.
+ */
+
+#define TLE_LINE_LENGTH 69
+
+// Error bits for each record, as in tle.py.
+#define TLE_LINE1_FORMAT_ERROR 1
+#define TLE_LINE2_FORMAT_ERROR 2
+#define TLE_SATNUM_MISMATCH_ERROR 4
+#define TLE_LINE1_CHECK_DIGIT_ERROR 8
+#define TLE_LINE2_CHECK_DIGIT_ERROR 16
+
+/*
+ * The characters allowed in each column, as _LINE1_TEMPLATE and _LINE2_TEMPLATE in tle.py.
+ * Other than a literal character a column is one of:
+ *   d digit, s digit or space, A Alpha-5 leading character, U classification,
+ *   + sign or space, - sign, z 0 or space, x anything
+ */
+__constant char line1_template[TLE_LINE_LENGTH + 1] =
+    "1 AddddU xxxxxxxx ddssd.dddddddd +.dddddddd +ddddd-d +ddddd-d z sssdd";
+__constant char line2_template[TLE_LINE_LENGTH + 1] =
+    "2 Adddd ssd.dddd ssd.dddd ddddddd ssd.dddd ssd.dddd sd.ddddddddssssdd";
+
+// Exact as doubles, unlike what pow() may give.
+__constant double powers_of_ten[] = {
+    1e0, 1e1, 1e2, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9, 1e10, 1e11, 1e12, 1e13, 1e14, 1e15
+};
+
+bool is_digit(char c);
+bool matches_template(__global const char *line, __constant const char *template);
+int check_digit_error(__global const char *line);
+double digits(__global const char *line, int start, int end);
+double fixed_point(__global const char *line, int whole_start, int whole_end, int fraction_start, int fraction_end);
+double sign_of(char c);
+double assumed_decimal_exponent(__global const char *line, int start);
+
+/*
+ * lines holds the two lines of each satellite, one after the other, each TLE_LINE_LENGTH
+ * characters without a line end.  The error bits of each record go in errors, 0 if it parsed.
+ */
+__kernel void parse_tle_lines(
+    __global const char *lines,
+    __global tle *tle_array,
+    __global int *errors
+)
+{
+    const size_t index = get_global_id(0);
+    __global const char *line1 = &lines[index * 2 * TLE_LINE_LENGTH];
+    __global const char *line2 = line1 + TLE_LINE_LENGTH;
+
+    int error = 0;
+    if (!matches_template(line1, line1_template)) {
+        error |= TLE_LINE1_FORMAT_ERROR;
+    }
+    if (!matches_template(line2, line2_template)) {
+        error |= TLE_LINE2_FORMAT_ERROR;
+    }
+    for (int i = 2; i < 7; i++) {
+        if (line1[i] != line2[i]) {
+            error |= TLE_SATNUM_MISMATCH_ERROR;
+        }
+    }
+    if (check_digit_error(line1)) {
+        error |= TLE_LINE1_CHECK_DIGIT_ERROR;
+    }
+    if (check_digit_error(line2)) {
+        error |= TLE_LINE2_CHECK_DIGIT_ERROR;
+    }
+    errors[index] = error;
+
+    tle t;
+    for (int i = 0; i < 5; i++) {
+        t.satnum[i] = line1[2 + i];
+    }
+    t.satnum[5] = '\0';
+    // See notes for fields 1.7 & 1.8 https://celestrak.org/columns/v04n03/
+    t.epochyr = (int) digits(line1, 18, 20);
+    t.epochdays = fixed_point(line1, 20, 23, 24, 32);
+    t.ndot = sign_of(line1[33]) * fixed_point(line1, 34, 34, 35, 43);
+    // See note for field 1.10 & 1.11 https://celestrak.org/columns/v04n03/
+    t.nddot = assumed_decimal_exponent(line1, 44);
+    t.bstar = assumed_decimal_exponent(line1, 53);
+
+    t.inclo = fixed_point(line2, 8, 11, 12, 16); // degrees
+    t.nodeo = fixed_point(line2, 17, 20, 21, 25); // degrees
+    // See note for field 2.5 https://celestrak.org/columns/v04n03/
+    t.ecco = fixed_point(line2, 26, 26, 26, 33);
+    t.argpo = fixed_point(line2, 34, 37, 38, 42); // degrees
+    t.mo = fixed_point(line2, 43, 46, 47, 51); // degrees
+    t.no_kozai = fixed_point(line2, 52, 54, 55, 63); // revolutions per day
+    t.revnum = (int) digits(line2, 63, 68);
+
+    tle_array[index] = t;
+}
+
+bool is_digit(char c)
+{
+    return c >= '0' && c <= '9';
+}
+
+bool matches_template(__global const char *line, __constant const char *template)
+{
+    for (int i = 0; i < TLE_LINE_LENGTH; i++) {
+        const char c = line[i];
+        bool ok;
+        switch (template[i]) {
+            case 'd': ok = is_digit(c); break;
+            case 's': ok = is_digit(c) || c == ' '; break;
+            case 'A': ok = is_digit(c) || (c >= 'A' && c <= 'Z' && c != 'I' && c != 'O'); break;
+            case 'U': ok = c == 'U' || c == 'C' || c == 'S'; break;
+            case '+': ok = c == '-' || c == '+' || c == ' '; break;
+            case '-': ok = c == '-' || c == '+'; break;
+            case 'z': ok = c == '0' || c == ' '; break;
+            case 'x': ok = c != '\0'; break;
+            default: ok = c == template[i]; break;
+        }
+        if (!ok) {
+            return false;
+        }
+    }
+    return true;
+}
+
+int check_digit_error(__global const char *line)
+{
+    // See notes for field 1.14 https://celestrak.org/columns/v04n03/
+    int cksum = 0;
+    for (int i = 0; i < TLE_LINE_LENGTH - 1; i++) {
+        const char c = line[i];
+        cksum += is_digit(c) ? c - '0' : c == '-' ? 1 : 0;
+    }
+    return cksum % 10 != line[TLE_LINE_LENGTH - 1] - '0';
+}
+
+/*
+ * The value of the digits from start up to end, spaces counting as 0.  There are at most 11
+ * digits in a field, so the value is exact.
+ */
+double digits(__global const char *line, int start, int end)
+{
+    double value = 0.0;
+    for (int i = start; i < end; i++) {
+        value = value * 10.0 + (is_digit(line[i]) ? line[i] - '0' : 0);
+    }
+    return value;
+}
+
+/*
+ * Both the digits and the power of ten are exact, so dividing one by the other rounds the same
+ * as parsing the decimal.
+ */
+double fixed_point(__global const char *line, int whole_start, int whole_end, int fraction_start, int fraction_end)
+{
+    const double scale = powers_of_ten[fraction_end - fraction_start];
+    return (digits(line, whole_start, whole_end) * scale + digits(line, fraction_start, fraction_end)) / scale;
+}
+
+double sign_of(char c)
+{
+    return c == '-' ? -1.0 : 1.0;
+}
+
+/*
+ * Decodes a field such as ' 10158-4', which is 0.10158E-4.
+ */
+double assumed_decimal_exponent(__global const char *line, int start)
+{
+    const double mantissa = sign_of(line[start]) * digits(line, start + 1, start + 6);
+    const int exponent = (line[start + 6] == '-' ? -1 : 1) * (int) digits(line, start + 7, start + 8) - 5;
+    return exponent < 0 ? mantissa / powers_of_ten[-exponent] : mantissa * powers_of_ten[exponent];
+}
@@ -0,0 +1,89 @@
+""" Points
+
+Rather than drawing into an image for every frame, the projections kernel appends a
+point record for each satellite that is above an observer's horizon in a frame.  There
+are only a few thousand in a frame, so they are quick to copy back from the device.  They
+are drawn into the images of each frame, a frame at a time as they are handed to the gui,
+by render_kernel.cl.
+"""
+import numpy as np
+import pyopencl as cl
+
+FRAME = 'frame'
+OBSERVER_INDEX = 'observer_index'
+# Pixel position in the image.
+X = 'x'
+Y = 'y'
+SATREC_INDEX = 'satrec_index'
+RANGE = 'range'  # km
+ELEVATION = 'elevation'  # radians
+# Only with geodetic, when the kernel is built with POINT_GEODETIC defined.
+LATITUDE = 'latitude'  # geodetic, degrees
+LONGITUDE = 'longitude'  # degrees
+ALTITUDE = 'altitude'  # km
+SPEED = 'speed'  # km/s, relative to the Earth's surface
+
+# Compiler option to build the projections kernel to match build_point_dtype(geodetic=True).
+GEODETIC_BUILD_OPTION = ' -D POINT_GEODETIC '
+
+# Position table entry: where a satellite is in a frame, if visible.
+VISIBLE = 'visible'
+
+def build_point_dtype(geodetic=False):
+    """Returns Numpy dtype definition of point C struct we will pass to the OpenCL kernal"""
+
+    fields = [
+        (FRAME, cl.cltypes.int),
+        (OBSERVER_INDEX, cl.cltypes.int),
+        (X, cl.cltypes.int),
+        (Y, cl.cltypes.int),
+        (SATREC_INDEX, cl.cltypes.int),
+        (RANGE, cl.cltypes.double),
+        (ELEVATION, cl.cltypes.double)
+    ]
+    if geodetic:
+        fields += [
+            (LATITUDE, cl.cltypes.double),
+            (LONGITUDE, cl.cltypes.double),
+            (ALTITUDE, cl.cltypes.double),
+            (SPEED, cl.cltypes.double)
+        ]
+    return np.dtype(fields)
+
+def build_position_dtype():
+    """Returns Numpy dtype definition of position C struct we will pass to the OpenCL kernal"""
+
+    return np.dtype([
+        (X, cl.cltypes.int),
+        (Y, cl.cltypes.int),
+        (VISIBLE, cl.cltypes.int)
+    ])
+
+class FramePositions:
+    """ Where each of the satellites flagged as possibly visible in a batch is, in one frame.
+
+        rows holds a row of positions, one for each observer, for each of the flagged
+        satellites.  row_of_satrec gives the row for a satrec index, or -1 if it was not
+        flagged, in which case it is not visible in the batch.
+    """
+
+    def __init__(self, rows, row_of_satrec):
+        self.rows = rows
+        self.row_of_satrec = row_of_satrec
+
+    def find(self, satrec_index, observer_index):
+        """ Where the satellite is as (visible, y, x). """
+        row = self.row_of_satrec[satrec_index]
+        if row < 0:
+            return (False, None, None,)
+        position = self.rows[row, observer_index]
+        if not position[VISIBLE]:
+            return (False, None, None,)
+        return (True, int(position[Y]), int(position[X]),)
+
+def split_frames(points, n_frames):
+    """ Splits the points into a list with the points for each frame. """
+
+    points = points[np.argsort(points[FRAME], kind='stable')]
+    bounds = np.searchsorted(points[FRAME], np.arange(n_frames + 1))
+    return [points[bounds[i]:bounds[i + 1]] for i in range(n_frames)]
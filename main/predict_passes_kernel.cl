@@ -0,0 +1,190 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+#include "jtime.h"
+#include "observer.h"
+#include "calculate_jtime.cl"
+#include "celestrak/mathtimelib/MathTimeLib.h"
+#include "celestrak/astrolib/AstroLib.h"
+#include "celestrak/sgp4/SGP4.h"
+#include "celestrak/mathtimelib/MathTimeLib.cl"
+#include "celestrak/astrolib/AstroLib.cl"
+#include "celestrak/sgp4/SGP4.cl"
+#include "calc_ecef.cl"
+#include "observer_razel.cl"
+#include "visibility_bound.cl"
+
+/*
+ * Passes are found with a margin below the horizon, so a pass that only just clears
+ * the horizon between two samples is not missed.  The slack from visibility_bound.cl is
+ * for the horizon itself, so the allowance is widened to cover the margin.
+ */
+#define PASS_ELEVATION_MARGIN (2.0 * pi / 180.0)
+#define PASS_SLACK_ALLOWANCE (2.0 * PASS_ELEVATION_MARGIN)
+#define PASS_EDGE_TOLERANCE_SECS 1.0
+
+typedef struct {
+    int year, month, day, hour, min;
+    double sec;
+    double ut1_utc_diff_secs;
+} pass_window;
+
+bool sample_pass(elsetrec *satrec, const pass_window *window, double t, double max_radius, int n_observers, __global const observer *observers, bool *up, double *slack);
+double pass_edge(elsetrec *satrec, const pass_window *window, double t_before, double t_after, bool rising, double max_radius, int n_observers, __global const observer *observers);
+
+/*
+ * Each work item finds the passes of one of the satellites in satrec_indices over any of the
+ * observers, in the window of window_secs after the given start time.  The acquisition and
+ * loss of signal times, in seconds from the start, go in pass_times as (aos, los) pairs,
+ * max_passes for each work item, and their number in n_passes.
+ *
+ * Away from the horizon the satellite is sampled only as often as the visibility bound
+ * allows, and near it every step_secs.  The edges of each pass are then found by bisection.
+ * If there are more passes than max_passes, the last one runs to the end of the window.
+ */
+__kernel void predict_passes(
+    int p_year, int p_month, int p_day,
+    int p_hour, int p_min, double p_sec,
+    double p_ut1_utc_diff_secs,
+    double window_secs,
+    double step_secs,
+    int max_passes,
+    int n_observers,
+    __global const int *satrec_indices,
+    __global const elsetrec *satrec_array,
+    __global const observer *observers,
+    __global double *pass_times,
+    __global int *n_passes
+)
+{
+    const size_t i = get_global_id(0);
+    elsetrec satrec = satrec_array[satrec_indices[i]];
+    const pass_window window = {p_year, p_month, p_day, p_hour, p_min, p_sec, p_ut1_utc_diff_secs};
+    __global double *passes = &pass_times[i * max_passes * 2];
+
+    const double max_radius = max_orbit_radius(&satrec);
+    const double max_rate = max_angular_rate(&satrec);
+
+    int n = 0;
+    double t = 0.0;
+    double t_prev = 0.0;
+    bool up_prev = false;
+    double aos = 0.0;
+    while (true) {
+        bool up;
+        double slack;
+        bool ok = sample_pass(&satrec, &window, t, max_radius, n_observers, observers, &up, &slack);
+        if (!ok) {
+            // Propagation has failed, most likely the satellite has decayed.
+            if (up_prev) {
+                passes[2*n] = aos;
+                passes[2*n + 1] = t;
+                n++;
+            }
+            break;
+        }
+
+        if (up && !up_prev) {
+            aos = t == 0.0 ? 0.0 : pass_edge(&satrec, &window, t_prev, t, true, max_radius, n_observers, observers);
+            if (n == max_passes - 1) {
+                passes[2*n] = aos;
+                passes[2*n + 1] = window_secs;
+                n++;
+                break;
+            }
+        } else if (!up && up_prev) {
+            passes[2*n] = aos;
+            passes[2*n + 1] = pass_edge(&satrec, &window, t_prev, t, false, max_radius, n_observers, observers);
+            n++;
+        }
+
+        if (t >= window_secs) {
+            if (up) {
+                passes[2*n] = aos;
+                passes[2*n + 1] = window_secs;
+                n++;
+            }
+            break;
+        }
+
+        double advance = step_secs;
+        if (!up && slack > PASS_SLACK_ALLOWANCE) {
+            advance = fmax(step_secs, (slack - PASS_SLACK_ALLOWANCE) / max_rate);
+        }
+        t_prev = t;
+        up_prev = up;
+        t = fmin(t + advance, window_secs);
+    }
+    n_passes[i] = n;
+}
+
+/*
+ * Samples the satellite t seconds into the window.  It is up if within the margin of being
+ * above any observer's horizon.  Returns false if sgp4 fails.
+ */
+bool sample_pass(
+    elsetrec *satrec,
+    const pass_window *window,
+    double t,
+    double max_radius,
+    int n_observers,
+    __global const observer *observers,
+    bool *up,
+    double *slack
+)
+{
+    const jtime jt = calculate_jtime(window->year, window->month, window->day, window->hour, window->min,
+                                     window->sec + t, window->ut1_utc_diff_secs);
+
+    double recef[3], vecef[3];
+    if (!calc_ecef(satrec, &jt, recef, vecef)) {
+        return false;
+    }
+
+    *up = false;
+    *slack = horizon_slack(recef, max_radius, n_observers, observers);
+    if (*slack > PASS_SLACK_ALLOWANCE) {
+        return true;
+    }
+
+    for (int i = 0; i < n_observers; i++) {
+        const observer obs = observers[i];
+        double rho, az, el;
+        observer_razel(&obs, recef, vecef, &rho, &az, &el);
+        if (el > -PASS_ELEVATION_MARGIN) {
+            *up = true;
+            break;
+        }
+    }
+    return true;
+}
+
+/*
+ * Bisects between a sample on either side of the rise or set of a pass.  The time returned
+ * is on the outside of the pass, so the pass is never shortened.
+ */
+double pass_edge(
+    elsetrec *satrec,
+    const pass_window *window,
+    double t_before,
+    double t_after,
+    bool rising,
+    double max_radius,
+    int n_observers,
+    __global const observer *observers
+)
+{
+    while (t_after - t_before > PASS_EDGE_TOLERANCE_SECS) {
+        double t_mid = 0.5 * (t_before + t_after);
+        bool up;
+        double slack;
+        if (!sample_pass(satrec, window, t_mid, max_radius, n_observers, observers, &up, &slack)) {
+            break;
+        }
+        if (up == rising) {
+            t_after = t_mid;
+        } else {
+            t_before = t_mid;
+        }
+    }
+    return rising ? t_before : t_after;
+}
@@ -0,0 +1,171 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+#include "point.h"
+#include "style.h"
+
+/*
+ * Draws the points of a frame into an image for each observer.
+ *
+ * draw_points has a work item for each point.  It draws a disc in the colour of the
+ * satellite's style, shrinking with range beyond reference_range to a single pixel, with
+ * its edge anti-aliased.  Discs that overlap are added together, a channel at a time, into
+ * channels, indexed by (observer, y, x, channel).  Adding with atomics means the result
+ * doesn't depend on the order the work items run in.
+ *
+ * With trails, draw_points also keeps where each satellite is in the last trail_frames
+ * frames, in the trails ring buffer indexed by (row, observer, satrec), with the frame's row
+ * at trail_row.  A satellite not visible in a frame has -1 there, as the caller fills the
+ * row with -1 before the frame is drawn.  draw_trails has a work item for each point, and
+ * draws lines back through the satellite's earlier positions, fading as they get older.
+ *
+ * draw_sky has a work item for each sky object and observer, and draws the object at its
+ * pixel in the frame's row of sky_positions (see sky_kernel.cl) in its style, at full size.
+ *
+ * pack_pixels has a work item for each pixel, and packs its channels, saturated, into a
+ * little endian RGBA pixel.
+ */
+
+// Trail segments longer than this, in pixels, are not drawn.
+#define MAX_TRAIL_SEGMENT 64
+
+void draw_disc(__global uint *channels, int image_width, int image_height, int observer_index, int x, int y, const style *s, float radius);
+void add_colour(__global uint *channels, int image_width, int image_height, int observer_index, int x, int y, const uint colour[3], float weight);
+void style_colour(const style *s, uint colour[3]);
+
+__kernel void draw_points(
+    int image_width,
+    int image_height,
+    double reference_range,
+    __global const point *points,
+    __global const uchar *style_of_satrec,
+    __global const style *palette,
+    __global uint *channels,
+    int trail_frames,
+    int trail_row,
+    int n_observers,
+    int n_satrecs,
+    __global int2 *trails
+)
+{
+    const size_t i = get_global_id(0);
+    const point p = points[i];
+    const style s = palette[style_of_satrec[p.satrec_index]];
+
+    if (trail_frames > 0) {
+        trails[((size_t)trail_row * n_observers + p.observer_index) * n_satrecs + p.satrec_index] = (int2)(p.x, p.y);
+    }
+
+    const float radius = s.radius * min(1.0, reference_range / p.range);
+    draw_disc(channels, image_width, image_height, p.observer_index, p.x, p.y, &s, radius);
+}
+
+__kernel void draw_trails(
+    int image_width,
+    int image_height,
+    float trail_intensity,
+    __global const point *points,
+    __global const uchar *style_of_satrec,
+    __global const style *palette,
+    __global uint *channels,
+    int trail_frames,
+    int trail_row,
+    int n_observers,
+    int n_satrecs,
+    __global const int2 *trails
+)
+{
+    const size_t i = get_global_id(0);
+    const point p = points[i];
+    const style s = palette[style_of_satrec[p.satrec_index]];
+    uint colour[3];
+    style_colour(&s, colour);
+
+    int2 from = (int2)(p.x, p.y);
+    for (int age = 1; age < trail_frames; age++) {
+        const int row = (trail_row - age + trail_frames) % trail_frames;
+        const int2 to = trails[((size_t)row * n_observers + p.observer_index) * n_satrecs + p.satrec_index];
+        if (to.x < 0) {
+            return;
+        }
+
+        const int steps = max(abs(to.x - from.x), abs(to.y - from.y));
+        if (steps > MAX_TRAIL_SEGMENT) {
+            return;
+        }
+        const float weight = trail_intensity * (1.0f - (float)age / trail_frames);
+        // From the pixel after the start, so the joins aren't drawn twice.
+        for (int step = 1; step <= steps; step++) {
+            const int x = from.x + (int)round((float)(to.x - from.x) * step / steps);
+            const int y = from.y + (int)round((float)(to.y - from.y) * step / steps);
+            add_colour(channels, image_width, image_height, p.observer_index, x, y, colour, weight);
+        }
+        from = to;
+    }
+}
+
+__kernel void draw_sky(
+    int image_width,
+    int image_height,
+    int frame,
+    __global const int2 *sky_positions,
+    __global const style *sky_styles,
+    __global uint *channels
+)
+{
+    const size_t object = get_global_id(0);
+    const int observer_index = get_global_id(1);
+    const size_t n_objects = get_global_size(0);
+    const int n_observers = get_global_size(1);
+
+    const int2 pixel = sky_positions[((size_t)frame * n_observers + observer_index) * n_objects + object];
+    if (pixel.x < 0) {
+        return;
+    }
+    const style s = sky_styles[object];
+    draw_disc(channels, image_width, image_height, observer_index, pixel.x, pixel.y, &s, s.radius);
+}
+
+__kernel void pack_pixels(
+    __global const uint *channels,
+    __global uint *pixels
+)
+{
+    const size_t i = get_global_id(0);
+    const uint red = min(channels[i * 3], 255u);
+    const uint green = min(channels[i * 3 + 1], 255u);
+    const uint blue = min(channels[i * 3 + 2], 255u);
+    pixels[i] = red | green << 8 | blue << 16 | 0xffu << 24;
+}
+
+void draw_disc(__global uint *channels, int image_width, int image_height, int observer_index, int x, int y, const style *s, float radius)
+{
+    const int reach = (int)ceil(radius);
+    uint colour[3];
+    style_colour(s, colour);
+
+    for (int dy = -reach; dy <= reach; dy++) {
+        for (int dx = -reach; dx <= reach; dx++) {
+            // Full strength within the radius, fading over the pixel beyond.
+            const float weight = clamp(radius + 1.0f - sqrt((float)(dx * dx + dy * dy)), 0.0f, 1.0f);
+            add_colour(channels, image_width, image_height, observer_index, x + dx, y + dy, colour, weight);
+        }
+    }
+}
+
+void add_colour(__global uint *channels, int image_width, int image_height, int observer_index, int x, int y, const uint colour[3], float weight)
+{
+    if (weight <= 0.0f || x < 0 || x >= image_width || y < 0 || y >= image_height) {
+        return;
+    }
+    __global uint *pixel = &channels[(((size_t)observer_index * image_height + y) * image_width + x) * 3];
+    for (int c = 0; c < 3; c++) {
+        atomic_add(&pixel[c], (uint)(weight * colour[c] + 0.5f));
+    }
+}
+
+void style_colour(const style *s, uint colour[3])
+{
+    colour[0] = s->colour & 0xff;
+    colour[1] = (s->colour >> 8) & 0xff;
+    colour[2] = (s->colour >> 16) & 0xff;
+}
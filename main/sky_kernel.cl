@@ -0,0 +1,108 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+#include "jtime.h"
+#include "observer.h"
+#include "celestrak/mathtimelib/MathTimeLib.h"
+#include "celestrak/astrolib/AstroLib.h"
+#include "celestrak/sgp4/SGP4.h"
+#include "celestrak/mathtimelib/MathTimeLib.cl"
+#include "celestrak/astrolib/AstroLib.cl"
+#include "celestrak/sgp4/SGP4.cl"
+
+// km
+#define ASTRONOMICAL_UNIT 149597870.7
+
+bool sky_teme(size_t object, const jtime *jt, __global const double *star_directions, double rteme[3]);
+
+/*
+ * Projects the sky objects, the sun, moon and stars of frame_gen/sky.py, for each frame of a
+ * batch.  There is a work item for each object and frame.
+ *
+ * The sun and moon are placed with the celestrak sun and moon routines, which take the time
+ * in TDB.  UT1 is used instead, as the minute or so between them moves neither by a pixel.
+ * Their directions from each site allow for where the site is on the earth, which matters
+ * for the moon.  The stars are too far away for it to matter, so only their direction is
+ * given, in star_directions.
+ *
+ * The routines give the sun and moon in a frame that precesses with the date, close enough
+ * to TEME to use the frame's TEME to ECEF rotation, as is done for the stars.
+ *
+ * The stars are the objects after the sun and moon, as many as the work size allows for.
+ * sky_positions is indexed by (frame, observer, object), and has the pixel each object is at,
+ * or -1 if below the horizon.  The pixel is worked out as in generate_projections_kernel.cl,
+ * but from the direction in the site's SEZ frame, rather than the azimuth and elevation.
+ */
+__kernel void project_sky(
+    int image_width,
+    int image_height,
+    int n_observers,
+    __global const jtime *jtimes,
+    __global const observer *observers,
+    __global const double *star_directions,
+    __global int2 *sky_positions
+)
+{
+    const size_t object = get_global_id(0);
+    const size_t frame = get_global_id(1);
+    const size_t n_objects = get_global_size(0);
+    const jtime jt = jtimes[frame];
+
+    double rteme[3];
+    const bool is_position = sky_teme(object, &jt, star_directions, rteme);
+
+    double recef[3];
+    for (int row = 0; row < 3; row++) {
+        recef[row] = 0.0;
+        for (int col = 0; col < 3; col++) {
+            recef[row] += jt.teme_ecef[row*3 + col] * rteme[col];
+        }
+    }
+
+    for (int i = 0; i < n_observers; i++) {
+        const observer obs = observers[i];
+        double rhoecef[3], rhosez[3];
+        for (int row = 0; row < 3; row++) {
+            rhoecef[row] = is_position ? recef[row] - obs.rsecef[row] : recef[row];
+        }
+        for (int row = 0; row < 3; row++) {
+            rhosez[row] = 0.0;
+            for (int col = 0; col < 3; col++) {
+                rhosez[row] += obs.ecef_sez[row*3 + col] * rhoecef[col];
+            }
+        }
+        const double rho = sqrt(rhosez[0] * rhosez[0] + rhosez[1] * rhosez[1] + rhosez[2] * rhosez[2]);
+
+        int2 pixel = (int2)(-1, -1);
+        if (rhosez[2] > 0.0) {
+            const double r0w = image_width/2.0;
+            const double r0 = image_height/2.0;
+            // Same as sin(azimuth) * cos(elevation), and cos(azimuth) * cos(elevation).
+            pixel = (int2)((int)(r0w - rhosez[1] / rho * r0w), (int)(r0 + rhosez[0] / rho * r0));
+        }
+        sky_positions[(frame * n_observers + i) * n_objects + object] = pixel;
+    }
+}
+
+/*
+ * Sets rteme to the position of the object, in km, or for a star its direction.  Returns
+ * whether it is a position.
+ */
+bool sky_teme(size_t object, const jtime *jt, __global const double *star_directions, double rteme[3])
+{
+    double rtasc, decl;
+    if (object == 0) {
+        sun(jt->jdut1, jt->jdut1Frac, rteme, &rtasc, &decl);
+        for (int i = 0; i < 3; i++) {
+            rteme[i] *= ASTRONOMICAL_UNIT;
+        }
+        return true;
+    }
+    if (object == 1) {
+        moon(jt->jdut1, jt->jdut1Frac, rteme, &rtasc, &decl);
+        return true;
+    }
+    for (int i = 0; i < 3; i++) {
+        rteme[i] = star_directions[(object - 2) * 3 + i];
+    }
+    return false;
+}
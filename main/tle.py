@@ -166,3 +166,186 @@ def _calc_expected_check_digit(line):
         val = ord(chr)-ord('0') if '0' <= chr <= '9' else 1 if chr == '-' else 0
         cksum += val
     return (cksum % 10)
+
+# Bulk parsing.  A whole feed, or many TLE files, is parsed at once as fixed width arrays of
+# characters, a row for each line, decoding each field from its columns.
+LINE_LENGTH = 69
+
+# Error bits for each record parsed in bulk, as in parse_tle_kernel.cl.
+LINE1_FORMAT_ERROR = 1
+LINE2_FORMAT_ERROR = 2
+SATNUM_MISMATCH_ERROR = 4
+LINE1_CHECK_DIGIT_ERROR = 8
+LINE2_CHECK_DIGIT_ERROR = 16
+
+def to_fixed_width(lines):
+    """ The lines as an array of characters, a row of LINE_LENGTH for each line.
+        Trailing white space is dropped and short lines are padded with nulls.
+    """
+    encoded = [(line.encode() if isinstance(line, str) else line).rstrip() for line in lines]
+    return np.array(encoded, dtype='S{}'.format(LINE_LENGTH)).view(np.uint8).reshape(-1, LINE_LENGTH)
+
+def parse_tle_feed(feed):
+    """ Parses a feed of TLEs in the three line format, a name line before each pair of element
+        lines, as fetched from Celestrak.  Returns the names and the records in the tle dtype.
+    """
+    text = feed.decode() if isinstance(feed, bytes) else feed
+    lines = [line for line in text.splitlines() if line.strip() != '']
+    if len(lines) % 3 != 0:
+        raise Exception("TLE feed has {} lines, which is not 3 for each satellite".format(len(lines)))
+
+    names = [name.strip() for name in lines[0::3]]
+    return (names, parse_tle_lines(names, to_fixed_width(lines[1::3]), to_fixed_width(lines[2::3])),)
+
+def parse_tle_lines(tle_names, line1, line2, tle_dtype=None):
+    """ Parses the element lines, given as fixed width character arrays (see to_fixed_width),
+        into an array of tle_dtype (by default build_tle_dtype()).  The names are only used in
+        error messages.
+    """
+    line1 = np.asarray(line1, np.uint8).reshape(-1, LINE_LENGTH)
+    line2 = np.asarray(line2, np.uint8).reshape(-1, LINE_LENGTH)
+    _validate_tle_lines(tle_names, line1, line2)
+
+    tle_array = np.zeros(len(line1), build_tle_dtype() if tle_dtype is None else tle_dtype)
+    tle_array[SATELLITE_NUMBER][:, :5] = line1[:, 2:7].view(cl.cltypes.char)
+    # See notes for fields 1.7 & 1.8 https://celestrak.org/columns/v04n03/
+    tle_array[EPOCH_YEAR] = _digits(line1[:, 18:20])
+    tle_array[EPOCH_DAYS] = _fixed_point(line1[:, 20:23], line1[:, 24:32])
+    tle_array[FIRST_DERIVATIVE_OF_MEAN_MOTION] = _sign(line1[:, 33]) * _fixed_point(line1[:, 34:34], line1[:, 35:43])
+    # See note for field 1.10 & 1.11 https://celestrak.org/columns/v04n03/
+    tle_array[SECOND_DERIVATIVE_OF_MEAN_MOTION] = _assumed_decimal_exponent(line1[:, 44:52])
+    tle_array[BSTAR_DRAG_COEFFICIENT] = _assumed_decimal_exponent(line1[:, 53:61])
+
+    tle_array[ORBITAL_INCLINATION] = _fixed_point(line2[:, 8:11], line2[:, 12:16]) # degrees
+    tle_array[RIGHT_ASCENSION] = _fixed_point(line2[:, 17:20], line2[:, 21:25]) # degrees
+    # See note for field 2.5 https://celestrak.org/columns/v04n03/
+    tle_array[ORBITAL_ECCENTRICITY] = _fixed_point(line2[:, 26:26], line2[:, 26:33])
+    tle_array[ARG_OF_PERIGEE] = _fixed_point(line2[:, 34:37], line2[:, 38:42]) # degrees
+    tle_array[MEAN_ANOMALY] = _fixed_point(line2[:, 43:46], line2[:, 47:51]) # degrees
+    tle_array[MEAN_MOTION] = _fixed_point(line2[:, 52:54], line2[:, 55:63]) # revolutions per day
+    tle_array[REVOLUTION_NUMBER_AT_EPOCH] = _digits(line2[:, 63:68])
+    return tle_array
+
+def satellite_numbers(tle_array):
+    """ The catalogue numbers of the satellites, with Alpha-5 numbers decoded: the leading
+        letter stands for 10 to 33, skipping I and O, so A0000 is 100000.
+    """
+    satnum = tle_array[SATELLITE_NUMBER][:, :5].view(np.uint8)
+    return _ALPHA5_VALUES[satnum[:, 0]] * 10000 + _digits(satnum[:, 1:]).astype(np.int64)
+
+def alpha5(satellite_number):
+    """ The satellite number as it appears in the element lines, Alpha-5 encoded if over 99999. """
+    return _ALPHA5_CHARS[satellite_number // 10000] + '{:04d}'.format(satellite_number % 10000)
+
+def _digits(chars):
+    """ The value of columns of digits, spaces counting as 0.  There are at most 11 digits in a
+        field, so the value is exact as a double.
+    """
+    return _DIGIT_VALUES[chars] @ (10.0 ** np.arange(chars.shape[1] - 1, -1, -1))
+
+def _fixed_point(whole_chars, fraction_chars):
+    # Both the digits and the power of ten are exact as doubles, so dividing one by the other
+    # rounds the same as parsing the decimal.
+    scale = 10.0 ** fraction_chars.shape[1]
+    return (_digits(whole_chars) * scale + _digits(fraction_chars)) / scale
+
+def _sign(chars):
+    return np.where(chars == ord('-'), -1.0, 1.0)
+
+def _assumed_decimal_exponent(chars):
+    """ Decodes a field such as ' 10158-4', which is 0.10158E-4. """
+    mantissa = _sign(chars[:, 0]) * _digits(chars[:, 1:6])
+    exponent = np.where(chars[:, 6] == ord('-'), -1, 1) * _digits(chars[:, 7:8]) - 5
+    # Powers of ten this small are exact, so each is a single rounding like the parse.
+    return np.where(exponent < 0,
+                    mantissa / 10.0 ** np.maximum(-exponent, 0),
+                    mantissa * 10.0 ** np.maximum(exponent, 0))
+
+# The characters allowed in each column of the element lines, as in _LINE1_REGEXP and
+# _LINE2_REGEXP, though digits and spaces are not checked against each other within a field.
+# Other than a literal character a column is one of:
+#   d digit, s digit or space, A Alpha-5 leading character, U classification,
+#   + sign or space, - sign, z 0 or space, x anything
+_LINE1_TEMPLATE = '1 AddddU xxxxxxxx ddssd.dddddddd +.dddddddd +ddddd-d +ddddd-d z sssdd'
+_LINE2_TEMPLATE = '2 Adddd ssd.dddd ssd.dddd ddddddd ssd.dddd ssd.dddd sd.ddddddddssssdd'
+
+def _column_classes():
+    classes = {
+        'd': b'0123456789',
+        's': b'0123456789 ',
+        'A': b'0123456789ABCDEFGHJKLMNPQRSTUVWXYZ',
+        'U': b'UCS',
+        '+': b'-+ ',
+        '-': b'-+',
+        'z': b'0 ',
+        'x': bytes(range(1, 256)),
+    }
+    tables = {}
+    for code, allowed in classes.items():
+        table = np.zeros(256, bool)
+        table[np.frombuffer(allowed, np.uint8)] = True
+        tables[code] = table
+    return tables
+
+def _template_table(template, classes):
+    """ For each column, which characters are allowed. """
+    assert len(template) == LINE_LENGTH
+    table = np.zeros((LINE_LENGTH, 256), bool)
+    for column, code in enumerate(template):
+        if code in classes:
+            table[column] = classes[code]
+        else:
+            table[column, ord(code)] = True
+    return table
+
+_COLUMN_CLASSES = _column_classes()
+_TABLE_ROW_STARTS = np.arange(LINE_LENGTH, dtype=np.intp) * 256
+_LINE1_TABLE = _template_table(_LINE1_TEMPLATE, _COLUMN_CLASSES)
+_LINE2_TABLE = _template_table(_LINE2_TEMPLATE, _COLUMN_CLASSES)
+
+_DIGIT_VALUES = np.zeros(256, np.float64)
+_DIGIT_VALUES[np.frombuffer(b'0123456789', np.uint8)] = np.arange(10)
+
+# See notes for field 1.14 https://celestrak.org/columns/v04n03/
+_CHECKSUM_VALUES = np.zeros(256, np.int8)
+_CHECKSUM_VALUES[np.frombuffer(b'0123456789', np.uint8)] = np.arange(10)
+_CHECKSUM_VALUES[ord('-')] = 1
+
+_ALPHA5_CHARS = '0123456789ABCDEFGHJKLMNPQRSTUVWXYZ'
+_ALPHA5_VALUES = np.zeros(256, np.int64)
+_ALPHA5_VALUES[np.frombuffer(_ALPHA5_CHARS.encode(), np.uint8)] = np.arange(34)
+
+def _validate_tle_lines(tle_names, line1, line2):
+    if len(line1) != len(line2):
+        raise Exception("TLEs have {} first lines but {} second lines".format(len(line1), len(line2)))
+
+    errors = np.zeros(len(line1), np.int32)
+    for lines, table, format_error, check_digit_error in (
+            (line1, _LINE1_TABLE, LINE1_FORMAT_ERROR, LINE1_CHECK_DIGIT_ERROR),
+            (line2, _LINE2_TABLE, LINE2_FORMAT_ERROR, LINE2_CHECK_DIGIT_ERROR)):
+        # Looked up in the flattened table, by column and character.
+        errors[~table.ravel()[lines + _TABLE_ROW_STARTS].all(axis=1)] |= format_error
+        errors[lines[:, 68].astype(np.int32) - ord('0') != _check_digits(lines)] |= check_digit_error
+    errors[(line1[:, 2:7] != line2[:, 2:7]).any(axis=1)] |= SATNUM_MISMATCH_ERROR
+
+    report_tle_errors(tle_names, errors)
+
+def report_tle_errors(tle_names, errors):
+    """ Raises a ValueError for the first TLE with a format error, or satellite numbers that
+        differ between its lines, given the error bits of each.  Check digit errors are only
+        printed.
+    """
+    for error, message in ((LINE1_FORMAT_ERROR, "TLE {} line 1 has incorrect format"),
+                           (LINE2_FORMAT_ERROR, "TLE {} line 2 has incorrect format"),
+                           (SATNUM_MISMATCH_ERROR, "TLE {} does not have the same satellite number on both lines")):
+        bad = (errors & error) != 0
+        if bad.any():
+            raise ValueError(message.format(tle_names[np.argmax(bad)]))
+
+    for error, line_number in ((LINE1_CHECK_DIGIT_ERROR, 1), (LINE2_CHECK_DIGIT_ERROR, 2)):
+        for i in np.nonzero(errors & error)[0]:
+            #Not raising error because Celetrak test data has incorrect checksums
+            print("TLE {} line {} does not have correct check digit".format(tle_names[i], line_number))
+
+def _check_digits(lines):
+    return _CHECKSUM_VALUES[lines[:, :68]].sum(axis=1, dtype=np.int32) % 10
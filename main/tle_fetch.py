@@ -0,0 +1,180 @@
+""" TLE fetching
+
+Fetches the Celestrak TLE feeds, and the SATCAT records for them, into the feed cache for
+tle_ingest.py.  The feeds are fetched a few at a time, over a small pool of kept alive
+connections.
+
+Celestrak asks that a feed is not fetched more than once in 24 hours, so a cached feed is left
+alone until it is that old:
+https://celestrak.org/NORAD/documentation/gp-data-formats.php#addendum
+
+Even then it is only fetched again if it has changed.  The ETag and Last-Modified headers sent
+with each feed are kept beside it, and sent back in a conditional request.  A feed that has not
+changed comes back as 304 Not Modified, with no body, and the cached one starts its next 24
+hours.
+
+Run this module to bring the feed cache up to date.
+"""
+import http.client
+import json
+import os
+import queue
+import sys
+import time as tm
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import tle_ingest
+
+CELESTRAK_URL = 'https://celestrak.org'
+TLE_PATH = '/NORAD/elements/gp.php?{}={}&FORMAT=tle'
+SATCAT_PATH = '/satcat/records.php?{}={}&FORMAT=csv'
+
+# Queries with no SATCAT records to fetch.
+NO_SATCAT = [('SPECIAL', 'decaying'), ('GROUP', 'analyst'), ('GROUP', 'noaa')]
+
+FETCH_INTERVAL_SECS = 24 * 60 * 60
+MAX_CONNECTIONS = 4
+TIMEOUT_SECS = 60
+
+FETCHED = 'fetched'
+NOT_MODIFIED = 'not modified'
+FRESH = 'fresh'
+
+class _ConnectionPool:
+    """ Connections to a server, each used by one fetch at a time, and kept alive for the next. """
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self._connection_class = (http.client.HTTPSConnection if parts.scheme == 'https'
+                                  else http.client.HTTPConnection)
+        self._host = parts.netloc
+        self._idle = queue.SimpleQueue()
+
+    def request(self, path, headers):
+        """ Makes a GET request, returning the status, headers and body of the response. """
+        try:
+            connection = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            connection = self._connection_class(self._host, timeout=TIMEOUT_SECS)
+            reused = False
+
+        try:
+            response = self._get(connection, path, headers)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            connection.close()
+            if not reused:
+                raise
+            # The server closed the idle connection, so try once on a new one.
+            connection = self._connection_class(self._host, timeout=TIMEOUT_SECS)
+            response = self._get(connection, path, headers)
+        except Exception:
+            connection.close()
+            raise
+
+        self._idle.put(connection)
+        return response
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _get(self, connection, path, headers):
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        return (response.status, response.headers, body,)
+
+def fetch(pool, path, cache_path, now=None):
+    """ Fetches path into cache_path, unless the cached copy is less than 24 hours old or has
+        not changed.  Returns FETCHED, NOT_MODIFIED or FRESH.
+    """
+    now = tm.time() if now is None else now
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) > now - FETCH_INTERVAL_SECS:
+        return FRESH
+
+    validators = _read_validators(cache_path)
+    headers = {}
+    if 'etag' in validators:
+        headers['If-None-Match'] = validators['etag']
+    if 'last_modified' in validators:
+        headers['If-Modified-Since'] = validators['last_modified']
+
+    status, response_headers, body = pool.request(path, headers)
+    if status == 304 and os.path.exists(cache_path):
+        os.utime(cache_path, (now, now,))
+        return NOT_MODIFIED
+    if status != 200:
+        raise Exception("Could not fetch {}: {} {}".format(path, status, body[:200].decode(errors='replace')))
+
+    _write_atomically(cache_path, body)
+    validators = {}
+    if response_headers.get('ETag') is not None:
+        validators['etag'] = response_headers.get('ETag')
+    if response_headers.get('Last-Modified') is not None:
+        validators['last_modified'] = response_headers.get('Last-Modified')
+    _write_atomically(_validators_path(cache_path), json.dumps(validators).encode())
+    return FETCHED
+
+def fetch_paths(feed_cache_dir, queries):
+    """ The path to fetch and where it is cached, for the feeds and SATCAT records of the queries. """
+    paths = []
+    for query, value, _ in queries:
+        cache_path = tle_ingest.feed_path(feed_cache_dir, query, value)
+        paths.append((TLE_PATH.format(query, value), cache_path,))
+        if (query, value) not in NO_SATCAT:
+            paths.append((SATCAT_PATH.format(query, value), cache_path + '.cat',))
+    return paths
+
+def fetch_all(feed_cache_dir=tle_ingest.FEED_CACHE_DIR, queries=tle_ingest.QUERIES,
+              base_url=CELESTRAK_URL, max_connections=MAX_CONNECTIONS):
+    """ Brings the feed cache up to date.  Raises an exception once all have been tried if
+        any could not be fetched.
+    """
+    os.makedirs(feed_cache_dir, exist_ok=True)
+    pool = _ConnectionPool(base_url)
+    paths = fetch_paths(feed_cache_dir, queries)
+    try:
+        with ThreadPoolExecutor(max_workers=max_connections) as executor:
+            futures = [executor.submit(fetch, pool, path, cache_path) for path, cache_path in paths]
+            errors = []
+            for (path, _), future in zip(paths, futures):
+                try:
+                    print("{:13} {}".format(future.result(), path))
+                except Exception as e:
+                    errors.append(str(e))
+    finally:
+        pool.close()
+
+    if errors:
+        raise Exception("Could not fetch all feeds:\n" + '\n'.join(errors))
+
+def fetch_url(base_url, path, cache_path):
+    """ Fetches a single file from another server, cached in the same way as the feeds. """
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    pool = _ConnectionPool(base_url)
+    try:
+        return fetch(pool, path, cache_path)
+    finally:
+        pool.close()
+
+def _validators_path(cache_path):
+    return cache_path + '.headers'
+
+def _read_validators(cache_path):
+    if not os.path.exists(cache_path) or not os.path.exists(_validators_path(cache_path)):
+        return {}
+    with open(_validators_path(cache_path), 'r') as file:
+        return json.load(file)
+
+def _write_atomically(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+if __name__ == '__main__':
+    fetch_all(sys.argv[1] if len(sys.argv) > 1 else tle_ingest.FEED_CACHE_DIR)
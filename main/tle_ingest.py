@@ -0,0 +1,348 @@
+""" TLE ingestion
+
+Reads the Celestrak feeds fetched into the feed cache by tle_fetch.py, with the SATCAT records
+fetched alongside them, and compiles them into the catalogue in one go.
+
+A satellite in more than one feed takes its elements and name from the first, and the tags of
+each feed it is in.  Its ownership, launch date and launch site come from the SATCAT records of
+whichever feed has them.
+
+Run this module to compile the catalogue from the feed cache.
+"""
+import csv
+import os
+import re
+import sys
+import catalogue
+import tle
+
+FEED_CACHE_DIR = './caches/tle-feeds'
+
+GPZ_TAG = 'Geo protected zone'
+GPZ_PLUS_TAG = 'Geo protected plus'
+
+# The Celestrak queries, with the tag given to the satellites in each feed.
+QUERIES = [
+    ('GROUP', 'active', None),
+    ('GROUP', 'last-30-days', 'Launched in last 30 days'),
+    ('GROUP', 'stations', 'Space station'),
+    ('GROUP', 'visual', 'Visible'),
+    ('GROUP', 'cosmos-1408-debris', 'Debris from 2021 Russian anti-satellite missle test'),
+    ('GROUP', 'fengyun-1c-debris', 'Debris from 2007 Chinese anti-satellite missle test'),
+    ('GROUP', 'iridium-33-debris', 'Debris from 2009 collision with COSMOS 2251'),
+    ('GROUP', 'cosmos-2251-debris', 'Debris from 2009 collision with IRIDIUM 33'),
+    ('GROUP', 'analyst', None),
+    ('GROUP', 'weather', 'Weather'),
+    ('GROUP', 'gnss', 'Navigation'),
+    ('GROUP', 'military', 'Military'),
+    ('GROUP', 'musson', 'Navigation'),
+    ('GROUP', 'nnss', 'Navigation'),
+    ('GROUP', 'noaa', 'Weather'),
+    ('GROUP', 'orbcomm', None),
+    ('GROUP', 'satnogs', None),
+    ('SPECIAL', 'gpz', GPZ_TAG),
+    ('SPECIAL', 'gpz-plus', GPZ_PLUS_TAG),
+    ('SPECIAL', 'decaying', 'Potential decay'),
+]
+
+# Feeds of debris.  Everything in them is tagged as debris, as well as with the feed, so it is
+# picked out by the Debris tag whatever its name.
+DEBRIS_FEEDS = ['cosmos-1408-debris', 'fengyun-1c-debris', 'iridium-33-debris', 'cosmos-2251-debris']
+
+# Columns of the SATCAT records.
+SATCAT_NORAD_CAT_ID = 2
+SATCAT_OWNER = 5
+SATCAT_LAUNCH_DATE = 6
+SATCAT_LAUNCH_SITE = 7
+
+NL = '\n                       '
+
+OWNERS = {
+    'AB': 'Arab Satellite Communications' + NL + 'Organization',
+    'ABS': 'Asia Broadcast Satellite',
+    'AC': 'Asia Satellite Telecommunications' + NL + 'Company (ASIASAT)',
+    'ALG': 'Algeria',
+    'ANG': 'Angola',
+    'ARGN': 'Argentina',
+    'ARM': 'Republic of Armenia',
+    'ASRA': 'Austria',
+    'AUS': 'Australia',
+    'AZER': 'Azerbaijan',
+    'BEL': 'Belgium',
+    'BELA': 'Belarus',
+    'BERM': 'Bermuda',
+    'BGD': 'Peoples Republic of Bangladesh',
+    'BHR': 'The Kingdom of Bahrain',
+    'BHUT': 'The Kingdom of Bhutan',
+    'BOL': 'Bolivia',
+    'BRAZ': 'Brazil',
+    'BUL': 'Bulgaria',
+    'BWA': 'Republic of Botswana',
+    'CA': 'Canada',
+    'CHBZ': 'China/Brazil',
+    'CHTU': 'China/Türkiye',
+    'CHLE': 'Chile',
+    'CIS': 'Commonwealth of Independent' + NL + 'States (former USSR)',
+    'COL': 'Colombia',
+    'CRI': 'Republic of Costa Rica',
+    'CZCH': 'Czech Republic' + NL + '(former Czechoslovakia)',
+    'DEN': 'Denmark',
+    'DJI': 'Republic of Djibouti',
+    'ECU': 'Ecuador',
+    'EGYP': 'Egypt',
+    'ESA': 'European Space Agency',
+    'ESRO': 'European Space Research' + NL + 'Organization',
+    'EST': 'Estonia',
+    'ETH': 'Ethiopia',
+    'EUME': 'European Organization for the' + NL + 'Exploitation of Meteorological' + NL + 'Satellites (EUMETSAT)',
+    'EUTE': 'European Telecommunications' + NL + 'Satellite Organization (EUTELSAT)',
+    'FGER': 'France/Germany',
+    'FIN': 'Finland',
+    'FR': 'France',
+    'FRIT': 'France/Italy',
+    'GER': 'Germany',
+    'GHA': 'Republic of Ghana',
+    'GLOB': 'Globalstar',
+    'GREC': 'Greece',
+    'GRSA': 'Greece/Saudi Arabia',
+    'GUAT': 'Guatemala',
+    'HRV': 'Republic of Croatia',
+    'HUN': 'Hungary',
+    'IM': 'International Mobile Satellite' + NL + 'Organization (INMARSAT)',
+    'IND': 'India',
+    'INDO': 'Indonesia',
+    'IRAN': 'Iran',
+    'IRAQ': 'Iraq',
+    'IRID': 'Iridium',
+    'IRL': 'Ireland',
+    'ISRA': 'Israel',
+    'ISRO': 'Indian Space Research Organisation',
+    'ISS': 'International Space Station',
+    'IT': 'Italy',
+    'ITSO': 'International Telecommunications' + NL + 'Satellite Organization' + NL + '(INTELSAT)',
+    'JPN': 'Japan',
+    'KAZ': 'Kazakhstan',
+    'KEN': 'Republic of Kenya',
+    'LAOS': 'Laos',
+    'LKA': 'Democratic Socialist Republic of' + NL + 'Sri Lanka',
+    'LTU': 'Lithuania',
+    'LUXE': 'Luxembourg',
+    'MA': 'Morroco',
+    'MALA': 'Malaysia',
+    'MCO': 'Principality of Monaco',
+    'MDA': 'Republic of Moldova',
+    'MEX': 'Mexico',
+    'MMR': 'Republic of the Union of Myanmar',
+    'MNE': 'Montenegro',
+    'MNG': 'Mongolia',
+    'MUS': 'Mauritius',
+    'NATO': 'North Atlantic Treaty' + NL + 'Organization',
+    'NETH': 'Netherlands',
+    'NICO': 'New ICO',
+    'NIG': 'Nigeria',
+    'NKOR': "Democratic People's" + NL + 'Republic of Korea',
+    'NOR': 'Norway',
+    'NPL': 'Federal Democratic' + NL + 'Republic of Nepal',
+    'NZ': 'New Zealand',
+    'O3B': 'O3b Networks',
+    'ORB': 'ORBCOMM',
+    'PAKI': 'Pakistan',
+    'PERU': 'Peru',
+    'POL': 'Poland',
+    'POR': 'Portugal',
+    'PRC': "People's Republic of China",
+    'PRY': 'Republic of Paraguay',
+    'PRES': "People's Republic of China/" + NL + 'European Space Agency',
+    'QAT': 'State of Qatar',
+    'RASC': 'RascomStar-QAF',
+    'ROC': 'Taiwan (Republic of China)',
+    'ROM': 'Romania',
+    'RP': 'Philippines (Republic of' + NL + 'the Philippines)',
+    'RWA': 'Republic of Rwanda',
+    'SAFR': 'South Africa',
+    'SAUD': 'Saudi Arabia',
+    'SDN': 'Republic of Sudan',
+    'SEAL': 'Sea Launch',
+    'SEN': 'Republic of Senegal',
+    'SES': 'SES',
+    'SGJP': 'Singapore/Japan',
+    'SING': 'Singapore',
+    'SKOR': 'Republic of Korea',
+    'SLB': 'Solomon Islands',
+    'SPN': 'Spain',
+    'STCT': 'Singapore/Taiwan',
+    'SVN': 'Slovenia',
+    'SWED': 'Sweden',
+    'SWTZ': 'Switzerland',
+    'TBD': 'To Be Determined',
+    'THAI': 'Thailand',
+    'TMMC': 'Turkmenistan/Monaco',
+    'TUN': 'Republic of Tunisia',
+    'TURK': 'Türkiye',
+    'UAE': 'United Arab Emirates',
+    'UK': 'United Kingdom',
+    'UKR': 'Ukraine',
+    'UNK': 'Unknown',
+    'URY': 'Uruguay',
+    'US': 'United States',
+    'USBZ': 'United States/Brazil',
+    'VAT': 'Vatican City State',
+    'VENZ': 'Venezuela',
+    'VTNM': 'Vietnam',
+    'ZWE': 'Republic of Zimbabwe',
+}
+
+SITES = {
+    'AFETR': 'Air Force Eastern Test Range,' + NL + 'Florida, USA',
+    'AFWTR': 'Air Force Western Test Range,' + NL + 'California, USA',
+    'ANDSP': 'Andøya Spaceport, Nordland,' + NL + 'Norway',
+    'ALCLC': 'Alâcantara Launch Center,' + NL + 'Maranhão, Brazil',
+    'BOS': 'Bowen Orbital Spaceport,' + NL + 'Queensland, Australia',
+    'CAS': 'Canaries Airspace',
+    'DLS': 'Dombarovskiy Launch Site,' + NL + 'Russia',
+    'ERAS': 'Eastern Range Airspace',
+    'FRGUI': "Europe's Spaceport, Kourou," + NL + 'French Guiana',
+    'HGSTR': 'Hammaguira Space Track Range,' + NL + 'Algeria',
+    'JJSLA': 'Jeju Island Sea Launch Area,' + NL + 'Republic of Korea',
+    'JSC': 'Jiuquan Space Center, PRC',
+    'KODAK': 'Kodiak Launch Complex, Alaska,' + NL + 'USA',
+    'KSCUT': 'Uchinoura Space Center Fomerly' + NL + 'Kagoshima Space Center,' + NL + 'Japan',
+    'KWAJ': 'US Army Kwajalein Atoll (USAKA)',
+    'KYMSC': 'Kapustin Yar Missile and' + NL + 'Space Complex, Russia',
+    'NSC': 'Naro Space Complex, Republic of' + NL + 'Korea',
+    'PLMSC': 'Plesetsk Missile and Space' + NL + 'Complex, Russia',
+    'RLLB': 'Rocket Lab Launch Base, Mahia' + NL + 'Peninsula, New Zealand',
+    'SCSLA': 'South China Sea Launch Area, PRC',
+    'SEAL': 'Sea Launch Platform (mobile)',
+    'SEMLS': 'Semnan Satellite Launch Site,' + NL + 'Iran',
+    'SMTS': 'Shahrud Missile Test Site, Iran',
+    'SNMLP': 'San Marco Launch Platform,' + NL + 'Indian Ocean (Kenya)',
+    'SPKII': 'Space Port Kii, Japan',
+    'SRILR': 'Satish Dhawan Space Centre,' + NL + 'India (Formerly Sriharikota Launching Range)',
+    'SUBL': 'Submarine Launch Platform (mobile)',
+    'SVOBO': 'Svobodnyy Launch Complex, Russia',
+    'TAISC': 'Taiyuan Space Center, PRC',
+    'TANSC': 'Tanegashima Space Center, Japan',
+    'TYMSC': 'Tyuratam Missile and Space' + NL + 'Center, Kazakhstan',
+    'UNK': 'Unknown',
+    'VOSTO': 'Vostochny Cosmodrome, Russia',
+    'WLPIS': 'Wallops Island, Virginia, USA',
+    'WOMRA': 'Woomera, Australia',
+    'WRAS': 'Western Range Airspace',
+    'WSC': 'Wenchang Satellite Launch Site,' + NL + 'PRC',
+    'XICLF': 'Xichang Launch Facility, PRC',
+    'YAVNE': 'Yavne Launch Facility, Israel',
+    'YSLA': 'Yellow Sea Launch Area, PRC',
+    'YUN': 'Yunsong Launch Site, Democratic' + NL + "People's Republic of Korea" + NL + '(North Korea)',
+}
+
+BRACKET_INFO = {
+    'PAM-D': 'Payload assist module',
+    'TANK': 'Propellant tank',
+    'SYLDA': 'Payload adaptor',
+    'VESPA': 'Payload adaptor',
+    'SPELTRA': 'Payload adaptor',
+    'ADAPTOR': 'Payload adaptor',
+    'ARRAY COVER': 'Solar array cover',
+    'BAFFLE COVER': 'Engine baffle cover',
+}
+
+# Kinds of object recognised from the end of their names, with what is in brackets after it.
+_NAME_KINDS = [
+    (re.compile(r' R/B\(1\)( \[(.*)\])?$'), 'Stage 1 rocket body'),
+    (re.compile(r' R/B\(2\)( \[(.*)\])?$'), 'Stage 2 rocket body'),
+    (re.compile(r' R/B( \[(.*)\])?$'), 'Rocket body'),
+    (re.compile(r' DEB( \[(.*)\])?$'), 'Debris'),
+]
+
+def feed_path(feed_cache_dir, query, value):
+    """ Where the TLE feed for a query is cached.  Its SATCAT records are alongside, in .cat """
+    return os.path.join(feed_cache_dir, '{}_{}'.format(query, value))
+
+def read_feed(path):
+    """ The name and element lines of each satellite in a feed, in the three line format. """
+    with open(path, 'r') as file:
+        lines = [line.rstrip() for line in file if line.strip() != '']
+    if len(lines) % 3 != 0:
+        raise Exception("{} has {} lines, which is not 3 for each satellite".format(path, len(lines)))
+    return zip(lines[0::3], lines[1::3], lines[2::3])
+
+def read_satcat(path, satcat):
+    """ Adds the ownership, launch date and launch site in the SATCAT records to satcat, keyed by
+        the satellite number as it appears in the element lines.
+    """
+    with open(path, 'r', newline='') as file:
+        for record in csv.reader(file):
+            if len(record) <= SATCAT_LAUNCH_SITE or not record[SATCAT_NORAD_CAT_ID].isdigit():
+                # The heading, or a blank line.
+                continue
+            satnum = tle.alpha5(int(record[SATCAT_NORAD_CAT_ID]))
+            satcat[satnum] = (OWNERS.get(record[SATCAT_OWNER], ''),
+                              record[SATCAT_LAUNCH_DATE],
+                              SITES.get(record[SATCAT_LAUNCH_SITE], ''),)
+
+def ingest(feed_cache_dir=FEED_CACHE_DIR, path=catalogue.CATALOGUE_PATH, queries=QUERIES):
+    """ Compiles the cached feeds into a catalogue.  Returns the number of satellites. """
+    satcat = {}
+    for query, value, _ in queries:
+        satcat_path = feed_path(feed_cache_dir, query, value) + '.cat'
+        if os.path.exists(satcat_path):
+            read_satcat(satcat_path, satcat)
+
+    # Keyed by satellite number: the name, element lines, tags from the name and feed tags.
+    satellites = {}
+    for query, value, tag in queries:
+        for name, line1, line2 in read_feed(feed_path(feed_cache_dir, query, value)):
+            satnum = line1[2:7]
+            satellite = satellites.get(satnum)
+            if satellite is None:
+                satellite = (name.strip(), line1, line2, _name_tags(name.strip()), [],)
+                satellites[satnum] = satellite
+            _add_feed_tag(satellite, value, tag)
+
+    satnums = sorted(satellites)
+    sat_info = [{catalogue.NORAD_ID: satnum,
+                 catalogue.NAME: satellites[satnum][0] + '\n',
+                 catalogue.TAGS: _tags(satellites[satnum], satcat.get(satnum))}
+                for satnum in satnums]
+    return catalogue.compile_tle_lines(path, satnums,
+                                       [satellites[satnum][1] for satnum in satnums],
+                                       [satellites[satnum][2] for satnum in satnums],
+                                       sat_info)
+
+def _name_tags(name):
+    for regexp, kind in _NAME_KINDS:
+        match = regexp.search(name)
+        if match is None:
+            continue
+        info = BRACKET_INFO.get(match.group(2))
+        return [kind] if info is None else [kind, info]
+    return []
+
+def _add_feed_tag(satellite, value, tag):
+    name, _, _, name_tags, feed_tags = satellite
+    # Whichever feed it was first seen in.
+    if value in DEBRIS_FEEDS and 'Debris' not in name_tags:
+        name_tags.append('Debris')
+    # Don't add a tag twice, or the gpz-plus tag when the gpz tag is there.
+    if tag is None or tag in feed_tags or tag in name_tags or tag == name:
+        return
+    if tag == GPZ_PLUS_TAG and GPZ_TAG in feed_tags:
+        return
+    feed_tags.append(tag)
+
+def _tags(satellite, satcat_record):
+    _, _, _, name_tags, feed_tags = satellite
+    lines = []
+    if satcat_record is not None:
+        owner, launch_date, site = satcat_record
+        lines += ['Ownership:   ' + owner, 'Launch date: ' + launch_date, 'Launch site:   ' + site]
+    lines.append('')
+    lines += name_tags + feed_tags
+    return ''.join(line + '\n' for line in lines)
+
+if __name__ == '__main__':
+    feed_cache_dir = sys.argv[1] if len(sys.argv) > 1 else FEED_CACHE_DIR
+    path = sys.argv[2] if len(sys.argv) > 2 else catalogue.CATALOGUE_PATH
+    n_records = ingest(feed_cache_dir, path)
+    print("Compiled {} satellites into {}".format(n_records, path))
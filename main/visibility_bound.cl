@@ -0,0 +1,69 @@
+#include "observer.h"
+#include "celestrak/sgp4/SGP4.h"
+#include "celestrak/astrolib/AstroLib.h"
+
+/*
+ * Bounds on when a satellite could next be above an observer's horizon, so most of the
+ * catalogue can be skipped without calling sgp4 for every frame.
+ *
+ * A satellite at recef is above the horizon when dot(recef, zenith) > horizon_height,
+ * i.e. when the angle between recef and the observer's zenith is less than
+ * acos(horizon_height / |recef|).  That angle is largest at apogee, and the angle between
+ * recef and the zenith cannot change faster than the satellite's angular rate at perigee
+ * plus the rotation of the Earth.
+ */
+
+// Allowance for sgp4 perturbations of the two body apogee and perigee.
+#define BOUND_RADIUS_MARGIN_KM 50.0
+#define BOUND_RATE_MARGIN 1.1
+
+// Largest distance from the centre of the Earth, km.
+double max_orbit_radius(const elsetrec *satrec)
+{
+    double ecc = fmin(satrec->ecco, 0.99);
+    return satrec->a * (1.0 + ecc) * satrec->radiusearthkm + BOUND_RADIUS_MARGIN_KM;
+}
+
+// Largest rate the direction to the satellite from the centre of the Earth turns, rad/s.
+double max_angular_rate(const elsetrec *satrec)
+{
+    double ecc = fmin(satrec->ecco, 0.99);
+    // Two body angular rate at perigee: n * sqrt((1 + e) / (1 - e)^3)
+    double perigee_rate = satrec->no_unkozai / 60.0 * sqrt((1.0 + ecc) / ((1.0 - ecc) * (1.0 - ecc) * (1.0 - ecc)));
+    return BOUND_RATE_MARGIN * (perigee_rate + earthrot);
+}
+
+/*
+ * Smallest angle (radians) the satellite must still turn through before it could be above
+ * the horizon of any of the observers.  Zero or less means it may be visible.
+ */
+double horizon_slack(
+    double recef[3],
+    double max_radius,
+    int n_observers,
+    __global const observer *observers)
+{
+    double r = sqrt(recef[0] * recef[0] + recef[1] * recef[1] + recef[2] * recef[2]);
+    double slack = pi;
+    for (int i = 0; i < n_observers; i++) {
+        __global const double *zenith = &observers[i].ecef_sez[6];
+        double cos_angle = (recef[0] * zenith[0] + recef[1] * zenith[1] + recef[2] * zenith[2]) / r;
+        double angle = acos(clamp(cos_angle, -1.0, 1.0));
+        double max_visible_angle = acos(clamp(observers[i].horizon_height / max_radius, -1.0, 1.0));
+        slack = fmin(slack, angle - max_visible_angle);
+    }
+    return slack;
+}
+
+/*
+ * Number of frames that can be skipped, after one in which the satellite had the given
+ * slack, without missing a frame in which it could be visible.  Always at least 1.
+ */
+int frames_to_skip(double slack, double max_rate, double frame_period_secs)
+{
+    if (slack <= 0.0) {
+        return 1;
+    }
+    double frames = floor(slack / (max_rate * frame_period_secs));
+    return frames < 1.0 ? 1 : (frames > INT_MAX ? INT_MAX : (int)frames);
+}
@@ -0,0 +1,43 @@
+import pyopencl as cl
+import numpy as np
+from pytest import approx
+import dtype as dt
+
+# vallado 2013, 280, ex 5-1: 2 April 2006, 0h UT1.
+def test_sun():
+    sun, _ = _sun_moon(2453827.5, 0.0)
+
+    assert sun[:3] == approx([0.9771945, 0.1924424, 0.0834308], abs=1e-6)
+    # The direction of the example's vector.
+    assert np.degrees(sun[3]) == approx(11.1409, abs=1e-3)
+    assert np.degrees(sun[4]) == approx(4.7884, abs=1e-3)
+
+# vallado 2013, 290, ex 5-3: 28 April 1994, 0h TDB.
+def test_moon():
+    _, moon = _sun_moon(2449470.5, 0.0)
+
+    assert moon[:3] == approx([-134240.626, -311571.590, -126693.785], abs=1.0)
+
+def _sun_moon(jdtdb, jdtdbF):
+    opencl_ctx = cl.create_some_context(interactive=False)
+
+    program = cl.Program(
+        opencl_ctx,
+        '#include "celestrak/astrolib/test_sun_moon_kernel.cl"'
+    ).build(
+        options=' -I main/ -I test/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+        cache_dir='caches/opencl_cachedir/'
+    )
+
+    sun = np.empty(5, cl.cltypes.double)
+    moon = np.empty(5, cl.cltypes.double)
+    mf = cl.mem_flags
+    sun_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=sun.nbytes)
+    moon_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=moon.nbytes)
+
+    command_queue = cl.CommandQueue(opencl_ctx)
+    program.test_sun_moon(command_queue, (1,), None, cl.cltypes.double(jdtdb), cl.cltypes.double(jdtdbF),
+                          sun_buf, moon_buf)
+    cl.enqueue_copy(command_queue, sun, sun_buf)
+    cl.enqueue_copy(command_queue, moon, moon_buf).wait()
+    return (sun, moon,)
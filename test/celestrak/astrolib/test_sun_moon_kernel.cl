@@ -0,0 +1,31 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+#include "celestrak/sgp4/SGP4.h"
+#include "celestrak/sgp4/SGP4.cl"
+#include "celestrak/mathtimelib/MathTimeLib.h"
+#include "celestrak/mathtimelib/MathTimeLib.cl"
+#include "celestrak/astrolib/AstroLib.h"
+#include "celestrak/astrolib/AstroLib.cl"
+
+// Each result is the position, then the right ascension and declination.
+__kernel void test_sun_moon(
+    double jdtdb, double jdtdbF,
+    __global double *sun_result,
+    __global double *moon_result)
+{
+    double r[3], rtasc, decl;
+
+    sun(jdtdb, jdtdbF, r, &rtasc, &decl);
+    for (int i = 0; i < 3; i++) {
+        sun_result[i] = r[i];
+    }
+    sun_result[3] = rtasc;
+    sun_result[4] = decl;
+
+    moon(jdtdb, jdtdbF, r, &rtasc, &decl);
+    for (int i = 0; i < 3; i++) {
+        moon_result[i] = r[i];
+    }
+    moon_result[3] = rtasc;
+    moon_result[4] = decl;
+}
@@ -0,0 +1,36 @@
+from frame_gen.background import Background, BLACK
+
+_WIDTH = 40
+_HEIGHT = 30
+
+def test_black_is_all_zero():
+    assert not BLACK.build_channels(_WIDTH, _HEIGHT).any()
+
+def test_gradient_brightens_towards_horizon_and_is_black_beyond():
+    channels = Background(zenith_rgb=(0, 0, 10), horizon_rgb=(0, 0, 110)).build_channels(_WIDTH, _HEIGHT)
+
+    assert channels.shape == (_HEIGHT, _WIDTH, 3)
+    assert channels[15, 20, 2] == 10
+    assert channels[15, 20, 2] < channels[15, 30, 2] < channels[15, 38, 2] <= 110
+    # Corners are below the horizon.
+    assert not channels[0, 0].any()
+    assert not channels[29, 39].any()
+
+def test_horizon_ring_and_grid():
+    channels = Background(ring_rgb=(200, 0, 0), grid_rgb=(0, 100, 0),
+                          grid_elevations_deg=(60,)).build_channels(_WIDTH, _HEIGHT)
+
+    red = channels[..., 0]
+    green = channels[..., 1]
+    # The horizon is the edge of the image across the middle.
+    assert red[15, 0] > 0 and red[15, 39] > 0 and red[0, 20] > 0
+    assert not red[15, 5:35].any()
+    # Compass lines through the zenith, half in each of the rows and columns either side,
+    # but not beyond the horizon.
+    assert green[2, 19] == green[2, 20] == green[14, 2] == green[15, 2] == 50
+    assert green[2, 10] == 0
+    assert green[0, 0] == 0
+    # The ring at 60 degrees is at half the radius.
+    assert green[7, 10] == 0
+    assert green[15, 10] > 50 and green[15, 29] > 50
+    assert green[15, 14] == 50
@@ -0,0 +1,27 @@
+import os
+from frame_gen.catalogue_watcher import CatalogueWatcher
+
+def test_notices_replaced_catalogue(tmp_path):
+    path = str(tmp_path / 'catalogue.bin')
+    with open(path, 'wb') as file:
+        file.write(b'old')
+    watcher = CatalogueWatcher(path)
+
+    assert not watcher.changed()
+
+    with open(path + '.tmp', 'wb') as file:
+        file.write(b'newer')
+    os.replace(path + '.tmp', path)
+    assert watcher.changed()
+    assert not watcher.changed()
+
+def test_missing_catalogue_is_not_a_change(tmp_path):
+    path = str(tmp_path / 'catalogue.bin')
+    watcher = CatalogueWatcher(path)
+
+    assert not watcher.changed()
+
+    with open(path, 'wb') as file:
+        file.write(b'new')
+    os.remove(path)
+    assert not watcher.changed()
@@ -0,0 +1,55 @@
+import threading
+from frame_gen.frame_ring import FrameRing
+
+def test_frames_come_out_in_order():
+    ring = FrameRing(max_frames=4, max_bytes=100)
+    assert ring.put('a', 10)
+    assert ring.put('b', 10)
+
+    assert ring.get() == 'a'
+    assert ring.get() == 'b'
+    assert ring.get(timeout=0.01) is None
+
+def test_full_until_released():
+    ring = FrameRing(max_frames=2, max_bytes=100)
+    assert ring.put('a', 10)
+    assert ring.put('b', 10)
+    assert not ring.put('c', 10, timeout=0.01)
+
+    # Got but not released still holds its place.
+    assert ring.get() == 'a'
+    assert not ring.put('c', 10, timeout=0.01)
+
+    ring.release()
+    assert ring.put('c', 10, timeout=0.01)
+    assert len(ring) == 2
+
+def test_bytes_budget():
+    ring = FrameRing(max_frames=10, max_bytes=100)
+    assert ring.put('a', 60)
+    assert not ring.put('b', 50, timeout=0.01)
+    assert ring.put('b', 40)
+    assert ring.n_bytes == 100
+
+    ring.get()
+    ring.release()
+    assert ring.n_bytes == 40
+
+def test_frame_over_budget_let_in_when_empty():
+    ring = FrameRing(max_frames=10, max_bytes=100)
+    assert ring.put('big', 500)
+    assert not ring.put('a', 1, timeout=0.01)
+
+def test_put_waits_for_release():
+    ring = FrameRing(max_frames=1, max_bytes=100)
+    ring.put('a', 10)
+
+    put_done = []
+    producer = threading.Thread(target=lambda: put_done.append(ring.put('b', 10, timeout=5)))
+    producer.start()
+    assert ring.get() == 'a'
+    ring.release()
+    producer.join()
+
+    assert put_done == [True]
+    assert ring.get() == 'b'
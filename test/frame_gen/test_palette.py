@@ -0,0 +1,40 @@
+import numpy as np
+import catalogue
+import tle_ingest
+from frame_gen import palette
+from frame_gen.palette import Palette, Style, build_style_dtype, COLOUR, RADIUS
+from frame_gen.sat_filter import SatFilter
+
+class _SatInfo:
+    def __init__(self, tags):
+        self._tags = tags
+
+    def tag_mask(self, tag):
+        return np.array([tag in tags for tags in self._tags])
+
+def test_first_matching_rule_wins():
+    palette = Palette([Style((1, 2, 3)), Style((4, 5, 6)), Style((7, 8, 9))],
+                      [(SatFilter(tags=['Visible']), 1), (SatFilter(tags=['Debris']), 2)])
+    sat_info = _SatInfo([['Debris'], ['Debris', 'Visible'], []])
+
+    assert list(palette.style_indices(sat_info, np.zeros(3))) == [2, 1, 0]
+
+def test_styles_for_device():
+    palette = Palette([Style((0x10, 0x20, 0x30), radius=1.5)])
+
+    styles = palette.build_styles(build_style_dtype())
+
+    assert styles[0][COLOUR] == 0x302010
+    assert styles[0][RADIUS] == 1.5
+
+def test_debris_feed_drawn_as_debris(tmp_path):
+    query = ('GROUP', 'cosmos-1408-debris', 'Debris from 2021 Russian anti-satellite missle test')
+    with open(tle_ingest.feed_path(str(tmp_path), *query[:2]), 'w') as file:
+        file.write('COSMOS 1408 DEB\r\n'
+                   '1 49863U 82092L   24172.51672816  .00094405  00000+0  14318-2 0  9994\r\n'
+                   '2 49863  82.5562  13.3925 0010338 234.8437 125.1796 15.76937591147466\r\n')
+    path = str(tmp_path / 'catalogue.bin')
+    tle_ingest.ingest(str(tmp_path), path, [query])
+    tle_array, sat_info = catalogue.read_catalogue(path, catalogue.build_catalogue_tle_dtype())
+
+    assert list(palette.DEFAULT_PALETTE.style_indices(sat_info, tle_array)) == [3]
@@ -0,0 +1,43 @@
+import numpy as np
+from frame_gen.pass_index import PassIndex
+
+def test_finds_passes_overlapping_period():
+    pass_index = PassIndex()
+    pass_index.add_window(1000.0, [3, 1, 2, 1], [10.0, 100.0, 400.0, 600.0], [50.0, 500.0, 450.0, 700.0])
+
+    assert list(pass_index.satellites_visible_between(0.0, 5.0)) == []
+    assert list(pass_index.satellites_visible_between(0.0, 10.0)) == [3]
+    # Pass of satrec 1 started long before.
+    assert list(pass_index.satellites_visible_between(420.0, 430.0)) == [1, 2]
+    assert list(pass_index.satellites_visible_between(450.0, 650.0)) == [1, 2]
+    assert list(pass_index.satellites_visible_between(701.0, 1000.0)) == []
+
+def test_adding_window_extends_and_discards():
+    pass_index = PassIndex()
+    pass_index.add_window(1000.0, [1, 2], [10.0, 900.0], [50.0, 1000.0])
+    pass_index.add_window(2000.0, [2, 3], [1000.0, 1500.0], [1100.0, 1600.0], discard_before=100.0)
+
+    assert pass_index.covered_until == 2000.0
+    assert list(pass_index.satellites_visible_between(0.0, 100.0)) == []
+    assert list(pass_index.satellites_visible_between(950.0, 1050.0)) == [2]
+    assert list(pass_index.satellites_visible_between(1550.0, 1560.0)) == [3]
+
+def test_waits_for_window():
+    pass_index = PassIndex()
+    assert not pass_index.wait_for_window(10.0, timeout=0.01)
+
+    pass_index.add_window(10.0, np.empty(0), np.empty(0), np.empty(0))
+    assert pass_index.wait_for_window(10.0, timeout=0.01)
+    assert not pass_index.wait_for_window(11.0, timeout=0.01)
+
+def test_replacing_satrecs_keeps_others():
+    pass_index = PassIndex()
+    pass_index.add_window(1000.0, [1, 2, 1], [10.0, 100.0, 600.0], [50.0, 200.0, 700.0])
+
+    pass_index.replace_satrecs([1, 3], [3], [300.0], [900.0])
+
+    assert pass_index.covered_until == 1000.0
+    assert list(pass_index.satellites_visible_between(0.0, 60.0)) == []
+    assert list(pass_index.satellites_visible_between(150.0, 650.0)) == [2, 3]
+    # The long pass is found from its middle.
+    assert list(pass_index.satellites_visible_between(850.0, 860.0)) == [3]
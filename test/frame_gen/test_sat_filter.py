@@ -0,0 +1,44 @@
+import numpy as np
+import tle
+from frame_gen import sat_filter
+from frame_gen.sat_filter import SatFilter
+
+class _SatInfo:
+    def __init__(self, tags):
+        self._tags = tags
+
+    def tag_mask(self, tag):
+        return np.array([tag in tags for tags in self._tags])
+
+def _tle_array(mean_motions, eccentricities, inclinations):
+    tle_array = np.zeros(len(mean_motions), tle.build_tle_dtype())
+    tle_array[tle.MEAN_MOTION] = mean_motions
+    tle_array[tle.ORBITAL_ECCENTRICITY] = eccentricities
+    tle_array[tle.ORBITAL_INCLINATION] = inclinations
+    return tle_array
+
+# The ISS, a GPS satellite, a geostationary satellite and a Molniya orbit.
+_TLE_ARRAY = _tle_array([15.5, 2.005, 1.0027, 2.006], [0.0004, 0.005, 0.0002, 0.72], [51.6, 55.0, 0.05, 63.4])
+_SAT_INFO = _SatInfo([['Space station', 'Visible'], ['Navigation'], [], ['Debris']])
+
+def test_orbit_regimes():
+    assert list(sat_filter.orbit_regimes(_TLE_ARRAY)) == [sat_filter.LEO, sat_filter.MEO, sat_filter.GEO, sat_filter.HEO]
+
+def test_altitudes():
+    perigee, apogee = sat_filter.perigee_apogee_altitudes(_TLE_ARRAY)
+
+    assert 400 < perigee[0] < apogee[0] < 430
+    assert 35700 < perigee[2] < apogee[2] < 35900
+    assert perigee[3] < 1500 and apogee[3] > 39000
+
+def test_shows_all_by_default():
+    assert SatFilter().mask(_SAT_INFO, _TLE_ARRAY).all()
+
+def test_filters():
+    assert list(SatFilter(tags=['Navigation', 'Visible']).mask(_SAT_INFO, _TLE_ARRAY)) == [True, True, False, False]
+    assert list(SatFilter(exclude_tags=['Debris']).mask(_SAT_INFO, _TLE_ARRAY)) == [True, True, True, False]
+    assert list(SatFilter(regimes=[sat_filter.GEO, sat_filter.LEO]).mask(_SAT_INFO, _TLE_ARRAY)) == [True, False, True, False]
+    # The Molniya orbit passes through the band.
+    assert list(SatFilter(altitude_km=(1000, 25000)).mask(_SAT_INFO, _TLE_ARRAY)) == [False, True, False, True]
+    assert list(SatFilter(inclination_deg=(50, 60)).mask(_SAT_INFO, _TLE_ARRAY)) == [True, True, False, False]
+    assert list(SatFilter(tags=['Visible'], regimes=[sat_filter.MEO]).mask(_SAT_INFO, _TLE_ARRAY)) == [False] * 4
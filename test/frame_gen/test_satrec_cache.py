@@ -0,0 +1,60 @@
+import numpy as np
+from frame_gen.satrec_cache import SatrecCache, tle_keys, layout_identity
+
+def _lines(n, seed):
+    rng = np.random.default_rng(seed)
+    return rng.integers(ord('0'), ord('9'), size=(n, 2, 69), dtype=np.uint8)
+
+def test_keys_depend_on_lines():
+    lines = _lines(3, 1)
+    changed = lines.copy()
+    changed[1, 1, 10] += 1
+
+    keys = tle_keys(lines)
+
+    assert len(set(keys)) == 3
+    assert list(tle_keys(changed) == keys) == [True, False, True]
+
+def test_only_new_or_changed_are_missing(tmp_path):
+    lines = _lines(4, 2)
+    keys = tle_keys(lines)
+    satrecs = np.arange(4 * 8, dtype=np.uint8).reshape(4, 8)
+    SatrecCache(str(tmp_path), 'layout').save(keys, satrecs)
+
+    new_lines = np.concatenate((lines[[3, 0]], _lines(1, 3)))
+    new_lines[1, 0, 5] += 1
+    found, missing = SatrecCache(str(tmp_path), 'layout').lookup(tle_keys(new_lines), 8)
+
+    assert list(missing) == [1, 2]
+    assert np.array_equal(found[0], satrecs[3])
+    assert not found[1:].any()
+
+def test_nothing_cached_for_another_layout(tmp_path):
+    lines = _lines(2, 4)
+    SatrecCache(str(tmp_path), 'layout').save(tle_keys(lines), np.ones((2, 8), np.uint8))
+
+    _, missing = SatrecCache(str(tmp_path), 'other-layout').lookup(tle_keys(lines), 8)
+    assert list(missing) == [0, 1]
+
+    _, missing = SatrecCache(str(tmp_path), 'layout').lookup(tle_keys(lines), 16)
+    assert list(missing) == [0, 1]
+
+class _Platform:
+    name = 'platform'
+
+class _Device:
+    platform = _Platform()
+    name = 'device'
+    version = 'OpenCL 3.0'
+    driver_version = '1.0'
+
+def test_layout_identity(tmp_path):
+    source = tmp_path / 'source.cl'
+    source.write_text('typedef struct { double a; } elsetrec;')
+
+    identity = layout_identity(_Device(), 8, [str(source)])
+
+    assert identity == layout_identity(_Device(), 8, [str(source)])
+    assert identity != layout_identity(_Device(), 16, [str(source)])
+    source.write_text('typedef struct { double a, b; } elsetrec;')
+    assert identity != layout_identity(_Device(), 8, [str(source)])
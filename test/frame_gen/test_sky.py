@@ -0,0 +1,62 @@
+import numpy as np
+from pytest import approx
+from frame_gen import sky
+from frame_gen.palette import build_style_dtype, COLOUR, RADIUS
+
+def _catalogue_line(hr, ra, dec, magnitude, colour_index):
+    """ A line of the catalogue, with just the fields that are read. """
+    line = list('{:4d}'.format(hr).ljust(114))
+    for columns, text in ((sky._RA_HOURS, ra[:2]), (sky._RA_MINUTES, ra[2:4]), (sky._RA_SECONDS, ra[4:]),
+                          (sky._DEC_SIGN, dec[0]), (sky._DEC_DEGREES, dec[1:3]), (sky._DEC_MINUTES, dec[3:5]),
+                          (sky._DEC_SECONDS, dec[5:]), (sky._MAGNITUDE, magnitude), (sky._COLOUR_INDEX, colour_index)):
+        line[columns] = text
+    return ''.join(line) + '\n'
+
+def test_parse_stars():
+    lines = [
+        _catalogue_line(2424, '063045.0', '-164258', '-1.46', ' 0.00'),
+        # Not a star, with no position.
+        '  92'.ljust(114) + '\n',
+        _catalogue_line(7001, '183656.3', '+384701', ' 0.03', ' 0.00'),
+        _catalogue_line(9999, '000000.0', '+000000', ' 6.10', ' 0.50'),
+    ]
+
+    stars = sky._parse_stars(lines, 5.5)
+
+    assert len(stars) == 2
+    assert np.degrees(stars[0][sky.RIGHT_ASCENSION]) == approx((6 + 30 / 60 + 45 / 3600) * 15)
+    assert np.degrees(stars[0][sky.DECLINATION]) == approx(-(16 + 42 / 60 + 58 / 3600))
+    assert stars[1][sky.MAGNITUDE] == approx(0.03)
+
+def test_precession_moves_the_equinox():
+    stars = np.zeros(2, sky.build_star_dtype())
+    stars[1][sky.DECLINATION] = np.pi / 2
+
+    # A century on.
+    directions = sky.star_directions(stars, 2451545.0 + 36525.0)
+
+    assert directions.shape == (2, 3)
+    assert np.linalg.norm(directions, axis=1) == approx([1.0, 1.0])
+    ra = np.degrees(np.arctan2(directions[0, 1], directions[0, 0]))
+    dec = np.degrees(np.arcsin(directions[0, 2]))
+    # By zeta + z, and theta.
+    assert ra == approx((2306.2181 * 2 + 0.30188 + 1.09468) / 3600, abs=1e-3)
+    assert dec == approx((2004.3109 - 0.42665) / 3600, abs=1e-3)
+    # The pole moves by theta.
+    assert np.degrees(np.arccos(directions[1, 2])) == approx((2004.3109 - 0.42665 - 0.041833) / 3600)
+
+def test_sky_styles():
+    stars = np.zeros(3, sky.build_star_dtype())
+    stars[sky.MAGNITUDE] = [-1.0, 3.0, 5.5]
+    stars[sky.COLOUR_INDEX] = [0.3, 0.3, 0.3]
+
+    styles = sky.build_sky_styles(stars, build_style_dtype())
+
+    assert len(styles) == sky.FIRST_STAR + 3
+    assert styles[sky.SUN][RADIUS] > styles[sky.MOON][RADIUS] > 0
+    star_styles = styles[sky.FIRST_STAR:]
+    assert star_styles[0][COLOUR] == 0xffffff
+    assert star_styles[0][RADIUS] == sky.BRIGHT_STAR_RADIUS
+    assert list(star_styles[1:][RADIUS]) == [0.0, 0.0]
+    greens = (star_styles[COLOUR] >> 8) & 0xff
+    assert greens[0] > greens[1] > greens[2] == round(255 * sky.MIN_STAR_INTENSITY)
@@ -0,0 +1,40 @@
+import numpy as np
+import catalogue
+from frame_gen.slot_map import SlotMap, SlotSatInfo
+
+def test_satellites_keep_their_slots():
+    slot_map = SlotMap(['100', '200', '300'], [b'a', b'b', b'c'])
+
+    new_map, slots, changed = slot_map.update(['300', '400', '100'], [b'c', b'd', b'x'])
+
+    assert list(slots) == [2, 3, 0]
+    # 400 is new and the TLE of 100 has changed.
+    assert list(changed) == [1, 2]
+    assert new_map.n_slots == 4
+    assert list(new_map.active) == [True, False, True, True]
+    assert list(new_map.record_of_slot) == [2, -1, 0, 1]
+
+def test_retired_satellite_comes_back_unchanged():
+    slot_map = SlotMap(['100', '200'], [b'a', b'b'])
+    slot_map, _, _ = slot_map.update(['100'], [b'a'])
+
+    slot_map, slots, changed = slot_map.update(['200', '100'], [b'b', b'a'])
+
+    assert list(slots) == [1, 0]
+    assert list(changed) == []
+    assert slot_map.active.all()
+
+def test_sat_info_by_slot(tmp_path):
+    path = str(tmp_path / 'catalogue.bin')
+    catalogue.write_catalogue(path, np.zeros(2, catalogue.build_catalogue_tle_dtype()),
+                              [{'norad_id': '300', 'name': 'C', 'tags': 'Visible\n'},
+                               {'norad_id': '400', 'name': 'D', 'tags': ''}])
+    _, sat_info = catalogue.read_catalogue(path, catalogue.build_catalogue_tle_dtype())
+
+    slot_sat_info = SlotSatInfo(sat_info, np.array([-1, 1, 0]))
+
+    assert len(slot_sat_info) == 3
+    assert slot_sat_info[0] == {'norad_id': '', 'name': '', 'tags': ''}
+    assert slot_sat_info[2]['name'] == 'C'
+    assert slot_sat_info.norad_ids() == ['', '400', '300']
+    assert list(slot_sat_info.tag_mask('Visible')) == [False, False, True]
@@ -0,0 +1,51 @@
+import numpy as np
+import point
+from gui.point_index import PointIndex
+
+WIDTH = 200
+HEIGHT = 150
+
+def _random_points(n, seed=1):
+    rng = np.random.default_rng(seed)
+    points = np.zeros(n, point.build_point_dtype())
+    points[point.X] = rng.integers(0, WIDTH, n)
+    points[point.Y] = rng.integers(0, HEIGHT, n)
+    points[point.SATREC_INDEX] = rng.permutation(10 * n)[:n]
+    return points
+
+def test_nearest_matches_brute_force():
+    points = _random_points(300)
+    point_index = PointIndex(points, WIDTH, HEIGHT)
+    rng = np.random.default_rng(2)
+
+    for _ in range(200):
+        y = int(rng.integers(0, HEIGHT))
+        x = int(rng.integers(0, WIDTH))
+        found, found_y, found_x, satrec_index = point_index.nearest(y, x, 10)
+
+        distance = np.maximum(np.abs(points[point.Y] - y), np.abs(points[point.X] - x))
+        if distance.min() > 10:
+            assert not found
+        else:
+            assert found
+            assert max(abs(found_y - y), abs(found_x - x)) == distance.min()
+            i = np.nonzero(points[point.SATREC_INDEX] == satrec_index)[0][0]
+            assert (points[i][point.Y], points[i][point.X]) == (found_y, found_x)
+
+def test_nearest_with_no_points():
+    point_index = PointIndex(_random_points(0), WIDTH, HEIGHT)
+    assert point_index.nearest(10, 10, 30) == (False, None, None, None)
+
+def test_points_on_the_right_and_bottom_edges():
+    # Whole cells across and down, so a point just past the edge is past the last cell.
+    width, height = 6 * 32, 4 * 32
+    points = np.zeros(2, point.build_point_dtype())
+    points[point.X] = [width, 50]
+    points[point.Y] = [5, height]
+    points[point.SATREC_INDEX] = [1, 2]
+    point_index = PointIndex(points, width, height)
+
+    assert point_index.nearest(8, width - 3, 10) == (True, 5, width, 1)
+    assert point_index.nearest(height - 3, 52, 10) == (True, height, 50, 2)
+    # Not mistaken for a point on the left edge of the next row.
+    assert point_index.nearest(40, 2, 10) == (False, None, None, None)
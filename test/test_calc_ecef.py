@@ -0,0 +1,63 @@
+import pyopencl as cl
+import numpy as np
+from pytest import approx
+from datetime import datetime
+import tle
+import jtime
+import dtype as dt
+
+def test_precalculated_rotation_matches_teme_ecef():
+    _calc_ecef_test(
+        '1 25544U 98067A   25185.47485775  .00005492  00000+0  10282-3 0  9993',
+        '2 25544  51.6344 221.3901 0002450 331.8120  28.2736 15.50368910517843',
+        '2025-07-04 19:09:14.0'
+        )
+
+def test_precalculated_rotation_matches_teme_ecef_deep_space():
+    _calc_ecef_test(
+        '1 04632U 70093B   04031.91070959 -.00000084  00000-0  10000-3 0  9955',
+        '2 04632  11.4628 273.1101 1450506 207.6000 143.9350  1.20231981 44145',
+        '2004-02-01 12:00:00.0'
+        )
+
+def _calc_ecef_test(tle_line1, tle_line2, utc_datetime):
+
+    date = datetime.strptime(utc_datetime, '%Y-%m-%d %H:%M:%S.%f')
+
+    opencl_ctx = cl.create_some_context(interactive=False)
+    device = opencl_ctx.devices[0]
+
+    tle_dtype = dt.to_opencl_dtype(device, tle.build_tle_dtype(), 'tle', 'tle.h')
+    dt.to_opencl_dtype(device, jtime.build_jtime_dtype(), 'jtime', 'jtime.h')
+
+    program = cl.Program(
+        opencl_ctx,
+        '#include "test_calc_ecef_kernel.cl"'
+    ).build(
+        options=' -I main/ -I test/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+        cache_dir='caches/opencl_cachedir/'
+    )
+
+    input_array = np.empty(1, tle_dtype)
+    tle_dict = tle.parse_tle(0, tle_line1, tle_line2)
+    for key, value in tle_dict.items():
+        input_array[0][key] = value
+
+    output_array = np.empty(12, cl.cltypes.double)
+
+    mf = cl.mem_flags
+    input_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=input_array)
+    output_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=output_array.nbytes)
+
+    command_queue = cl.CommandQueue(opencl_ctx)
+    program.test_calc_ecef(command_queue, (1,), None,
+        cl.cltypes.int(date.year), cl.cltypes.int(date.month), cl.cltypes.int(date.day),
+        cl.cltypes.int(date.hour), cl.cltypes.int(date.minute), cl.cltypes.double(date.second),
+        cl.cltypes.double(0.07024), input_buf, output_buf)
+
+    cl.enqueue_copy(command_queue, output_array, output_buf).wait()
+
+    assert not np.isnan(output_array[0]), "sgp4 error"
+    for i in range(3):
+        assert output_array[i] == approx(output_array[6 + i], abs=1e-6), "recef[{}]".format(i)
+        assert output_array[3 + i] == approx(output_array[9 + i], abs=1e-9), "vecef[{}]".format(i)
@@ -0,0 +1,57 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+#include "tle.h"
+#include "jtime.h"
+#include "calculate_jtime.cl"
+#include "celestrak/sgp4/SGP4.h"
+#include "celestrak/sgp4/SGP4.cl"
+#include "celestrak/sgp4/init_satrec.cl"
+#include "celestrak/mathtimelib/MathTimeLib.h"
+#include "celestrak/mathtimelib/MathTimeLib.cl"
+#include "celestrak/astrolib/AstroLib.h"
+#include "celestrak/astrolib/AstroLib.cl"
+#include "calc_ecef.cl"
+
+/*
+ * Outputs the ECEF position and velocity found using the precalculated rotation
+ * in the jtime, followed by the same found by calling teme_ecef directly.
+ */
+__kernel void test_calc_ecef(
+    int p_year, int p_month, int p_day,
+    int p_hour, int p_min, double p_sec,
+    double p_ut1_utc_diff_secs,
+    __global const tle *tle_array,
+    __global double *output_array)
+{
+    jtime jt = calculate_jtime(
+        p_year, p_month, p_day, p_hour, p_min, p_sec, p_ut1_utc_diff_secs);
+
+    elsetrec satrec;
+    init_satrec(&satrec, &tle_array[0]);
+
+    sgp4init(wgs72, 'a', satrec.satnum, (satrec.jdsatepoch + satrec.jdsatepochF) - 2433281.5, satrec.bstar,
+            satrec.ndot, satrec.nddot, satrec.ecco, satrec.argpo, satrec.inclo, satrec.mo, satrec.no_kozai,
+            satrec.nodeo, &satrec);
+
+    double recef[3], vecef[3];
+    if (!calc_ecef(&satrec, &jt, recef, vecef)) {
+        output_array[0] = NAN;
+        return;
+    }
+
+    double time_since_sat_epoch = (jt.jdut1 - satrec.jdsatepoch) * 1440.0 + (jt.jdut1Frac - satrec.jdsatepochF) * 1440.0;
+    double rteme[3], vteme[3], ateme[3] = {0.0, 0.0, 0.0};
+    sgp4(&satrec, time_since_sat_epoch, rteme, vteme);
+
+    double conv = pi / (180.0*3600.0);
+    double expected_recef[3], expected_vecef[3], expected_aecef[3];
+    teme_ecef(rteme, vteme, ateme, eTo, expected_recef, expected_vecef, expected_aecef,
+        jt.ttt, jt.jdut1 + jt.jdut1Frac, 0.0015563, 0.0782 * conv, 0.3566 * conv, 2);
+
+    for (int i = 0; i < 3; i++) {
+        output_array[i] = recef[i];
+        output_array[3 + i] = vecef[i];
+        output_array[6 + i] = expected_recef[i];
+        output_array[9 + i] = expected_vecef[i];
+    }
+}
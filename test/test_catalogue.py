@@ -0,0 +1,101 @@
+import os
+import numpy as np
+import pyopencl as cl
+import pytest
+import catalogue
+import tle
+from tle_samples import TLE_LINES
+
+def _compile(path):
+    tle_lines = TLE_LINES[:2]
+    norad_ids = [line1[2:7] for line1, _ in tle_lines]
+    return catalogue.compile_tle_lines(path, norad_ids,
+                                       [line1 for line1, _ in tle_lines], [line2 for _, line2 in tle_lines],
+                                       [{'norad_id': norad_id, 'name': name, 'tags': tags}
+                                        for norad_id, name, tags in zip(norad_ids, ['STARLINK-1\n', 'CZ-6 DEB\n'], ['Visible\n', ''])])
+
+def _device_tle_dtype():
+    opencl_ctx = cl.create_some_context(interactive=False)
+    tle_dtype, _ = cl.tools.match_dtype_to_c_struct(opencl_ctx.devices[0], 'tle', tle.build_tle_dtype())
+    return tle_dtype
+
+def test_compiled_catalogue_is_read_back(tmp_path):
+    path = str(tmp_path / 'catalogue.bin')
+
+    assert _compile(path) == 2
+    tle_array, sat_info = catalogue.read_catalogue(path, _device_tle_dtype())
+
+    assert len(tle_array) == 2
+    assert tle_array[0]['satnum'].tobytes().decode() == '47966\x00'
+    assert tle_array[0]['no_kozai'] == 16.21097541
+    assert tle_array[1]['satnum'].tobytes().decode() == 'A8924\x00'
+    assert tle_array[1]['revnum'] == 4126
+
+    assert len(sat_info) == 2
+    assert sat_info[0] == {'norad_id': '47966', 'name': 'STARLINK-1\n', 'tags': 'Visible\n'}
+    assert sat_info[1] == {'norad_id': 'A8924', 'name': 'CZ-6 DEB\n', 'tags': ''}
+    assert sat_info.norad_ids() == ['47966', 'A8924']
+
+def test_records_and_lines_come_from_one_catalogue(tmp_path):
+    path = str(tmp_path / 'catalogue.bin')
+    _compile(path)
+
+    tle_array, sat_info, tle_lines = catalogue.read_catalogue_and_tle_lines(path, _device_tle_dtype())
+    # A new catalogue moved into place, as tle_ingest does, leaves the one read as it was.
+    new_path = str(tmp_path / 'new.bin')
+    catalogue.compile_tle_lines(new_path, ['10007'], [TLE_LINES[2][0]], [TLE_LINES[2][1]],
+                                [{'norad_id': '10007', 'name': '', 'tags': ''}])
+    os.replace(new_path, path)
+
+    assert sat_info.norad_ids() == ['47966', 'A8924']
+    assert tle_array[1]['satnum'].tobytes().decode() == 'A8924\x00'
+    assert [bytes(lines[0, 2:7]).decode() for lines in tle_lines] == ['47966', 'A8924']
+
+def test_sections_are_aligned(tmp_path):
+    path = str(tmp_path / 'catalogue.bin')
+    _compile(path)
+
+    sections = catalogue.read_sections(path)
+
+    assert set(sections) == {'layout', 'tle', 'norad_ids', 'name_offsets', 'names', 'tag_offsets', 'tag_names',
+                             'tag_bits', 'desc_offsets', 'descriptions', 'tle_lines'}
+    # The file is mapped from the start of a page, so aligned in the file is aligned in memory.
+    for data in sections.values():
+        assert data.ctypes.data % catalogue.SECTION_ALIGNMENT == 0
+
+def test_tags_are_interned(tmp_path):
+    path = str(tmp_path / 'catalogue.bin')
+    descriptions = ['Ownership:   UK\n\nDebris\nVisible\n', 'Visible\n', '\n',
+                    ''.join('Tag {}\n'.format(i) for i in range(70))]
+    catalogue.write_catalogue(path, np.zeros(4, catalogue.build_catalogue_tle_dtype()),
+                              [{'norad_id': str(i), 'name': '', 'tags': tags} for i, tags in enumerate(descriptions)])
+
+    _, sat_info = catalogue.read_catalogue(path, catalogue.build_catalogue_tle_dtype())
+
+    assert sat_info.tag_names[:3] == ['Debris', 'Visible', 'Tag 0']
+    assert list(sat_info.tag_mask('Visible')) == [True, True, False, False]
+    assert list(sat_info.tag_mask('Tag 69')) == [False, False, False, True]
+    assert not sat_info.tag_mask('Ownership:   UK').any()
+    assert sat_info.tags_of(0) == ['Debris', 'Visible']
+    assert sat_info[0]['tags'] == descriptions[0]
+
+def test_norad_ids_are_fixed_width(tmp_path):
+    with pytest.raises(Exception, match='longer than'):
+        catalogue.write_catalogue(str(tmp_path / 'catalogue.bin'), np.zeros(1, catalogue.build_catalogue_tle_dtype()),
+                                  [{'norad_id': '123456', 'name': '', 'tags': ''}])
+
+def test_records_must_match_device_layout(tmp_path):
+    path = str(tmp_path / 'catalogue.bin')
+    catalogue.write_catalogue(path, np.zeros(1, catalogue.build_catalogue_tle_dtype()),
+                              [{'norad_id': '1', 'name': '', 'tags': ''}])
+
+    packed_dtype = tle.build_tle_dtype()
+    with pytest.raises(Exception, match='laid out'):
+        catalogue.read_catalogue(path, packed_dtype)
+
+def test_not_a_catalogue(tmp_path):
+    path = tmp_path / 'catalogue.bin'
+    path.write_bytes(b'1 47966U' * 16)
+
+    with pytest.raises(Exception, match='not a satellite catalogue'):
+        catalogue.read_catalogue(str(path), _device_tle_dtype())
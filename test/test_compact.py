@@ -0,0 +1,55 @@
+import pyopencl as cl
+import numpy as np
+
+def test_compacts_flagged_values_in_order():
+    rng = np.random.default_rng(1)
+    flags = (rng.random(1000) < 0.1).astype(cl.cltypes.int)
+    values = rng.permutation(5000)[:1000].astype(cl.cltypes.int)
+
+    compacted, n_compacted = _compact(flags, values)
+
+    assert n_compacted == np.count_nonzero(flags)
+    assert list(compacted[:n_compacted]) == list(values[flags != 0])
+
+def test_compacts_all_or_none():
+    values = np.arange(300, dtype=cl.cltypes.int)
+
+    compacted, n_compacted = _compact(np.ones(300, cl.cltypes.int), values)
+    assert n_compacted == 300
+    assert list(compacted) == list(values)
+
+    _, n_compacted = _compact(np.zeros(300, cl.cltypes.int), values)
+    assert n_compacted == 0
+
+def _compact(flags, values):
+    opencl_ctx = cl.create_some_context(interactive=False)
+    device = opencl_ctx.devices[0]
+
+    program = cl.Program(
+        opencl_ctx,
+        '#include "compact_kernel.cl"'
+    ).build(
+        options=' -I main/ ',
+        cache_dir='caches/opencl_cachedir/'
+    )
+    kernel = cl.Kernel(program, 'compact_flagged')
+    # Small enough to need several steps through the flags.
+    work_group_size = min(64, kernel.get_work_group_info(cl.kernel_work_group_info.WORK_GROUP_SIZE, device))
+
+    compacted = np.full(len(values), -1, cl.cltypes.int)
+    n_compacted = np.empty(1, cl.cltypes.int)
+
+    mf = cl.mem_flags
+    flags_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=flags)
+    values_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=values)
+    compacted_buf = cl.Buffer(opencl_ctx, mf.READ_WRITE | mf.COPY_HOST_PTR, hostbuf=compacted)
+    n_compacted_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=n_compacted.nbytes)
+
+    command_queue = cl.CommandQueue(opencl_ctx)
+    kernel(command_queue, (work_group_size,), (work_group_size,),
+        cl.cltypes.int(len(flags)), flags_buf, values_buf, compacted_buf, n_compacted_buf,
+        cl.LocalMemory(work_group_size * np.dtype(cl.cltypes.int).itemsize))
+    cl.enqueue_copy(command_queue, compacted, compacted_buf)
+    cl.enqueue_copy(command_queue, n_compacted, n_compacted_buf).wait()
+
+    return (compacted, n_compacted[0],)
@@ -0,0 +1,54 @@
+import pyopencl as cl
+import numpy as np
+from pytest import approx
+import observer
+import tle
+import dtype as dt
+
+# The geodetic position worked out for points, at a site's own position, should be the site's
+# latitude, longitude and altitude.
+def test_geodetic_position_of_sites():
+    sites = [observer.ROYAL_GREENWICH_OBSERVATORY, observer.YORK]
+    output_array = _calc_geodetic_test(sites, [3.0, 4.0, 0.0])
+
+    for (latitude, longitude, altitude, speed), (name, latitude_deg, longitude_deg, altitude_km) \
+            in zip(output_array, sites):
+        assert latitude == approx(latitude_deg, abs=1e-6), name
+        assert longitude == approx(longitude_deg, abs=1e-6), name
+        assert altitude == approx(altitude_km, abs=1e-3), name
+        assert speed == approx(5.0), name
+
+def _calc_geodetic_test(sites, vecef):
+
+    opencl_ctx = cl.create_some_context(interactive=False)
+    device = opencl_ctx.devices[0]
+
+    observer_dtype = dt.to_opencl_dtype(device, observer.build_observer_dtype(), 'observer', 'observer.h')
+    # tle.h not used by test, but used in included header
+    dt.to_opencl_dtype(device, tle.build_tle_dtype(), 'tle', 'tle.h')
+
+    program = cl.Program(
+        opencl_ctx,
+        '#include "test_geodetic_kernel.cl"'
+    ).build(
+        options=' -I main/ -I test/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+        cache_dir='caches/opencl_cachedir/'
+    )
+
+    observer_array = np.empty(len(sites), observer_dtype)
+    for i, (_, latitude_deg, longitude_deg, altitude_km) in enumerate(sites):
+        for key, value in observer.calc_observer(latitude_deg, longitude_deg, altitude_km).items():
+            observer_array[i][key] = value
+
+    input_array = np.array(vecef, dtype=cl.cltypes.double)
+    output_array = np.empty([len(sites), 4], cl.cltypes.double)
+
+    mf = cl.mem_flags
+    observer_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=observer_array)
+    input_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=input_array)
+    output_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=output_array.nbytes)
+
+    command_queue = cl.CommandQueue(opencl_ctx)
+    program.test_calc_geodetic(command_queue, (len(sites),), None, observer_buf, input_buf, output_buf)
+    cl.enqueue_copy(command_queue, output_array, output_buf).wait()
+    return output_array
@@ -0,0 +1,37 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+#include "observer.h"
+#include "celestrak/sgp4/SGP4.h"
+#include "celestrak/sgp4/SGP4.cl"
+#include "celestrak/mathtimelib/MathTimeLib.h"
+#include "celestrak/mathtimelib/MathTimeLib.cl"
+#include "celestrak/astrolib/AstroLib.h"
+#include "celestrak/astrolib/AstroLib.cl"
+#include "calc_geodetic.cl"
+
+/*
+ * Outputs the latitude, longitude, altitude and speed from calc_geodetic, for the site of each
+ * observer and the velocity given.
+ */
+__kernel void test_calc_geodetic(
+    __global const observer *observers,
+    __global const double *input_array,
+    __global double *output_array)
+{
+    const size_t i = get_global_id(0);
+    const observer obs = observers[i];
+
+    double recef[3], vecef[3];
+    for (int j = 0; j < 3; j++) {
+        recef[j] = obs.rsecef[j];
+        vecef[j] = input_array[j];
+    }
+
+    double latitude, longitude, altitude, speed;
+    calc_geodetic(recef, vecef, &latitude, &longitude, &altitude, &speed);
+
+    output_array[i*4] = latitude;
+    output_array[i*4 + 1] = longitude;
+    output_array[i*4 + 2] = altitude;
+    output_array[i*4 + 3] = speed;
+}
@@ -0,0 +1,64 @@
+import pyopencl as cl
+import numpy as np
+from pytest import approx
+import observer
+import tle
+import dtype as dt
+
+def test_site_ecef_position_and_sez_rotation():
+    obs = observer.calc_observer(39.007, -104.883, 2.19456)
+
+    # Vallado 2013, example 7-1.
+    assert obs['rsecef'] == approx([-1275.1219, -4797.9890, 3994.2975], abs=0.01)
+
+    ecef_sez = obs['ecef_sez'].reshape(3, 3)
+    assert ecef_sez @ ecef_sez.T == approx(np.identity(3))
+    # Zenith should point along the geodetic normal.
+    assert ecef_sez[2] == approx([
+        np.cos(np.radians(39.007)) * np.cos(np.radians(-104.883)),
+        np.cos(np.radians(39.007)) * np.sin(np.radians(-104.883)),
+        np.sin(np.radians(39.007))])
+    assert obs['horizon_height'] == approx(np.dot(obs['rsecef'], ecef_sez[2]))
+
+def test_observer_razel_matches_rv_razel():
+    _observer_razel_test(observer.ROYAL_GREENWICH_OBSERVATORY, [4000.0, 100.0, 5500.0], [1.0, 7.0, -2.0])
+    _observer_razel_test(observer.YORK, [-2000.0, 6000.0, 3000.0], [-5.0, -1.0, 4.0])
+
+def _observer_razel_test(site, recef, vecef):
+
+    opencl_ctx = cl.create_some_context(interactive=False)
+    device = opencl_ctx.devices[0]
+
+    observer_dtype = dt.to_opencl_dtype(device, observer.build_observer_dtype(), 'observer', 'observer.h')
+    # tle.h not used by test, but used in included header
+    dt.to_opencl_dtype(device, tle.build_tle_dtype(), 'tle', 'tle.h')
+
+    program = cl.Program(
+        opencl_ctx,
+        '#include "test_observer_kernel.cl"'
+    ).build(
+        options=' -I main/ -I test/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+        cache_dir='caches/opencl_cachedir/'
+    )
+
+    (_, latitude_deg, longitude_deg, altitude_km) = site
+    observer_array = np.empty(1, observer_dtype)
+    for key, value in observer.calc_observer(latitude_deg, longitude_deg, altitude_km).items():
+        observer_array[0][key] = value
+
+    input_array = np.array(recef + vecef, dtype=cl.cltypes.double)
+    output_array = np.empty(9, cl.cltypes.double)
+
+    mf = cl.mem_flags
+    observer_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=observer_array)
+    input_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=input_array)
+    output_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=output_array.nbytes)
+
+    command_queue = cl.CommandQueue(opencl_ctx)
+    program.test_observer_razel(command_queue, (1,), None, observer_buf, input_buf, output_buf)
+    cl.enqueue_copy(command_queue, output_array, output_buf).wait()
+
+    assert observer_array[0]['rsecef'] == approx(output_array[0:3], abs=1e-6), "site position"
+    assert output_array[6] == approx(output_array[3], abs=1e-6), "range"
+    assert output_array[7] == approx(output_array[4], abs=1e-9), "azimuth"
+    assert output_array[8] == approx(output_array[5], abs=1e-9), "elevation"
@@ -0,0 +1,47 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+#include "observer.h"
+#include "celestrak/sgp4/SGP4.h"
+#include "celestrak/sgp4/SGP4.cl"
+#include "celestrak/mathtimelib/MathTimeLib.h"
+#include "celestrak/mathtimelib/MathTimeLib.cl"
+#include "celestrak/astrolib/AstroLib.h"
+#include "celestrak/astrolib/AstroLib.cl"
+#include "observer_razel.cl"
+
+/*
+ * Outputs the site position from the celestrak site routine, the range/azimuth/elevation
+ * from rv_razel and then the range/azimuth/elevation from observer_razel.
+ */
+__kernel void test_observer_razel(
+    __global const observer *observers,
+    __global const double *input_array,
+    __global double *output_array)
+{
+    const observer obs = observers[0];
+
+    double recef[3], vecef[3];
+    for (int i = 0; i < 3; i++) {
+        recef[i] = input_array[i];
+        vecef[i] = input_array[3 + i];
+    }
+
+    double rsecef[3], vsecef[3];
+    site(obs.latgd, obs.lon, obs.alt, rsecef, vsecef);
+
+    double rho, az, el, drho, daz, del;
+    rv_razel(recef, vecef, obs.latgd, obs.lon, obs.alt, &rho, &az, &el, &drho, &daz, &del);
+
+    double obs_rho, obs_az, obs_el;
+    observer_razel(&obs, recef, vecef, &obs_rho, &obs_az, &obs_el);
+
+    output_array[0] = rsecef[0];
+    output_array[1] = rsecef[1];
+    output_array[2] = rsecef[2];
+    output_array[3] = rho;
+    output_array[4] = az;
+    output_array[5] = el;
+    output_array[6] = obs_rho;
+    output_array[7] = obs_az;
+    output_array[8] = obs_el;
+}
@@ -0,0 +1,61 @@
+import numpy as np
+import pyopencl as cl
+import dtype as dt
+import tle
+from tle_samples import TLE_LINES
+
+def test_device_parse_matches_host_parse():
+    tle_array, errors = _parse_on_device(TLE_LINES)
+
+    assert list(errors) == [0, 0, 0]
+    expected = tle.parse_tle_lines([line1[2:7] for line1, _ in TLE_LINES],
+                                   tle.to_fixed_width([line1 for line1, _ in TLE_LINES]),
+                                   tle.to_fixed_width([line2 for _, line2 in TLE_LINES]),
+                                   tle_array.dtype)
+    for name in tle_array.dtype.names:
+        assert np.array_equal(tle_array[name], expected[name]), name
+        # Including the sign of zeros.
+        assert np.array_equal(np.signbit(tle_array[name]), np.signbit(expected[name])), name
+
+def test_device_parse_errors():
+    line1, line2 = TLE_LINES[0]
+    bad_format = line1[:20] + 'x' + line1[21:]
+    bad_check_digit = line2[:68] + '0'
+    _, other_line2 = TLE_LINES[2]
+
+    _, errors = _parse_on_device([(bad_format, line2), (line1, bad_check_digit), (line1, other_line2)])
+
+    assert errors[0] & tle.LINE1_FORMAT_ERROR
+    assert errors[1] == tle.LINE2_CHECK_DIGIT_ERROR
+    assert errors[2] & tle.SATNUM_MISMATCH_ERROR
+
+def _parse_on_device(lines):
+    opencl_ctx = cl.create_some_context(interactive=False)
+    device = opencl_ctx.devices[0]
+
+    tle_dtype = dt.to_opencl_dtype(device, tle.build_tle_dtype(), 'tle', 'tle.h')
+    program = cl.Program(
+        opencl_ctx,
+        '#include "parse_tle_kernel.cl"'
+    ).build(
+        options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+        cache_dir='caches/opencl_cachedir/'
+    )
+
+    raw_lines = np.stack((tle.to_fixed_width([line1 for line1, _ in lines]),
+                          tle.to_fixed_width([line2 for _, line2 in lines]),), axis=1)
+    tle_array = np.empty(len(lines), tle_dtype)
+    errors = np.empty(len(lines), cl.cltypes.int)
+
+    mf = cl.mem_flags
+    lines_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=raw_lines)
+    tle_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=tle_array.nbytes)
+    errors_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=errors.nbytes)
+
+    command_queue = cl.CommandQueue(opencl_ctx)
+    kernel = cl.Kernel(program, 'parse_tle_lines')
+    kernel(command_queue, (len(lines),), None, lines_buf, tle_buf, errors_buf)
+    cl.enqueue_copy(command_queue, tle_array, tle_buf)
+    cl.enqueue_copy(command_queue, errors, errors_buf)
+    command_queue.finish()
+    return (tle_array, errors,)
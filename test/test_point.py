@@ -0,0 +1,42 @@
+import numpy as np
+import point
+
+def _points(rows):
+    points = np.zeros(len(rows), point.build_point_dtype())
+    for i, (frame, observer_index, x, y, satrec_index) in enumerate(rows):
+        points[i][point.FRAME] = frame
+        points[i][point.OBSERVER_INDEX] = observer_index
+        points[i][point.X] = x
+        points[i][point.Y] = y
+        points[i][point.SATREC_INDEX] = satrec_index
+    return points
+
+def test_split_frames():
+    points = _points([(2, 0, 1, 1, 7), (0, 0, 2, 2, 8), (2, 1, 3, 3, 9)])
+
+    frames = point.split_frames(points, 4)
+
+    assert [len(f) for f in frames] == [1, 0, 2, 0]
+    assert list(frames[0][point.SATREC_INDEX]) == [8]
+    assert list(frames[2][point.SATREC_INDEX]) == [7, 9]
+
+def test_frame_positions():
+    rows = np.zeros([2, 2], point.build_position_dtype())
+    rows[1, 0] = (5, 6, 1)
+    rows[1, 1] = (7, 8, 0)
+    row_of_satrec = np.array([-1, -1, -1, 1, 0], np.int32)
+
+    frame_positions = point.FramePositions(rows, row_of_satrec)
+
+    assert frame_positions.find(3, 0) == (True, 6, 5)
+    # Below the horizon for the second observer.
+    assert frame_positions.find(3, 1) == (False, None, None)
+    # Not flagged in the batch.
+    assert frame_positions.find(1, 0) == (False, None, None)
+    assert frame_positions.find(4, 0) == (False, None, None)
+
+def test_geodetic_fields_are_optional():
+    assert point.ALTITUDE not in point.build_point_dtype().names
+    geodetic_dtype = point.build_point_dtype(geodetic=True)
+    for field in (point.LATITUDE, point.LONGITUDE, point.ALTITUDE, point.SPEED):
+        assert field in geodetic_dtype.names
@@ -0,0 +1,117 @@
+import pyopencl as cl
+import numpy as np
+from datetime import datetime
+import tle
+import jtime
+import observer
+import dtype as dt
+
+# Checks that every time a satellite is above the horizon of one of the observers, found
+# by sampling its elevation every few seconds, falls in one of its predicted passes.
+
+SITES = [observer.ROYAL_GREENWICH_OBSERVATORY, observer.CLOTH_HALL_LEEDS, observer.YORK]
+
+def test_low_earth_orbit():
+    passes = _predict_passes_test(
+        '1 25544U 98067A   25185.47485775  .00005492  00000+0  10282-3 0  9993',
+        '2 25544  51.6344 221.3901 0002450 331.8120  28.2736 15.50368910517843',
+        '2025-07-04 18:00:00.0', SITES)
+    # Rises and sets several times, but is below the horizon most of the time.
+    assert len(passes) > 1
+    assert np.sum(passes[:, 1] - passes[:, 0]) < 0.25 * WINDOW_SECS
+
+def test_molniya_orbit():
+    passes = _predict_passes_test(
+        '1 08195U 75081A   06176.33215444  .00000099  00000-0  11873-3 0   813',
+        '2 08195  64.1586 279.0717 6877146 264.7651  20.2257  2.00491383225656',
+        '2006-06-25 06:00:00.0', SITES[:1])
+    assert len(passes) > 0
+
+def test_too_many_passes_runs_last_to_end_of_window():
+    passes = _predict_passes_test(
+        '1 25544U 98067A   25185.47485775  .00005492  00000+0  10282-3 0  9993',
+        '2 25544  51.6344 221.3901 0002450 331.8120  28.2736 15.50368910517843',
+        '2025-07-04 18:00:00.0', SITES, max_passes=1)
+    assert len(passes) == 1
+    assert passes[0, 1] == WINDOW_SECS
+
+WINDOW_SECS = 6 * 60 * 60.0
+STEP_SECS = 10.0
+SAMPLE_SECS = 2.0
+
+def _predict_passes_test(tle_line1, tle_line2, utc_datetime, sites, max_passes=8):
+
+    date = datetime.strptime(utc_datetime, '%Y-%m-%d %H:%M:%S.%f')
+
+    opencl_ctx = cl.create_some_context(interactive=False)
+    device = opencl_ctx.devices[0]
+
+    tle_dtype = dt.to_opencl_dtype(device, tle.build_tle_dtype(), 'tle', 'tle.h')
+    dt.to_opencl_dtype(device, jtime.build_jtime_dtype(), 'jtime', 'jtime.h')
+    observer_dtype = dt.to_opencl_dtype(device, observer.build_observer_dtype(), 'observer', 'observer.h')
+
+    program = cl.Program(
+        opencl_ctx,
+        '#include "test_predict_passes_kernel.cl"'
+    ).build(
+        options=' -I main/ -I test/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+        cache_dir='caches/opencl_cachedir/'
+    )
+
+    tle_array = np.empty(1, tle_dtype)
+    for key, value in tle.parse_tle(0, tle_line1, tle_line2).items():
+        tle_array[0][key] = value
+
+    observer_array = np.empty(len(sites), observer_dtype)
+    for i, (_, latitude_deg, longitude_deg, altitude_km) in enumerate(sites):
+        for key, value in observer.calc_observer(latitude_deg, longitude_deg, altitude_km).items():
+            observer_array[i][key] = value
+
+    command_queue = cl.CommandQueue(opencl_ctx)
+    mf = cl.mem_flags
+
+    satrec_size = np.empty(1, cl.cltypes.ulong)
+    satrec_size_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=satrec_size.nbytes)
+    program.test_satrec_size(command_queue, (1,), None, satrec_size_buf)
+    cl.enqueue_copy(command_queue, satrec_size, satrec_size_buf).wait()
+
+    tle_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=tle_array)
+    satrec_buf = cl.Buffer(opencl_ctx, mf.READ_WRITE, size=int(satrec_size[0]))
+    observer_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=observer_array)
+    program.test_calc_satrec(command_queue, (1,), None, tle_buf, satrec_buf)
+
+    pass_times = np.empty([max_passes, 2], cl.cltypes.double)
+    n_passes = np.empty(1, cl.cltypes.int)
+    pass_times_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=pass_times.nbytes)
+    n_passes_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=n_passes.nbytes)
+    satrec_indices_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=np.zeros(1, cl.cltypes.int))
+    program.predict_passes(command_queue, (1,), None,
+        cl.cltypes.int(date.year), cl.cltypes.int(date.month), cl.cltypes.int(date.day),
+        cl.cltypes.int(date.hour), cl.cltypes.int(date.minute), cl.cltypes.double(date.second),
+        cl.cltypes.double(0.07024), cl.cltypes.double(WINDOW_SECS), cl.cltypes.double(STEP_SECS),
+        cl.cltypes.int(max_passes), cl.cltypes.int(len(sites)),
+        satrec_indices_buf, satrec_buf, observer_buf, pass_times_buf, n_passes_buf)
+    cl.enqueue_copy(command_queue, pass_times, pass_times_buf)
+    cl.enqueue_copy(command_queue, n_passes, n_passes_buf).wait()
+    passes = pass_times[:n_passes[0]]
+
+    n_samples = int(WINDOW_SECS / SAMPLE_SECS) + 1
+    elevations = np.empty(n_samples, cl.cltypes.double)
+    elevations_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=elevations.nbytes)
+    program.test_elevations(command_queue, (n_samples,), None,
+        cl.cltypes.int(date.year), cl.cltypes.int(date.month), cl.cltypes.int(date.day),
+        cl.cltypes.int(date.hour), cl.cltypes.int(date.minute), cl.cltypes.double(date.second),
+        cl.cltypes.double(SAMPLE_SECS), cl.cltypes.int(len(sites)),
+        satrec_buf, observer_buf, elevations_buf)
+    cl.enqueue_copy(command_queue, elevations, elevations_buf).wait()
+
+    assert not np.isnan(elevations).any(), "sgp4 error"
+    visible_times = np.nonzero(elevations > 0)[0] * SAMPLE_SECS
+    assert len(visible_times) > 0, "never visible, so nothing tested"
+
+    assert np.all(passes[:, 0] <= passes[:, 1])
+    assert np.all(passes[1:, 0] >= passes[:-1, 1]), "passes overlap or out of order"
+    in_pass = np.any((visible_times[:, np.newaxis] >= passes[:, 0]) & (visible_times[:, np.newaxis] <= passes[:, 1]), axis=1)
+    assert in_pass.all(), "visible at {} not in a predicted pass".format(visible_times[~in_pass])
+
+    return passes
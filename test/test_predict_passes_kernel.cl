@@ -0,0 +1,57 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+#include "tle.h"
+#include "predict_passes_kernel.cl"
+#include "celestrak/sgp4/init_satrec.cl"
+
+__kernel void test_satrec_size(__global size_t *output_array)
+{
+    output_array[0] = sizeof(elsetrec);
+}
+
+__kernel void test_calc_satrec(
+    __global const tle *tle_array,
+    __global elsetrec *satrec_array)
+{
+    elsetrec satrec;
+    init_satrec(&satrec, &tle_array[0]);
+
+    sgp4init(wgs72, 'a', satrec.satnum, (satrec.jdsatepoch + satrec.jdsatepochF) - 2433281.5, satrec.bstar,
+            satrec.ndot, satrec.nddot, satrec.ecco, satrec.argpo, satrec.inclo, satrec.mo, satrec.no_kozai,
+            satrec.nodeo, &satrec);
+
+    satrec_array[0] = satrec;
+}
+
+/*
+ * Highest elevation over the observers at each step from the start time, NAN on sgp4 error.
+ */
+__kernel void test_elevations(
+    int p_year, int p_month, int p_day,
+    int p_hour, int p_min, double p_sec,
+    double step_secs,
+    int n_observers,
+    __global const elsetrec *satrec_array,
+    __global const observer *observers,
+    __global double *elevations)
+{
+    const size_t step = get_global_id(0);
+    elsetrec satrec = satrec_array[0];
+
+    const jtime jt = calculate_jtime(p_year, p_month, p_day, p_hour, p_min, p_sec + step * step_secs, 0.07024);
+
+    double recef[3], vecef[3];
+    if (!calc_ecef(&satrec, &jt, recef, vecef)) {
+        elevations[step] = NAN;
+        return;
+    }
+
+    double max_el = -pi;
+    for (int i = 0; i < n_observers; i++) {
+        const observer obs = observers[i];
+        double rho, az, el;
+        observer_razel(&obs, recef, vecef, &rho, &az, &el);
+        max_el = fmax(max_el, el);
+    }
+    elevations[step] = max_el;
+}
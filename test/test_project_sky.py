@@ -0,0 +1,77 @@
+import pyopencl as cl
+import numpy as np
+from datetime import datetime, timezone
+import jtime
+import observer
+import dtype as dt
+from frame_gen import sky
+
+_SIZE = 200
+
+# Around midsummer's noon the sun is due south, at 90 - 51.5 + 23.4 = 62 degrees.
+def test_sun_is_south_at_noon():
+    positions = _project_sky((2026, 6, 21, 12, 0), [])
+
+    x, y = positions[0, 0, sky.SUN]
+    assert abs(x - 100) <= 2
+    # The south is at the bottom.
+    assert abs(y - (100 + np.cos(np.radians(62.0)) * 100)) <= 2
+
+def test_sun_is_below_the_horizon_at_midnight():
+    positions = _project_sky((2026, 6, 21, 0, 0), [])
+
+    assert positions[0, 0, sky.SUN].tolist() == [-1, -1]
+
+# Polaris is always due north, at the latitude, and stars far enough south never rise.
+def test_stars():
+    polaris = (np.radians((2 + 31 / 60 + 49.09 / 3600) * 15), np.radians(89 + 15 / 60 + 50.8 / 3600))
+    southern = (np.radians(90.0), np.radians(-70.0))
+    positions = _project_sky((2026, 10, 18, 21, 0), [polaris, southern])
+
+    x, y = positions[0, 0, sky.FIRST_STAR]
+    assert abs(x - 100) <= 2
+    assert abs(y - (100 - np.cos(np.radians(51.5)) * 100)) <= 2
+    assert positions[0, 0, sky.FIRST_STAR + 1].tolist() == [-1, -1]
+
+def _project_sky(time, stars):
+    """ The pixel of each sky object, indexed by (frame, observer, object), from Greenwich. """
+    opencl_ctx = cl.create_some_context(interactive=False)
+    device = opencl_ctx.devices[0]
+
+    dt.to_opencl_dtype(device, jtime.build_jtime_dtype(), 'jtime', 'jtime.h')
+    observer_dtype = dt.to_opencl_dtype(device, observer.build_observer_dtype(), 'observer', 'observer.h')
+    options = ' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' '
+    jtime_program = cl.Program(opencl_ctx, '#include "calc_jtime_kernel.cl"').build(
+        options=options, cache_dir='caches/opencl_cachedir/')
+    sky_program = cl.Program(opencl_ctx, '#include "sky_kernel.cl"').build(
+        options=options, cache_dir='caches/opencl_cachedir/')
+
+    (_, latitude_deg, longitude_deg, altitude_km) = observer.ROYAL_GREENWICH_OBSERVATORY
+    observer_array = np.empty(1, observer_dtype)
+    for key, value in observer.calc_observer(latitude_deg, longitude_deg, altitude_km).items():
+        observer_array[0][key] = value
+
+    star_array = np.zeros(len(stars), sky.build_star_dtype())
+    for i, (ra, dec) in enumerate(stars):
+        star_array[i][sky.RIGHT_ASCENSION] = ra
+        star_array[i][sky.DECLINATION] = dec
+    (year, month, day, hour, minute) = time
+    directions = sky.star_directions(star_array, jtime.julian_date(datetime(year, month, day, hour, minute, tzinfo=timezone.utc)))
+    n_objects = sky.FIRST_STAR + len(stars)
+    positions = np.empty([1, 1, n_objects, 2], cl.cltypes.int)
+
+    mf = cl.mem_flags
+    jtime_buf = cl.Buffer(opencl_ctx, mf.READ_WRITE, size=jtime.build_jtime_dtype().itemsize)
+    observer_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=observer_array)
+    star_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR,
+                         hostbuf=np.append(directions, np.zeros(3)).astype(cl.cltypes.double))
+    positions_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=positions.nbytes)
+
+    command_queue = cl.CommandQueue(opencl_ctx)
+    jtime_program.calc_jtime(command_queue, (1,), None,
+        cl.cltypes.int(year), cl.cltypes.int(month), cl.cltypes.int(day), cl.cltypes.int(hour), cl.cltypes.int(minute),
+        cl.cltypes.double(0.0), cl.cltypes.double(0.25), cl.cltypes.double(0.07), jtime_buf)
+    sky_program.project_sky(command_queue, (n_objects, 1), None,
+        cl.cltypes.int(_SIZE), cl.cltypes.int(_SIZE), cl.cltypes.int(1), jtime_buf, observer_buf, star_buf, positions_buf)
+    cl.enqueue_copy(command_queue, positions, positions_buf).wait()
+    return positions
@@ -0,0 +1,146 @@
+import pyopencl as cl
+import numpy as np
+from datetime import datetime, timedelta, timezone
+import tle
+import jtime
+import observer
+import point
+import dtype as dt
+from frame_gen.projections import ProjectionsGenerator
+from tle_samples import TLE_LINES
+
+# The MEO satellite of TLE_LINES is above Greenwich from 12:00 to 13:30 on its epoch day.
+START_TIME = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+N_JTIMES = 8
+FRAME_PERIOD_SECS = 60.0
+
+def test_two_slots_in_flight_match_one_at_a_time():
+    generator, calc_jtimes = _projections_generator([observer.ROYAL_GREENWICH_OBSERVATORY])
+    batch_times = [START_TIME, START_TIME + timedelta(seconds=N_JTIMES * FRAME_PERIOD_SECS)]
+    satrec_indices = np.arange(len(TLE_LINES))
+
+    one_at_a_time = []
+    for start_time in batch_times:
+        slot = generator.slots[0]
+        generator.enqueue(slot, start_time, calc_jtimes(start_time, slot.jtime_buf), satrec_indices)
+        one_at_a_time.append(generator.collect(slot))
+
+    for slot, start_time in zip(generator.slots, batch_times):
+        generator.enqueue(slot, start_time, calc_jtimes(start_time, slot.jtime_buf), satrec_indices)
+    in_flight = [generator.collect(slot) for slot in generator.slots]
+
+    for (points, positions, row_of_satrec), (expected_points, expected_positions, expected_row_of_satrec) \
+            in zip(in_flight, one_at_a_time):
+        assert len(points) > 0, "nothing visible, so nothing tested"
+        assert _in_order(points).tolist() == _in_order(expected_points).tolist()
+        # Where a satellite is not visible, its pixel is left as it was.
+        assert positions[point.VISIBLE].tolist() == expected_positions[point.VISIBLE].tolist()
+        visible = positions[point.VISIBLE] != 0
+        assert positions[visible].tolist() == expected_positions[visible].tolist()
+        assert row_of_satrec.tolist() == expected_row_of_satrec.tolist()
+    # The batches are of different frames, so the points moved.
+    assert in_flight[0][0].tolist() != in_flight[1][0].tolist()
+    # Both slots had to make room for more points.
+    assert all(slot.max_points > 1 for slot in generator.slots)
+
+# Each site's points and positions are the same as when it is the only site.
+def test_several_sites():
+    sites = [observer.ROYAL_GREENWICH_OBSERVATORY, observer.YORK, _SYDNEY]
+    generator, calc_jtimes = _projections_generator(sites)
+    points, positions, row_of_satrec = _project(generator, calc_jtimes)
+
+    for observer_index, site in enumerate(sites):
+        site_generator, site_calc_jtimes = _projections_generator([site])
+        site_points, site_positions, site_row_of_satrec = _project(site_generator, site_calc_jtimes)
+
+        points_of_site = points[points[point.OBSERVER_INDEX] == observer_index]
+        points_of_site[point.OBSERVER_INDEX] = 0
+        assert _in_order(points_of_site).tolist() == _in_order(site_points).tolist(), site[0]
+
+        for satrec_index in np.nonzero(site_row_of_satrec >= 0)[0]:
+            position = positions[row_of_satrec[satrec_index], :, observer_index]
+            site_position = site_positions[site_row_of_satrec[satrec_index], :, 0]
+            assert position[point.VISIBLE].tolist() == site_position[point.VISIBLE].tolist(), site[0]
+            visible = position[point.VISIBLE] != 0
+            assert position[visible].tolist() == site_position[visible].tolist(), site[0]
+
+    # The MEO satellite is above the horizon in England, but not in Sydney.
+    assert np.unique(points[point.OBSERVER_INDEX]).tolist() == [0, 1]
+
+def test_slot_with_no_satrecs():
+    generator, calc_jtimes = _projections_generator([observer.ROYAL_GREENWICH_OBSERVATORY])
+    slot = generator.slots[1]
+    generator.enqueue(slot, START_TIME, calc_jtimes(START_TIME, slot.jtime_buf), [])
+
+    points, positions, row_of_satrec = generator.collect(slot)
+    assert len(points) == 0
+    assert positions.shape == (0, N_JTIMES, 1)
+    assert row_of_satrec.tolist() == [-1] * len(TLE_LINES)
+
+_SYDNEY = ('Sydney', -33.8568, 151.2153, 0.0)
+
+def _project(generator, calc_jtimes):
+    """ The points, positions and rows of all the satellites of TLE_LINES, in a batch from
+        START_TIME.
+    """
+    slot = generator.slots[0]
+    generator.enqueue(slot, START_TIME, calc_jtimes(START_TIME, slot.jtime_buf), np.arange(len(TLE_LINES)))
+    return generator.collect(slot)
+
+def _in_order(points):
+    """ The points of a frame are appended in whatever order the work items get to them. """
+    return np.sort(points, order=[point.FRAME, point.OBSERVER_INDEX, point.SATREC_INDEX])
+
+class _OpenCl:
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.device = ctx.devices[0]
+        self.queue = cl.CommandQueue(ctx)
+
+def _projections_generator(sites, geodetic=False):
+    """ A generator of two slots for the satellites of TLE_LINES, with room for only one point
+        at first, so the slots regrow.  Also returns a function to enqueue the calculation of a
+        batch's jtimes into a buffer.
+    """
+    opencl = _OpenCl(cl.create_some_context(interactive=False))
+
+    tle_dtype = dt.to_opencl_dtype(opencl.device, tle.build_tle_dtype(), 'tle', 'tle.h')
+    jtime_dtype = dt.to_opencl_dtype(opencl.device, jtime.build_jtime_dtype(), 'jtime', 'jtime.h')
+    observer_dtype = dt.to_opencl_dtype(opencl.device, observer.build_observer_dtype(), 'observer', 'observer.h')
+    options = ' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' '
+    satrecs_program = cl.Program(opencl.ctx, '#include "calc_satrecs_kernel.cl"').build(
+        options=options, cache_dir='caches/opencl_cachedir/')
+    jtime_program = cl.Program(opencl.ctx, '#include "calc_jtime_kernel.cl"').build(
+        options=options, cache_dir='caches/opencl_cachedir/')
+
+    tle_array = tle.parse_tle_lines([line1[2:7] for line1, _ in TLE_LINES],
+                                    tle.to_fixed_width([line1 for line1, _ in TLE_LINES]),
+                                    tle.to_fixed_width([line2 for _, line2 in TLE_LINES]), tle_dtype)
+
+    observer_array = np.empty(len(sites), observer_dtype)
+    for i, (_, latitude_deg, longitude_deg, altitude_km) in enumerate(sites):
+        for key, value in observer.calc_observer(latitude_deg, longitude_deg, altitude_km).items():
+            observer_array[i][key] = value
+
+    mf = cl.mem_flags
+    satrec_size = np.empty(1, cl.cltypes.uint)
+    satrec_size_buf = cl.Buffer(opencl.ctx, mf.WRITE_ONLY, size=satrec_size.nbytes)
+    satrecs_program.satrec_size(opencl.queue, (1,), None, satrec_size_buf)
+    cl.enqueue_copy(opencl.queue, satrec_size, satrec_size_buf).wait()
+
+    tle_buf = cl.Buffer(opencl.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=tle_array)
+    satrec_buf = cl.Buffer(opencl.ctx, mf.READ_WRITE, size=int(satrec_size[0]) * len(TLE_LINES))
+    observer_buf = cl.Buffer(opencl.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=observer_array)
+    satrecs_program.calc_satrecs(opencl.queue, (len(TLE_LINES),), None, tle_buf, satrec_buf)
+
+    generator = ProjectionsGenerator(opencl, N_JTIMES, FRAME_PERIOD_SECS, jtime_dtype.itemsize, len(TLE_LINES),
+                                     satrec_buf, len(sites), observer_buf, 200, 200, 2, 1, geodetic)
+
+    calc_jtime_kernel = cl.Kernel(jtime_program, 'calc_jtime')
+    def calc_jtimes(start_time, jtime_buf):
+        return calc_jtime_kernel(opencl.queue, (N_JTIMES,), None,
+            cl.cltypes.int(start_time.year), cl.cltypes.int(start_time.month), cl.cltypes.int(start_time.day),
+            cl.cltypes.int(start_time.hour), cl.cltypes.int(start_time.minute), cl.cltypes.double(start_time.second),
+            cl.cltypes.double(FRAME_PERIOD_SECS), cl.cltypes.double(0.07), jtime_buf)
+
+    return (generator, calc_jtimes,)
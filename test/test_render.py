@@ -0,0 +1,121 @@
+import numpy as np
+import pyopencl as cl
+import dtype as dt
+import point
+from frame_gen.palette import Palette, Style, build_style_dtype
+
+_WIDTH = 16
+_HEIGHT = 12
+
+_PALETTE = Palette([Style((200, 100, 50)), Style((255, 255, 255), radius=2.0)])
+
+def test_single_pixel_in_style_colour():
+    images = _render([(0, 3, 4, 0, 5000.0)], [0], 1)
+
+    lit = np.argwhere(images[0] & 0xffffff)
+    assert lit.tolist() == [[4, 3]]
+    assert images[0, 4, 3] == 0xff3264c8
+    assert (images >> 24 == 0xff).all()
+
+def test_disc_shrinks_with_range_and_is_drawn_for_its_observer():
+    near = _render([(1, 8, 6, 1, 500.0)], [0, 1], 2)
+    far = _render([(1, 8, 6, 1, 4000.0)], [0, 1], 2)
+
+    assert not (near[0] & 0xffffff).any()
+    # Radius 2, with the corners faded.
+    assert np.count_nonzero(near[1] & 0xffffff) == 25
+    assert near[1, 4, 6] & 0xff < 0xff
+    assert 1 < np.count_nonzero(far[1] & 0xffffff) <= 9
+    assert near[1, 6, 8] == 0xffffffff
+
+def test_overlapping_points_add_and_saturate():
+    images = _render([(0, 3, 4, 0, 5000.0), (0, 3, 4, 1, 5000.0), (0, 15, 11, 0, 5000.0)], [0, 0], 1)
+
+    # Red saturates.
+    assert images[0, 4, 3] == 0xff64c8ff
+    assert images[0, 11, 15] == 0xff3264c8
+
+def test_trail_fades_back_through_earlier_frames():
+    images = _render([(0, 6, 4, 0, 5000.0)], [0], 1,
+                     earlier_frames=[[(0, 0, 4, 0, 5000.0)], [(0, 3, 4, 0, 5000.0)]])
+
+    lit = np.argwhere(images[0] & 0xffffff)
+    assert lit[:, 0].tolist() == [4] * 7
+    # Newest first, each frame's segment fainter.
+    reds = images[0, 4, :7] & 0xff
+    assert reds[6] == 200
+    assert reds[5] == reds[4] == reds[3] > reds[2] == reds[1] == reds[0] > 0
+
+def test_trail_stops_at_a_frame_the_satellite_was_not_visible_in():
+    images = _render([(0, 6, 4, 0, 5000.0)], [0], 1,
+                     earlier_frames=[[(0, 0, 4, 0, 5000.0)], []])
+
+    assert np.argwhere(images[0] & 0xffffff).tolist() == [[4, 6]]
+
+def _render(points, style_of_satrec, n_observers, earlier_frames=()):
+    """ Draws the points, with trails back through the earlier frames if there are any. """
+    opencl_ctx = cl.create_some_context(interactive=False)
+    device = opencl_ctx.devices[0]
+
+    point_dtype = dt.to_opencl_dtype(device, point.build_point_dtype(), 'point', 'point.h')
+    style_dtype = dt.to_opencl_dtype(device, build_style_dtype(), 'style', 'style.h')
+    program = cl.Program(
+        opencl_ctx,
+        '#include "render_kernel.cl"'
+    ).build(
+        options=' -I main/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+        cache_dir='caches/opencl_cachedir/'
+    )
+
+    n_pixels = n_observers * _HEIGHT * _WIDTH
+    images = np.empty([n_observers, _HEIGHT, _WIDTH], cl.cltypes.uint)
+
+    mf = cl.mem_flags
+    styles_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=np.array(style_of_satrec, cl.cltypes.uchar))
+    palette_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=_PALETTE.build_styles(style_dtype))
+    channels_buf = cl.Buffer(opencl_ctx, mf.READ_WRITE | mf.COPY_HOST_PTR, hostbuf=np.zeros(n_pixels * 3, cl.cltypes.uint))
+    pixels_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=images.nbytes)
+    trail_frames = len(earlier_frames) + 1 if earlier_frames else 0
+    n_satrecs = len(style_of_satrec)
+    trails = np.full(max(trail_frames, 1) * n_observers * n_satrecs * 2, -1, cl.cltypes.int)
+    trails_buf = cl.Buffer(opencl_ctx, mf.READ_WRITE | mf.COPY_HOST_PTR, hostbuf=trails)
+
+    command_queue = cl.CommandQueue(opencl_ctx)
+    draw_kernel = cl.Kernel(program, 'draw_points')
+    trail_kernel = cl.Kernel(program, 'draw_trails')
+    scalar_arg_dtypes = [cl.cltypes.int, cl.cltypes.int, cl.cltypes.double, None, None, None, None,
+                         cl.cltypes.int, cl.cltypes.int, cl.cltypes.int, cl.cltypes.int, None]
+    draw_kernel.set_scalar_arg_dtypes(scalar_arg_dtypes)
+    trail_kernel.set_scalar_arg_dtypes([cl.cltypes.int, cl.cltypes.int, cl.cltypes.float] + scalar_arg_dtypes[3:])
+
+    # Only the trails are kept from the earlier frames.
+    scratch_buf = cl.Buffer(opencl_ctx, mf.READ_WRITE, size=n_pixels * 3 * 4)
+    for row, frame in enumerate(earlier_frames):
+        if len(frame) > 0:
+            draw_kernel(command_queue, (len(frame),), None, _WIDTH, _HEIGHT, 1000.0,
+                        _points_buf(opencl_ctx, point_dtype, frame), styles_buf, palette_buf, scratch_buf,
+                        trail_frames, row, n_observers, n_satrecs, trails_buf)
+
+    points_buf = _points_buf(opencl_ctx, point_dtype, points)
+    trail_row = len(earlier_frames)
+    draw_kernel(command_queue, (len(points),), None, _WIDTH, _HEIGHT, 1000.0,
+                points_buf, styles_buf, palette_buf, channels_buf,
+                trail_frames, trail_row, n_observers, n_satrecs, trails_buf)
+    if trail_frames > 0:
+        trail_kernel(command_queue, (len(points),), None, _WIDTH, _HEIGHT, 0.6,
+                     points_buf, styles_buf, palette_buf, channels_buf,
+                     trail_frames, trail_row, n_observers, n_satrecs, trails_buf)
+    cl.Kernel(program, 'pack_pixels')(command_queue, (n_pixels,), None, channels_buf, pixels_buf)
+    cl.enqueue_copy(command_queue, images, pixels_buf)
+    command_queue.finish()
+    return images
+
+def _points_buf(opencl_ctx, point_dtype, points):
+    point_array = np.zeros(len(points), point_dtype)
+    for i, (observer_index, x, y, satrec_index, range) in enumerate(points):
+        point_array[i][point.OBSERVER_INDEX] = observer_index
+        point_array[i][point.X] = x
+        point_array[i][point.Y] = y
+        point_array[i][point.SATREC_INDEX] = satrec_index
+        point_array[i][point.RANGE] = range
+    return cl.Buffer(opencl_ctx, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR, hostbuf=point_array)
@@ -1,7 +1,9 @@
 import pytest
+import numpy as np
 import pyopencl as cl
 import re
 import tle
+from tle_samples import TLE_LINES
 
 def test_building_tle_struct_definition():
     unaligned_tle_dtype = tle.build_tle_dtype()
@@ -69,3 +71,54 @@ def test_parsing_tle_into_dict():
     assert tle_dict['no_kozai'] == 15.18634114
     assert tle_dict['revnum'] == 4126
 
+def test_parsing_tle_lines_in_bulk_matches_single_parse():
+    names = [line1[2:7] for line1, _ in TLE_LINES]
+
+    tle_array = tle.parse_tle_lines(names,
+                                    tle.to_fixed_width([line1 for line1, _ in TLE_LINES]),
+                                    tle.to_fixed_width([line2 for _, line2 in TLE_LINES]))
+
+    assert tle_array.dtype == tle.build_tle_dtype()
+    for i, (line1, line2) in enumerate(TLE_LINES):
+        for key, value in tle.parse_tle(names[i], line1, line2).items():
+            assert np.array_equal(tle_array[i][key], value), key
+    assert tle_array[2]['ndot'] == -0.00000104
+    assert tle_array[2]['bstar'] == -0.0001
+
+def test_sample_lines_have_correct_check_digits(capsys):
+    # The device parser treats a bad check digit as an error, so the lines must be right.
+    tle.parse_tle_lines([line1[2:7] for line1, _ in TLE_LINES],
+                        tle.to_fixed_width([line1 for line1, _ in TLE_LINES]),
+                        tle.to_fixed_width([line2 for _, line2 in TLE_LINES]))
+
+    assert 'check digit' not in capsys.readouterr().out
+
+def test_parsing_tle_feed():
+    feed = ''.join('SAT {}  \r\n{}\r\n{}\r\n'.format(i, line1, line2) for i, (line1, line2) in enumerate(TLE_LINES))
+
+    names, tle_array = tle.parse_tle_feed(feed.encode())
+
+    assert names == ['SAT 0', 'SAT 1', 'SAT 2']
+    assert tle_array[1]['satnum'].tobytes().decode() == 'A8924\x00'
+    assert tle_array[1]['no_kozai'] == 15.18634114
+
+def test_decoding_alpha5_satellite_numbers():
+    tle_array = np.zeros(4, tle.build_tle_dtype())
+    for i, satnum in enumerate(['47966', 'A0000', 'A8924', 'Z9999']):
+        tle_array[i]['satnum'][:5] = np.frombuffer(satnum.encode(), np.int8)
+
+    assert list(tle.satellite_numbers(tle_array)) == [47966, 100000, 108924, 339999]
+
+def test_bulk_parse_rejects_incorrect_format():
+    line1, line2 = TLE_LINES[0]
+    bad_line2 = line2[:11] + 'x' + line2[12:]
+
+    with pytest.raises(Exception, match='TLE 47966 line 2 has incorrect format'):
+        tle.parse_tle_lines(['47966'], tle.to_fixed_width([line1]), tle.to_fixed_width([bad_line2]))
+
+def test_bulk_parse_rejects_different_satellite_numbers():
+    line1, _ = TLE_LINES[0]
+    _, line2 = TLE_LINES[2]
+
+    with pytest.raises(Exception, match='same satellite number'):
+        tle.parse_tle_lines(['47966'], tle.to_fixed_width([line1]), tle.to_fixed_width([line2]))
@@ -0,0 +1,104 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import tle_fetch
+
+class _Celestrak(BaseHTTPRequestHandler):
+    """ Stands in for Celestrak, serving a feed for any path with an ETag. """
+    protocol_version = 'HTTP/1.1'
+    feeds = {}
+    requests = []
+    connections = set()
+
+    def do_GET(self):
+        type(self).requests.append((self.path, self.headers.get('If-None-Match'),))
+        type(self).connections.add(self.client_address)
+        body = type(self).feeds.get(self.path)
+        if body is None:
+            self._respond(404, b'Not found')
+        elif self.headers.get('If-None-Match') == _etag(body):
+            self._respond(304, b'')
+        else:
+            self._respond(200, body)
+
+    def _respond(self, status, body):
+        self.send_response(status)
+        if status != 404:
+            self.send_header('ETag', _etag(type(self).feeds[self.path]))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def _etag(body):
+    return '"{}"'.format(hash(body))
+
+@pytest.fixture
+def celestrak():
+    _Celestrak.feeds = {}
+    _Celestrak.requests = []
+    _Celestrak.connections = set()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Celestrak)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield 'http://127.0.0.1:{}'.format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+_QUERIES = [('GROUP', 'visual', 'Visible'), ('SPECIAL', 'decaying', 'Potential decay')]
+
+def _serve_feeds(body):
+    for path, _ in tle_fetch.fetch_paths('', _QUERIES):
+        _Celestrak.feeds[path] = body
+
+def test_fetches_feeds_and_satcat(celestrak, tmp_path):
+    _serve_feeds(b'feed')
+
+    tle_fetch.fetch_all(str(tmp_path), _QUERIES, celestrak, max_connections=2)
+
+    assert sorted(os.listdir(tmp_path)) == ['GROUP_visual', 'GROUP_visual.cat', 'GROUP_visual.cat.headers',
+                                            'GROUP_visual.headers', 'SPECIAL_decaying', 'SPECIAL_decaying.headers']
+    assert (tmp_path / 'GROUP_visual').read_bytes() == b'feed'
+    assert len(_Celestrak.requests) == 3
+    assert len(_Celestrak.connections) <= 2
+
+def test_not_fetched_again_within_24_hours(celestrak, tmp_path):
+    _serve_feeds(b'feed')
+    tle_fetch.fetch_all(str(tmp_path), _QUERIES, celestrak)
+    _Celestrak.requests = []
+
+    tle_fetch.fetch_all(str(tmp_path), _QUERIES, celestrak)
+
+    assert _Celestrak.requests == []
+
+def test_unchanged_feed_is_not_modified(celestrak, tmp_path):
+    _serve_feeds(b'feed')
+    pool = tle_fetch._ConnectionPool(celestrak)
+    cache_path = str(tmp_path / 'GROUP_visual')
+    path = tle_fetch.TLE_PATH.format('GROUP', 'visual')
+    assert tle_fetch.fetch(pool, path, cache_path, now=1000.0) == tle_fetch.FETCHED
+
+    a_day_later = os.path.getmtime(cache_path) + tle_fetch.FETCH_INTERVAL_SECS + 1
+    assert tle_fetch.fetch(pool, path, cache_path, now=a_day_later) == tle_fetch.NOT_MODIFIED
+    assert os.path.getmtime(cache_path) == a_day_later
+    assert _Celestrak.requests[-1] == (path, _etag(b'feed'))
+
+    _Celestrak.feeds[path] = b'new feed'
+    two_days_later = a_day_later + tle_fetch.FETCH_INTERVAL_SECS + 1
+    assert tle_fetch.fetch(pool, path, cache_path, now=two_days_later) == tle_fetch.FETCHED
+    assert (tmp_path / 'GROUP_visual').read_bytes() == b'new feed'
+    pool.close()
+
+def test_failed_fetch_leaves_cache(celestrak, tmp_path):
+    _serve_feeds(b'feed')
+    del _Celestrak.feeds[tle_fetch.TLE_PATH.format('SPECIAL', 'decaying')]
+
+    with pytest.raises(Exception, match='decaying'):
+        tle_fetch.fetch_all(str(tmp_path), _QUERIES, celestrak)
+
+    assert not os.path.exists(tmp_path / 'SPECIAL_decaying')
+    assert (tmp_path / 'GROUP_visual').read_bytes() == b'feed'
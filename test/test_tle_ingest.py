@@ -0,0 +1,76 @@
+import numpy as np
+import catalogue
+import tle_ingest
+
+_STARLINK = ('STARLINK-1              ',
+             '1 47966U 21023B   24172.45505936  .04045857  10158-4  18362-2 0  9997',
+             '2 47966  44.9956 207.2793 0004403  32.9642 327.1551 16.21097541180119')
+_ROCKET_BODY = ('CZ-6 R/B(2) [TANK]',
+                '1 A8924U 24024H   24 64.09407965  .00035856  00000+0  17249-2 0  9992',
+                '2 A8924  97.4003 140.9504 0011795 183.5621 176.5532 15.18634114 41266')
+
+_QUERIES = [
+    ('GROUP', 'visual', 'Visible'),
+    ('GROUP', 'active', None),
+    ('SPECIAL', 'gpz', tle_ingest.GPZ_TAG),
+    ('SPECIAL', 'gpz-plus', tle_ingest.GPZ_PLUS_TAG),
+]
+
+def _write_feed(feed_cache_dir, query, value, satellites, satcat=None):
+    path = tle_ingest.feed_path(str(feed_cache_dir), query, value)
+    with open(path, 'w') as file:
+        file.write(''.join(line + '\r\n' for satellite in satellites for line in satellite))
+    if satcat is not None:
+        with open(path + '.cat', 'w') as file:
+            file.write('OBJECT_NAME,OBJECT_ID,NORAD_CAT_ID,OBJECT_TYPE,OPS_STATUS_CODE,OWNER,LAUNCH_DATE,LAUNCH_SITE\n')
+            file.write(satcat)
+
+def test_feeds_are_merged_into_catalogue(tmp_path):
+    _write_feed(tmp_path, 'GROUP', 'visual', [_STARLINK])
+    _write_feed(tmp_path, 'GROUP', 'active', [_ROCKET_BODY, _STARLINK],
+                'CZ-6 R/B,2024-024H,108924,R/B,,PRC,2024-02-03,TAISC\n'
+                'STARLINK-1,2021-023B,47966,PAY,+,US,2021-03-24,AFETR\n')
+    _write_feed(tmp_path, 'SPECIAL', 'gpz', [_ROCKET_BODY])
+    _write_feed(tmp_path, 'SPECIAL', 'gpz-plus', [_ROCKET_BODY, _STARLINK])
+    path = str(tmp_path / 'catalogue.bin')
+
+    assert tle_ingest.ingest(str(tmp_path), path, _QUERIES) == 2
+
+    tle_array, sat_info = catalogue.read_catalogue(path, catalogue.build_catalogue_tle_dtype())
+    assert sat_info.norad_ids() == ['47966', 'A8924']
+    assert np.array_equal(catalogue.read_tle_lines(path)[0, 0, :7], np.frombuffer(b'1 47966', np.uint8))
+    assert sat_info[0][catalogue.NAME] == 'STARLINK-1\n'
+    assert sat_info[0][catalogue.TAGS] == ('Ownership:   United States\n'
+                                           'Launch date: 2021-03-24\n'
+                                           'Launch site:   Air Force Eastern Test Range,' + tle_ingest.NL + 'Florida, USA\n'
+                                           '\n'
+                                           'Visible\n'
+                                           'Geo protected plus\n')
+    # The gpz-plus tag isn't added as well as the gpz tag.
+    assert sat_info[1][catalogue.TAGS] == ('Ownership:   People\'s Republic of China\n'
+                                           'Launch date: 2024-02-03\n'
+                                           'Launch site:   Taiyuan Space Center, PRC\n'
+                                           '\n'
+                                           'Stage 2 rocket body\n'
+                                           'Propellant tank\n'
+                                           'Geo protected zone\n')
+
+def test_debris_feeds_are_tagged_as_debris(tmp_path):
+    debris = ('FENGYUN 1C',) + _ROCKET_BODY[1:]
+    queries = _QUERIES[:2] + [('GROUP', 'fengyun-1c-debris', 'Debris from 2007 Chinese anti-satellite missle test')]
+    # First seen in a feed that isn't of debris.
+    _write_feed(tmp_path, 'GROUP', 'visual', [])
+    _write_feed(tmp_path, 'GROUP', 'active', [debris, _STARLINK])
+    _write_feed(tmp_path, 'GROUP', 'fengyun-1c-debris', [debris])
+    path = str(tmp_path / 'catalogue.bin')
+
+    tle_ingest.ingest(str(tmp_path), path, queries)
+
+    _, sat_info = catalogue.read_catalogue(path, catalogue.build_catalogue_tle_dtype())
+    assert sat_info.norad_ids() == ['47966', 'A8924']
+    assert sat_info.tags_of(0) == []
+    assert sat_info.tags_of(1) == ['Debris', 'Debris from 2007 Chinese anti-satellite missle test']
+
+def test_debris_is_tagged_by_name():
+    assert tle_ingest._name_tags('FENGYUN 1C DEB') == ['Debris']
+    assert tle_ingest._name_tags('ISS (ZARYA)') == []
@@ -0,0 +1,79 @@
+import pyopencl as cl
+import numpy as np
+import tle
+import jtime
+import observer
+import dtype as dt
+
+# Checks that frames skipped using the visibility bound never include one in which
+# the satellite is above the horizon.
+
+def test_low_earth_orbit():
+    _visibility_bound_test(
+        '1 25544U 98067A   25185.47485775  .00005492  00000+0  10282-3 0  9993',
+        '2 25544  51.6344 221.3901 0002450 331.8120  28.2736 15.50368910517843',
+        (2025, 7, 4), observer.ROYAL_GREENWICH_OBSERVATORY)
+
+def test_highly_elliptical_orbit():
+    _visibility_bound_test(
+        '1 28129U 03058A   06175.57071136 -.00000104  00000-0  10000-3 0   459',
+        '2 28129  54.7298 324.8098 0048506 266.2640  93.1663  2.00562768 18443',
+        (2006, 6, 24), observer.YORK)
+
+def test_molniya_orbit():
+    _visibility_bound_test(
+        '1 08195U 75081A   06176.33215444  .00000099  00000-0  11873-3 0   813',
+        '2 08195  64.1586 279.0717 6877146 264.7651  20.2257  2.00491383225656',
+        (2006, 6, 25), observer.CLOTH_HALL_LEEDS)
+
+def _visibility_bound_test(tle_line1, tle_line2, day, site, n_steps=2880, step_secs=30.0):
+
+    opencl_ctx = cl.create_some_context(interactive=False)
+    device = opencl_ctx.devices[0]
+
+    tle_dtype = dt.to_opencl_dtype(device, tle.build_tle_dtype(), 'tle', 'tle.h')
+    dt.to_opencl_dtype(device, jtime.build_jtime_dtype(), 'jtime', 'jtime.h')
+    observer_dtype = dt.to_opencl_dtype(device, observer.build_observer_dtype(), 'observer', 'observer.h')
+
+    program = cl.Program(
+        opencl_ctx,
+        '#include "test_visibility_bound_kernel.cl"'
+    ).build(
+        options=' -I main/ -I test/ -I ' + dt.GENERATED_HEADER_DIR + ' ',
+        cache_dir='caches/opencl_cachedir/'
+    )
+
+    tle_array = np.empty(1, tle_dtype)
+    for key, value in tle.parse_tle(0, tle_line1, tle_line2).items():
+        tle_array[0][key] = value
+
+    (_, latitude_deg, longitude_deg, altitude_km) = site
+    observer_array = np.empty(1, observer_dtype)
+    for key, value in observer.calc_observer(latitude_deg, longitude_deg, altitude_km).items():
+        observer_array[0][key] = value
+
+    elevations = np.empty(n_steps, cl.cltypes.double)
+    skips = np.empty(n_steps, cl.cltypes.int)
+
+    mf = cl.mem_flags
+    tle_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=tle_array)
+    observer_buf = cl.Buffer(opencl_ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=observer_array)
+    elevations_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=elevations.nbytes)
+    skips_buf = cl.Buffer(opencl_ctx, mf.WRITE_ONLY, size=skips.nbytes)
+
+    command_queue = cl.CommandQueue(opencl_ctx)
+    (year, month, day_of_month) = day
+    program.test_visibility_bound(command_queue, (n_steps,), None,
+        cl.cltypes.int(year), cl.cltypes.int(month), cl.cltypes.int(day_of_month),
+        cl.cltypes.double(step_secs), tle_buf, observer_buf, elevations_buf, skips_buf)
+    cl.enqueue_copy(command_queue, elevations, elevations_buf)
+    cl.enqueue_copy(command_queue, skips, skips_buf).wait()
+
+    visible = elevations > 0
+    assert not np.isnan(elevations).any(), "sgp4 error"
+    assert visible.any(), "never visible, so nothing tested"
+    assert skips.max() > 1, "bound never skips"
+
+    for step in range(n_steps):
+        if skips[step] > 1:
+            assert not visible[step:step + skips[step]].any(), "step {} skipped a visible step".format(step)
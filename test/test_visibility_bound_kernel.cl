@@ -0,0 +1,55 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+#include "tle.h"
+#include "jtime.h"
+#include "observer.h"
+#include "calculate_jtime.cl"
+#include "celestrak/sgp4/SGP4.h"
+#include "celestrak/sgp4/SGP4.cl"
+#include "celestrak/sgp4/init_satrec.cl"
+#include "celestrak/mathtimelib/MathTimeLib.h"
+#include "celestrak/mathtimelib/MathTimeLib.cl"
+#include "celestrak/astrolib/AstroLib.h"
+#include "celestrak/astrolib/AstroLib.cl"
+#include "calc_ecef.cl"
+#include "observer_razel.cl"
+#include "visibility_bound.cl"
+
+/*
+ * For each step outputs the elevation from the observer (NAN on sgp4 error) and the
+ * number of steps the visibility bound would skip.
+ */
+__kernel void test_visibility_bound(
+    int p_year, int p_month, int p_day,
+    double step_secs,
+    __global const tle *tle_array,
+    __global const observer *observers,
+    __global double *elevations,
+    __global int *skips)
+{
+    const size_t step = get_global_id(0);
+
+    jtime jt = calculate_jtime(p_year, p_month, p_day, 0, 0, step * step_secs, 0.07024);
+
+    elsetrec satrec;
+    init_satrec(&satrec, &tle_array[0]);
+
+    sgp4init(wgs72, 'a', satrec.satnum, (satrec.jdsatepoch + satrec.jdsatepochF) - 2433281.5, satrec.bstar,
+            satrec.ndot, satrec.nddot, satrec.ecco, satrec.argpo, satrec.inclo, satrec.mo, satrec.no_kozai,
+            satrec.nodeo, &satrec);
+
+    double recef[3], vecef[3];
+    if (!calc_ecef(&satrec, &jt, recef, vecef)) {
+        elevations[step] = NAN;
+        skips[step] = 1;
+        return;
+    }
+
+    const observer obs = observers[0];
+    double rho, az, el;
+    observer_razel(&obs, recef, vecef, &rho, &az, &el);
+    elevations[step] = el;
+
+    double slack = horizon_slack(recef, max_orbit_radius(&satrec), 1, observers);
+    skips[step] = frames_to_skip(slack, max_angular_rate(&satrec), step_secs);
+}
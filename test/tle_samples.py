@@ -0,0 +1,12 @@
+""" Element lines shared by the TLE parsing tests.  The second has an Alpha-5 satellite
+    number, and the last a negative ndot and bstar.  Each '-' counts as 1 in the check digit.
+"""
+
+TLE_LINES = [
+    ('1 47966U 21023B   24172.45505936  .04045857  10158-4  18362-2 0  9997',
+     '2 47966  44.9956 207.2793 0004403  32.9642 327.1551 16.21097541180119'),
+    ('1 A8924U 24024H   24 64.09407965  .00035856  00000+0  17249-2 0  9992',
+     '2 A8924  97.4003 140.9504 0011795 183.5621 176.5532 15.18634114 41266'),
+    ('1 10007U 03058A   26291.63958333 -.00000104  00000-0 -10000-3 0   457',
+     '2 10007  54.7298  11.0124 0048506 266.2640   9.1605  2.00562768 18447'),
+]